@@ -0,0 +1,435 @@
+"""
+Benchmarks of the Leneda client against the local stand-in API.
+
+Each scenario runs once to warm up the server, repeat times to measure throughput and
+latency (over the requests of all runs), and a few times under tracemalloc to measure the
+peak memory of the client. The server runs in its own process, so that generating the synthetic
+data does not count against the client, unless the in-process transport is benchmarked
+(--transport inprocess).
+
+Wall-clock numbers depend on the machine, so each measured run is paired with a reference
+run, made in the same process right before it: the same requests are sent through a bare
+transport of the same kind, without the client, and their bodies decoded with json.loads. The
+client is gated on its ratios to the reference (its overhead), its peak memory and its number
+of requests, which do not depend on the speed of the machine. The absolute numbers are printed
+for information.
+
+The gated metrics are compared with the baselines stored in baselines.json, and the run fails
+when one is worse than its baseline by more than the tolerance:
+
+    python -m benchmarks.run                    # Compare with the baselines
+    python -m benchmarks.run --update-baseline  # Record new baselines
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from leneda import LenedaClient, ObisCode, RequestEvent
+from leneda.client import create_session
+from leneda.transport import AiohttpTransport, HttpxTransport, InProcessTransport, Transport
+
+from .server import create_handler
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Metrics compared with the baselines. The ratios are those of the client to the reference
+# run; requests is the number of requests the client sent per run. The p99 ratio is not gated,
+# as the tail of a few hundred requests depends on single scheduling or GC pauses.
+GATED_METRICS = ("p50_ratio", "throughput_ratio", "parse_ratio", "peak_memory_mb", "requests")
+
+# Runs measuring the peak memory of a scenario
+MEMORY_RUNS = 5
+
+# Metrics where a higher value is better; for all others lower is better
+HIGHER_IS_BETTER = ("rows_per_second", "requests_per_second", "throughput_ratio")
+
+Metrics = Dict[str, float]
+
+# A request as sent to the transport: method, URL, headers, query parameters and JSON body
+RawRequest = Tuple[str, str, Dict[str, str], Optional[Dict[str, str]], Any]
+
+
+@dataclass
+class BenchmarkConfig:
+    """Parameters of a benchmark run. Baselines are only comparable for the same parameters."""
+
+    meters: int = 20
+    days: int = 30
+    latency: float = 0.005
+    jitter: float = 0.005
+    access_requests: int = 200
+    transport: str = "aiohttp"  # aiohttp, httpx or inprocess
+    compress: bool = False
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentile of a list of values, interpolated between the closest ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def meter_codes(count: int) -> List[str]:
+    """Metering point codes of the synthetic meters."""
+    return [f"LU{n:031d}" for n in range(1, count + 1)]
+
+
+async def time_series(client: LenedaClient, config: BenchmarkConfig) -> int:
+    """Fetch the 15 minute consumption of all meters; returns the number of rows."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=config.days)
+    results = await asyncio.gather(
+        *(
+            client.get_metering_data(code, ObisCode.ELEC_CONSUMPTION_ACTIVE, start, end)
+            for code in meter_codes(config.meters)
+        )
+    )
+    return sum(len(data.columns) for data in results)
+
+
+async def aggregated(client: LenedaClient, config: BenchmarkConfig) -> int:
+    """Fetch the daily totals of all meters; returns the number of rows."""
+    start = date(2024, 1, 1)
+    end = start + timedelta(days=config.days - 1)
+    results = await asyncio.gather(
+        *(
+            client.get_aggregated_metering_data(
+                code, ObisCode.ELEC_CONSUMPTION_ACTIVE, start.isoformat(), end.isoformat()
+            )
+            for code in meter_codes(config.meters)
+        )
+    )
+    return sum(len(data.aggregated_time_series) for data in results)
+
+
+async def access_requests(client: LenedaClient, config: BenchmarkConfig) -> int:
+    """Send metering data access requests; returns 0 as the responses have no rows."""
+    codes = meter_codes(config.meters)
+    await asyncio.gather(
+        *(
+            client.request_metering_data_access(
+                "LUXE-BENCHMARK",
+                "Benchmark",
+                [codes[n % len(codes)]],
+                [ObisCode.ELEC_CONSUMPTION_ACTIVE],
+            )
+            for n in range(config.access_requests)
+        )
+    )
+    return 0
+
+
+SCENARIOS: Dict[str, Callable[[LenedaClient, BenchmarkConfig], Awaitable[int]]] = {
+    "time_series": time_series,
+    "aggregated": aggregated,
+    "access_request": access_requests,
+}
+
+
+class SessionTransport(AiohttpTransport):
+    """The default aiohttp transport of the client, over a session of its own."""
+
+    def __init__(self) -> None:
+        self.session: Optional[aiohttp.ClientSession] = None
+        super().__init__(self._get_session)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = create_session()
+        return self.session
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+
+class RecordingTransport(Transport):
+    """Transport recording the requests sent through another one, to replay them."""
+
+    def __init__(self, transport: Transport):
+        self.transport = transport
+        self.requests: List[RawRequest] = []
+
+    def request(self, method: str, url: str, **options: Any) -> AsyncContextManager[Any]:
+        headers, params, body = options["headers"], options.get("params"), options.get("json")
+        self.requests.append((method, url, dict(headers), params, body))
+        return self.transport.request(method, url, **options)
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+
+def create_transport(config: BenchmarkConfig) -> Transport:
+    """Create the transport of a run."""
+    if config.transport == "httpx":
+        return HttpxTransport()
+    if config.transport == "inprocess":
+        return InProcessTransport(create_handler(config.latency, config.jitter, config.compress))
+    return SessionTransport()
+
+
+@dataclass
+class Measurement:
+    """Request durations, time and rows of the measured runs of a client or its reference."""
+
+    totals: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+    rows: int = 0
+    parse_time: float = 0.0
+
+    def metrics(self) -> Metrics:
+        """Throughput, latency percentiles and parse time per row over all runs."""
+        metrics = {
+            "requests_per_second": len(self.totals) / self.elapsed,
+            "p50_ms": percentile(self.totals, 0.5) * 1e3,
+            "p99_ms": percentile(self.totals, 0.99) * 1e3,
+        }
+        if self.rows:
+            metrics["rows_per_second"] = self.rows / self.elapsed
+            metrics["parse_us_per_row"] = self.parse_time / self.rows * 1e6
+        return metrics
+
+
+async def run_reference(
+    requests: List[RawRequest], config: BenchmarkConfig, measurement: Measurement
+) -> None:
+    """Send requests through a bare transport at once and decode their bodies with json.loads."""
+    transport = create_transport(config)
+
+    async def send(request: RawRequest) -> None:
+        method, url, headers, params, body = request
+        started = time.perf_counter()
+        async with transport.request(
+            method, url, headers=headers, params=params, json=body
+        ) as response:
+            response.raise_for_status()
+            content = await response.read()
+        decode_started = time.perf_counter()
+        data = json.loads(content)
+        finished = time.perf_counter()
+        measurement.parse_time += finished - decode_started
+        measurement.totals.append(finished - started)
+        if isinstance(data, dict):
+            measurement.rows += len(data.get("items") or data.get("aggregatedTimeSeries") or ())
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(send(request) for request in requests))
+        measurement.elapsed += time.perf_counter() - started
+    finally:
+        await transport.close()
+
+
+async def run_scenario(name: str, base_url: str, config: BenchmarkConfig, repeat: int) -> Metrics:
+    """Run a scenario against the server at base_url and measure it against its reference."""
+    scenario = SCENARIOS[name]
+
+    async def run(
+        events: Optional[List[RequestEvent]] = None, transport: Optional[Transport] = None
+    ) -> int:
+        observers = [events.append] if events is not None else []
+        transport = transport or create_transport(config)
+        try:
+            async with LenedaClient(
+                "benchmark", "LUXE-BENCHMARK", observers=observers, transport=transport
+            ) as client:
+                client.BASE_URL = base_url
+                return await scenario(client, config)
+        finally:
+            await transport.close()
+
+    # Warm up the connections and the responses cached by the server, and record the requests
+    # of the scenario for the reference runs
+    recording = RecordingTransport(create_transport(config))
+    await run(transport=recording)
+
+    # The runs alternate with those of the reference, so that both see the same load of the
+    # machine, and the percentiles are taken over the requests of all runs. As with timeit,
+    # the garbage collector is paused during the runs, so that its pauses do not land on a
+    # random request.
+    client, reference = Measurement(), Measurement()
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            await run_reference(recording.requests, config, reference)
+            events: List[RequestEvent] = []
+            started = time.perf_counter()
+            client.rows += await run(events)
+            client.elapsed += time.perf_counter() - started
+        finally:
+            gc.enable()
+        client.totals += [event.total for event in events]
+        client.parse_time += sum(event.decode + event.model_build for event in events)
+
+    result = {"requests": len(client.totals) / repeat, **client.metrics()}
+    expected = reference.metrics()
+    result["throughput_ratio"] = result["requests_per_second"] / expected["requests_per_second"]
+    result["p50_ratio"] = result["p50_ms"] / expected["p50_ms"]
+    result["p99_ratio"] = result["p99_ms"] / expected["p99_ms"]
+    if client.rows:
+        result["parse_ratio"] = result["parse_us_per_row"] / expected["parse_us_per_row"]
+
+    # The peak depends on how many responses happen to be buffered at once; the lowest of a
+    # few runs is the most stable
+    peaks = []
+    for _ in range(MEMORY_RUNS):
+        tracemalloc.start()
+        try:
+            await run()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    result["peak_memory_mb"] = min(peaks) / 2**20
+    return result
+
+
+def start_server(config: BenchmarkConfig) -> Tuple[subprocess.Popen, str]:
+    """Start the stand-in API in a subprocess; returns the process and its base URL."""
+    command = [sys.executable, "-m", "benchmarks.server", "--latency", str(config.latency)]
+    command += ["--jitter", str(config.jitter)]
+    if config.compress:
+        command.append("--compress")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    assert process.stdout is not None
+    base_url = process.stdout.readline().strip()
+    if not base_url:
+        process.kill()
+        raise RuntimeError("The stand-in API did not start")
+    return process, base_url
+
+
+def compare(
+    results: Dict[str, Metrics], baselines: Dict[str, Metrics], tolerance: float
+) -> List[str]:
+    """List the metrics that are worse than their baseline by more than tolerance."""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            baseline = baselines.get(name, {}).get(metric)
+            if metric not in GATED_METRICS or not baseline:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = (baseline - value) / baseline
+            else:
+                change = (value - baseline) / baseline
+            if change > tolerance:
+                regressions.append(
+                    f"{name}.{metric}: {value:.3f} against a baseline of {baseline:.3f} "
+                    f"({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def print_results(results: Dict[str, Metrics], baselines: Dict[str, Metrics]) -> None:
+    """Print the results next to their baselines."""
+    for name, metrics in results.items():
+        print(name)
+        for metric, value in metrics.items():
+            baseline = baselines.get(name, {}).get(metric)
+            if metric not in GATED_METRICS:
+                reference = "  (not gated)"
+            elif baseline is not None:
+                reference = f"  (baseline {baseline:.3f})"
+            else:
+                reference = ""
+            print(f"  {metric:<20} {value:12.3f}{reference}")
+
+
+def main() -> int:
+    """Run the benchmarks from the command line; returns the exit status."""
+    defaults = BenchmarkConfig()
+    parser = argparse.ArgumentParser(description="Benchmark the Leneda client")
+    parser.add_argument("--meters", type=int, default=defaults.meters)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+    parser.add_argument("--access-requests", type=int, default=defaults.access_requests)
+    parser.add_argument(
+        "--transport", choices=("aiohttp", "httpx", "inprocess"), default=defaults.transport
+    )
+    parser.add_argument("--compress", action="store_true", help="Compress the responses")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=10, help="Measured runs per scenario")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="File of the baselines")
+    parser.add_argument("--tolerance", type=float, help="Allowed regression, e.g. 0.25")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    config = BenchmarkConfig(
+        args.meters,
+        args.days,
+        args.latency,
+        args.jitter,
+        args.access_requests,
+        args.transport,
+        args.compress,
+    )
+    stored: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+    baselines: Dict[str, Metrics] = {}
+    if stored.get("config") == asdict(config):
+        baselines = stored.get("scenarios", {})
+    elif stored and not args.update_baseline:
+        print("The baselines were recorded with other parameters and are not compared")
+
+    # The in-process transport calls the stand-in directly, the others need its server
+    process, base_url = None, LenedaClient.BASE_URL
+    if config.transport != "inprocess":
+        process, base_url = start_server(config)
+    try:
+        results = {
+            name: asyncio.run(run_scenario(name, base_url, config, args.repeat))
+            for name in args.scenario or SCENARIOS
+        }
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print_results(results, baselines)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": asdict(config), "scenarios": results}, f, indent=2)
+
+    if args.update_baseline:
+        scenarios = {**baselines, **results}
+        tolerance = stored.get("tolerance", 0.3)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {"config": asdict(config), "tolerance": tolerance, "scenarios": scenarios},
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print(f"Baselines written to {args.baseline}")
+        return 0
+
+    tolerance = args.tolerance if args.tolerance is not None else stored.get("tolerance", 0.3)
+    regressions = compare(results, baselines, tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
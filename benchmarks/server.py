@@ -0,0 +1,337 @@
+"""
+Local stand-in for the Leneda API, serving synthetic data for the benchmarks.
+
+The server imitates the time-series, time-series/aggregated and metering-data-access-request
+endpoints, over HTTP (create_app) or in the same process (create_handler, to be used with an
+InProcessTransport). Series are generated on the fly for any metering point code and range: 15 minute
+electricity series follow a household load or solar production profile, and gas series are
+hourly. The values depend only on the metering point code, OBIS code and time, so repeated
+runs serve the same data.
+
+Run it on its own with:
+
+    python -m benchmarks.server --port 8080 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import uuid
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Any, List, Mapping, Tuple
+
+from aiohttp import web
+
+from leneda.aggregation import (
+    AGGREGATION_LEVELS,
+    ENERGY_UNITS,
+    LOCAL_TIMEZONE,
+    aggregation_buckets,
+)
+from leneda.obis_codes import OBIS_CODES, ObisCode
+from leneda.timeutils import API_DATETIME_FORMAT, parse_timestamp, to_epoch
+from leneda.transport import InProcessHandler, InProcessRequest, InProcessResponse, encode_body
+
+# Seconds per interval of the electricity and gas series
+ELECTRICITY_INTERVAL = 900
+GAS_INTERVAL = 3600
+
+# Share of the values flagged as calculated
+CALCULATED_SHARE = 0.01
+
+Series = Tuple[List[int], List[float], List[bool]]
+
+
+def _profile(obis_code: ObisCode, hour: float, day_of_year: int, scale: float) -> float:
+    """Mean value of a series at a local hour of a day of the year."""
+    summer = (1.0 - math.cos(2 * math.pi * (day_of_year - 15) / 365)) / 2  # 0 to 1
+    winter = 1.35 - 0.7 * summer
+    if obis_code.value.startswith("7-"):
+        # Heating, with peaks in the morning and evening
+        return scale * winter**2 * (0.6 + 0.4 * math.cos(2 * math.pi * (hour - 7) / 12))
+    if ":2." in obis_code.value:
+        # Solar production, longer and higher in summer, centred on 13:30 local time
+        daylight = 8.5 + 7.5 * summer
+        sunrise = 13.5 - daylight / 2
+        if not sunrise < hour < sunrise + daylight:
+            return 0.0
+        return 4.0 * scale * (0.3 + 0.7 * summer) * math.sin(math.pi * (hour - sunrise) / daylight)
+    # Household consumption: base load with morning and evening peaks
+    morning = math.exp(-(((hour - 7.5) / 1.2) ** 2))
+    evening = math.exp(-(((hour - 19.0) / 2.0) ** 2))
+    return scale * winter * (0.25 + 0.6 * morning + 1.1 * evening)
+
+
+def interval_of(obis_code: ObisCode) -> int:
+    """Seconds per interval of the series of an OBIS code."""
+    return GAS_INTERVAL if obis_code.value.startswith("7-") else ELECTRICITY_INTERVAL
+
+
+def synthetic_series(metering_point_code: str, obis_code: ObisCode, start: int, end: int) -> Series:
+    """
+    Generate the values of a series from start (inclusive) to end (exclusive).
+
+    Args:
+        metering_point_code: The metering point code, which seeds the size of the household
+        obis_code: The OBIS code, which selects the profile and interval length
+        start: Start of the range in epoch seconds
+        end: End of the range in epoch seconds
+
+    Returns:
+        The start times in epoch seconds, the values and the calculated flags
+    """
+    step = interval_of(obis_code)
+    scale = random.Random(f"{metering_point_code}:{obis_code.value}").uniform(0.5, 2.0)
+    timestamps: List[int] = []
+    values: List[float] = []
+    calculated: List[bool] = []
+    first = -(-start // step) * step
+    day = None
+    rng = random.Random()
+    for timestamp in range(first, end, step):
+        if timestamp // 86400 != day:
+            # Seed per UTC day, so that any range within a day gets the same values
+            day = timestamp // 86400
+            day_start = day * 86400
+            rng.seed(f"{metering_point_code}:{obis_code.value}:{day}")
+            noise = [rng.lognormvariate(0.0, 0.25) for _ in range(86400 // step)]
+            flags = [rng.random() < CALCULATED_SHARE for _ in range(86400 // step)]
+            noon = datetime.fromtimestamp(day_start + 43200, LOCAL_TIMEZONE)
+            day_of_year = noon.timetuple().tm_yday
+            offset = noon.utcoffset().total_seconds()  # type: ignore[union-attr]
+        slot = (timestamp - day_start) // step
+        hour = ((timestamp - day_start + offset) / 3600) % 24
+        timestamps.append(timestamp)
+        values.append(round(_profile(obis_code, hour, day_of_year, scale) * noise[slot], 3))
+        calculated.append(flags[slot])
+    return timestamps, values, calculated
+
+
+@lru_cache(maxsize=4096)
+def time_series_body(metering_point_code: str, obis: str, start: str, end: str) -> bytes:
+    """Build the body of a time-series response."""
+    obis_code = ObisCode(obis)
+    timestamps, values, calculated = synthetic_series(
+        metering_point_code, obis_code, parse_timestamp(start), parse_timestamp(end)
+    )
+    step = interval_of(obis_code)
+    items = [
+        {
+            "value": value,
+            "startedAt": datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+                API_DATETIME_FORMAT
+            ),
+            "type": "Actual",
+            "version": 2,
+            "calculated": flag,
+        }
+        for timestamp, value, flag in zip(timestamps, values, calculated)
+    ]
+    body = {
+        "meteringPointCode": metering_point_code,
+        "obisCode": obis,
+        "intervalLength": "PT1H" if step == GAS_INTERVAL else "PT15M",
+        "unit": OBIS_CODES[obis_code].unit,
+        "items": items,
+    }
+    return json.dumps(body).encode()
+
+
+@lru_cache(maxsize=4096)
+def aggregated_body(metering_point_code: str, obis: str, start: str, end: str, level: str) -> bytes:
+    """Build the body of a time-series/aggregated response; end is an inclusive date."""
+    obis_code = ObisCode(obis)
+    first_day, last_day = date.fromisoformat(start), date.fromisoformat(end)
+    start_epoch = to_epoch(datetime.combine(first_day, time(), LOCAL_TIMEZONE))
+    end_epoch = to_epoch(datetime.combine(last_day + timedelta(days=1), time(), LOCAL_TIMEZONE))
+    timestamps, values, calculated = synthetic_series(
+        metering_point_code, obis_code, start_epoch, end_epoch
+    )
+    unit = OBIS_CODES[obis_code].unit
+    factor = interval_of(obis_code) / 3600 if unit in ENERGY_UNITS else 1.0
+    items = []
+    for bucket_start, bucket_end in aggregation_buckets(level, start_epoch, end_epoch):
+        low, high = bisect_left(timestamps, bucket_start), bisect_left(timestamps, bucket_end)
+        if low == high:
+            continue
+        items.append(
+            {
+                "value": round(math.fsum(values[low:high]) * factor, 3),
+                "startedAt": datetime.fromtimestamp(bucket_start, timezone.utc).strftime(
+                    API_DATETIME_FORMAT
+                ),
+                "endedAt": datetime.fromtimestamp(bucket_end, timezone.utc).strftime(
+                    API_DATETIME_FORMAT
+                ),
+                "calculated": any(calculated[low:high]),
+            }
+        )
+    return json.dumps(
+        {"unit": ENERGY_UNITS.get(unit, unit), "aggregatedTimeSeries": items}
+    ).encode()
+
+
+# Paths of the time-series endpoints, with the metering point code
+_TIME_SERIES_PATH = re.compile(r"^/api/metering-points/([^/]+)/time-series(/aggregated)?$")
+_ACCESS_REQUEST_PATH = "/api/metering-data-access-request"
+
+
+class StandInApi:
+    """The endpoints of the stand-in API, independent of how requests reach them."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        """
+        Initialize the API.
+
+        Args:
+            latency: Seconds each response is delayed by
+            jitter: Maximum number of seconds added at random to the latency
+            seed: Seed of the random jitter and request IDs
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+
+    async def handle(
+        self,
+        method: str,
+        path: str,
+        query: Mapping[str, str],
+        headers: Mapping[str, str],
+        data: Any,
+    ) -> Tuple[int, bytes]:
+        """
+        Answer a request.
+
+        Args:
+            method: The HTTP method
+            path: The path of the URL
+            query: The query parameters
+            headers: The request headers
+            data: The decoded JSON body of POST requests
+
+        Returns:
+            The status and the JSON body of the response
+        """
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.rng.uniform(0.0, self.jitter))
+        if not headers.get("X-API-KEY") or not headers.get("X-ENERGY-ID"):
+            return 401, b'{"message": "Unauthorized"}'
+
+        match = _TIME_SERIES_PATH.match(path)
+        try:
+            if method == "GET" and match and not match.group(2):
+                return 200, time_series_body(
+                    match.group(1), query["obisCode"], query["startDateTime"], query["endDateTime"]
+                )
+            if method == "GET" and match:
+                level = query.get("aggregationLevel", "")
+                mode = query.get("transformationMode")
+                if level not in AGGREGATION_LEVELS or mode != "Accumulation":
+                    return 400, b'{"message": "Unsupported aggregation"}'
+                return 200, aggregated_body(
+                    match.group(1), query["obisCode"], query["startDate"], query["endDate"], level
+                )
+        except (KeyError, ValueError) as e:
+            return 400, json.dumps({"message": f"Invalid request: {e}"}).encode()
+        if method == "POST" and path == _ACCESS_REQUEST_PATH:
+            fields = ("from", "fromName", "meteringPointCodes", "obisCodes")
+            if not isinstance(data, dict) or not all(key in data for key in fields):
+                return 400, b'{"message": "Missing fields"}'
+            request_id = str(uuid.UUID(int=self.rng.getrandbits(128)))
+            return 200, json.dumps({"id": request_id, "status": "PENDING"}).encode()
+        return 404, b'{"message": "Not found"}'
+
+
+def create_app(
+    latency: float = 0.0, jitter: float = 0.0, compress: bool = False, seed: int = 0
+) -> web.Application:
+    """
+    Create the stand-in API as an aiohttp application.
+
+    Args:
+        latency: Seconds each response is delayed by
+        jitter: Maximum number of seconds added at random to the latency
+        compress: Whether to compress the responses as the client accepts
+        seed: Seed of the random jitter and request IDs
+
+    Returns:
+        The aiohttp application, serving the API under /api
+    """
+    api = StandInApi(latency, jitter, seed)
+
+    async def handle(request: web.Request) -> web.Response:
+        data = await request.json() if request.can_read_body else None
+        status, body = await api.handle(
+            request.method, request.path, request.query, request.headers, data
+        )
+        response = web.Response(status=status, body=body, content_type="application/json")
+        if compress:
+            response.enable_compression()
+        return response
+
+    app = web.Application()
+    app.router.add_route("*", "/api/{path:.*}", handle)
+    return app
+
+
+def create_handler(
+    latency: float = 0.0, jitter: float = 0.0, compress: bool = False, seed: int = 0
+) -> InProcessHandler:
+    """
+    Create the stand-in API as the handler of an InProcessTransport.
+
+    See create_app for the arguments.
+    """
+    api = StandInApi(latency, jitter, seed)
+
+    async def handle(request: InProcessRequest) -> InProcessResponse:
+        status, body = await api.handle(
+            request.method, request.path, request.params, request.headers, request.json
+        )
+        headers = {"Content-Type": "application/json"}
+        if compress:
+            body, encoding = encode_body(body, request.headers.get("Accept-Encoding"))
+            if encoding is not None:
+                headers["Content-Encoding"] = encoding
+        return InProcessResponse(status, body, headers)
+
+    return handle
+
+
+async def serve(host: str, port: int, latency: float, jitter: float, compress: bool) -> None:
+    """Serve the stand-in API until cancelled, printing its base URL once listening."""
+    runner = web.AppRunner(create_app(latency, jitter, compress), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    sockets = site._server.sockets  # type: ignore[union-attr]
+    print(f"http://{host}:{sockets[0].getsockname()[1]}/api", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Run the stand-in API from the command line."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Leneda API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="Port, 0 for any free port")
+    parser.add_argument("--latency", type=float, default=0.0, help="Response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra delay in seconds")
+    parser.add_argument("--compress", action="store_true", help="Compress the responses")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.latency, args.jitter, args.compress))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -116,19 +116,7 @@ def get_credentials(args):
 
 def convert_to_dataframe(data: MeteringData) -> pd.DataFrame:
     """Convert MeteringData to a pandas DataFrame."""
-    df = pd.DataFrame(
-        [
-            {
-                "timestamp": item.started_at,
-                "value": item.value,
-                "type": item.type,
-                "calculated": item.calculated,
-            }
-            for item in data.items
-        ]
-    )
-    df.set_index("timestamp", inplace=True)
-    return df
+    return data.to_pandas(tz="Europe/Luxembourg")
 
 
 def plot_consumption_data(
@@ -203,7 +191,7 @@ async def main():
         df = convert_to_dataframe(consumption_data)
         df["kWh"] = df["value"] * 0.25  # 15 min = 0.25 h
         # Resample to hourly energy (sum of 4 periods per hour)
-        hourly_kwh = df["kWh"].resample("H").sum()
+        hourly_kwh = df["kWh"].resample("h").sum()
         plt.figure(figsize=(12, 6))
         plt.plot(hourly_kwh.index, hourly_kwh.values, label="Hourly Energy Consumption")
         plt.title(
@@ -36,6 +36,18 @@ setup(
     package_dir={"": "src"},
     packages=find_packages(where="src"),
     install_requires=requirements,
+    extras_require={
+        # Faster JSON decoding of large responses
+        "fast": ["orjson>=3.8.0"],
+        # Array exports of the time series (to_numpy, to_pandas)
+        "numpy": ["numpy>=1.21"],
+        "pandas": ["pandas>=2.0"],
+        # Arrow record batches and Parquet export
+        "arrow": ["pyarrow>=14.0"],
+        # HTTP/2 transport, and brotli compressed responses
+        "http2": ["httpx[http2]>=0.24"],
+        "brotli": ["brotli>=1.0"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
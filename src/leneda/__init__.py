@@ -5,13 +5,32 @@ This package provides a client for the Leneda API, which allows access to
 energy consumption and production data for electricity and gas.
 """
 
+# Import the local aggregation
+from .aggregation import aggregate_metering_data
+
+# Import the Arrow and Parquet export
+from .arrow import ParquetExporter, to_record_batch_reader
+
+# Import the bulk fetch types
+from .bulk import MeteringDataRequest, MeteringDataResult
+
+# Import the response cache
+from .cache import CacheTTL, ResponseCache
+
 # Import the client class
 from .client import LenedaClient
 
+# Import the request instrumentation
+from .instrumentation import LatencyAggregator, RequestEvent
+
+# Import the fragment merging
+from .merge import MergePolicy, merge_metering_data
+
 # Import the data models
 from .models import (
     AggregatedMeteringData,
     AggregatedMeteringValue,
+    MeteringColumns,
     MeteringData,
     MeteringValue,
 )
@@ -19,16 +38,69 @@ from .models import (
 # Import the OBIS code constants
 from .obis_codes import ObisCode
 
+# Import the aggregation planner
+from .planner import AggregationPlan, AggregationPlanner
+
+# Import the multi-tenant client pool
+from .pool import LenedaClientPool
+
+# Import the rate limiter
+from .ratelimit import RateLimiter
+
+# Import the retry policy
+from .retry import RetryPolicy
+
+# Import the fair scheduler
+from .scheduling import FairScheduler
+
+# Import the interval store
+from .store import SQLiteIntervalStore
+
+# Import the sync engine
+from .sync import SyncEngine, SyncResult
+
+# Import the blocking client
+from .sync_client import SyncLenedaClient
+
+# Import the HTTP transports
+from .transport import AiohttpTransport, HttpxTransport, InProcessTransport, Transport
+
 # Import the version
 from .version import __version__
 
 # Define what's available when using "from leneda import *"
 __all__ = [
     "LenedaClient",
+    "SyncLenedaClient",
+    "LenedaClientPool",
+    "FairScheduler",
+    "Transport",
+    "AiohttpTransport",
+    "HttpxTransport",
+    "InProcessTransport",
     "ObisCode",
     "MeteringValue",
     "MeteringData",
+    "MeteringColumns",
     "AggregatedMeteringValue",
     "AggregatedMeteringData",
+    "MeteringDataRequest",
+    "MeteringDataResult",
+    "RateLimiter",
+    "RetryPolicy",
+    "ResponseCache",
+    "CacheTTL",
+    "SQLiteIntervalStore",
+    "SyncEngine",
+    "SyncResult",
+    "RequestEvent",
+    "LatencyAggregator",
+    "aggregate_metering_data",
+    "merge_metering_data",
+    "MergePolicy",
+    "AggregationPlanner",
+    "AggregationPlan",
+    "ParquetExporter",
+    "to_record_batch_reader",
     "__version__",
 ]
@@ -0,0 +1,189 @@
+"""
+Local aggregation of time series for the Leneda API client.
+
+This module computes from MeteringData the aggregated series returned by the
+time-series/aggregated endpoint, so that totals of data already at hand need no further API
+request. Buckets follow the local calendar of Luxembourg, like those of the API.
+"""
+
+import logging
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta, tzinfo
+from typing import List, Optional, Tuple
+
+from dateutil import tz
+
+from .models import AggregatedMeteringData, AggregatedMeteringValue, MeteringData
+from .timeutils import from_epoch, parse_duration, to_epoch
+
+# Set up logging
+logger = logging.getLogger("leneda.aggregation")
+
+AGGREGATION_LEVELS = ("Hour", "Day", "Week", "Month", "Infinite")
+TRANSFORMATION_MODES = ("Accumulation",)
+
+# Time zone of the calendar days, weeks and months of the aggregated endpoint
+LOCAL_TIMEZONE = tz.gettz("Europe/Luxembourg")
+
+# Units of the energy accumulated from the power units of time series. Series in other units,
+# such as gas volumes, hold quantities per interval, which are summed as they are.
+ENERGY_UNITS = {"kW": "kWh", "kVAR": "kVARh"}
+
+# A bucket of an aggregation: (start, end) in Unix epoch seconds
+Bucket = Tuple[int, int]
+
+
+def _validate(aggregation_level: str, transformation_mode: str) -> None:
+    """Check an aggregation level and transformation mode of the aggregated endpoint."""
+    if aggregation_level not in AGGREGATION_LEVELS:
+        raise ValueError(
+            f"Unknown aggregation level {aggregation_level!r}, expected one of {AGGREGATION_LEVELS}"
+        )
+    if transformation_mode not in TRANSFORMATION_MODES:
+        raise ValueError(
+            f"Unsupported transformation mode {transformation_mode!r}, "
+            f"expected one of {TRANSFORMATION_MODES}"
+        )
+
+
+def _bucket_start(local: datetime, aggregation_level: str) -> datetime:
+    """Get the local start of the calendar bucket containing a local time."""
+    if aggregation_level == "Hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if aggregation_level == "Week":
+        return day - timedelta(days=day.weekday())
+    if aggregation_level == "Month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket_start(start: datetime, aggregation_level: str) -> datetime:
+    """Get the local start of the calendar bucket following the one starting at start."""
+    if aggregation_level == "Week":
+        return start + timedelta(days=7)
+    if aggregation_level == "Month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    return start + timedelta(days=1)
+
+
+def aggregation_buckets(
+    aggregation_level: str, start: int, end: int, timezone: tzinfo = LOCAL_TIMEZONE
+) -> List[Bucket]:
+    """
+    Get the buckets of an aggregation over a time range.
+
+    Hours are consecutive hours. Days, weeks (starting on Monday) and months follow the local
+    calendar of timezone, so that a day has 23 or 25 hours when daylight saving time changes.
+    The first and last buckets are cut to the range; Infinite has a single bucket.
+
+    Args:
+        aggregation_level: Hour, Day, Week, Month or Infinite
+        start: Start of the range, in Unix epoch seconds
+        end: End of the range, in Unix epoch seconds
+        timezone: Time zone of the calendar
+
+    Returns:
+        The (start, end) buckets covering the range, in Unix epoch seconds
+
+    Raises:
+        ValueError: If the aggregation level is unknown
+    """
+    _validate(aggregation_level, "Accumulation")
+    if end <= start:
+        return []
+    if aggregation_level == "Infinite":
+        return [(start, end)]
+
+    local = _bucket_start(from_epoch(start).astimezone(timezone), aggregation_level)
+    if aggregation_level == "Hour":
+        # Hours have a fixed length, so they are counted in absolute time, which passes the
+        # daylight saving time changes where local times repeat or are skipped
+        boundaries = list(range(to_epoch(local) + 3600, end, 3600))
+    else:
+        boundaries = []
+        local = local.replace(tzinfo=None)
+        while True:
+            local = _next_bucket_start(local, aggregation_level)
+            boundary = to_epoch(local.replace(tzinfo=timezone))
+            if boundary >= end:
+                break
+            boundaries.append(boundary)
+    return list(zip([start] + boundaries, boundaries + [end]))
+
+
+def aggregate_metering_data(
+    data: MeteringData,
+    aggregation_level: str = "Day",
+    transformation_mode: str = "Accumulation",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    timezone: tzinfo = LOCAL_TIMEZONE,
+) -> AggregatedMeteringData:
+    """
+    Aggregate a time series like the time-series/aggregated endpoint.
+
+    With Accumulation, power values (kW, kVAR) are converted to the energy of their interval
+    (kWh, kVARh) and summed per bucket; values in other units are summed as they are. A bucket
+    is calculated if any of its values is. Buckets without values are left out.
+
+    The values must be sorted by start time without duplicates, as returned by the API. The
+    work is done per bucket on slices of the value columns, not per value, so a meter-year of
+    15 minute values aggregates in milliseconds.
+
+    Args:
+        data: The time series
+        aggregation_level: Hour, Day, Week, Month or Infinite
+        transformation_mode: The transformation mode, Accumulation
+        start: Start of the aggregated range (defaults to the first value)
+        end: End of the aggregated range (defaults to the end of the last value)
+        timezone: Time zone of the calendar buckets
+
+    Returns:
+        The aggregated data
+
+    Raises:
+        ValueError: If the aggregation level or transformation mode is not supported, or the
+            interval length of the series cannot be parsed
+    """
+    _validate(aggregation_level, transformation_mode)
+    columns = data.columns
+    timestamps = columns.timestamps
+    values = columns.values
+    calculated = columns.calculated
+    step = int(parse_duration(data.interval_length).total_seconds())
+    unit = ENERGY_UNITS.get(data.unit)
+    # Energy of a power value over its interval, in units per hour
+    factor = step / 3600 if unit is not None else 1.0
+
+    if not len(columns):
+        return AggregatedMeteringData(unit=unit or data.unit)
+    range_start = to_epoch(start) if start is not None else timestamps[0]
+    range_end = to_epoch(end) if end is not None else timestamps[-1] + step
+
+    time_series = []
+    position = bisect_left(timestamps, range_start)
+    # Consecutive buckets share their boundary, whose datetime is reused
+    boundary, boundary_at = range_start, from_epoch(range_start)
+    for bucket_start, bucket_end in aggregation_buckets(
+        aggregation_level, range_start, range_end, timezone
+    ):
+        bucket_end_position = bisect_left(timestamps, bucket_end, position)
+        if bucket_end_position > position:
+            rows = slice(position, bucket_end_position)
+            started_at = boundary_at if bucket_start == boundary else from_epoch(bucket_start)
+            boundary, boundary_at = bucket_end, from_epoch(bucket_end)
+            time_series.append(
+                AggregatedMeteringValue(
+                    value=math.fsum(values[rows]) * factor,
+                    started_at=started_at,
+                    ended_at=boundary_at,
+                    calculated=1 in calculated[rows],
+                )
+            )
+        position = bucket_end_position
+
+    return AggregatedMeteringData(unit=unit or data.unit, aggregated_time_series=time_series)
@@ -0,0 +1,347 @@
+"""
+Apache Arrow and Parquet export of time series.
+
+This module converts MeteringData to Arrow record batches without copying the value columns,
+and writes time series to Parquet files partitioned by metering point, OBIS code and month.
+Series are converted and written one at a time, so exporting a whole fleet only holds a bounded
+number of rows in memory. pyarrow is an optional dependency (pip install leneda-client[arrow]).
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Tuple, Union
+from urllib.parse import quote
+
+from .bulk import MeteringDataResult
+from .models import MeteringData, _import_optional, type_names
+
+# Set up logging
+logger = logging.getLogger("leneda.arrow")
+
+# A time series to export: MeteringData or a result of LenedaClient.fetch_metering_data_bulk
+Series = Union[MeteringData, MeteringDataResult]
+
+# Columns stored in the path of the Parquet files instead of in the files
+PARTITION_COLUMNS = ("metering_point_code", "obis_code", "month")
+
+
+def _pyarrow() -> Any:
+    return _import_optional("pyarrow", "arrow")
+
+
+def metering_data_schema() -> Any:
+    """
+    Get the Arrow schema of the record batches of to_record_batch.
+
+    Returns:
+        A pyarrow.Schema. The start times are UTC timestamps in seconds and the text columns
+        are dictionary-encoded.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    pa = _pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("metering_point_code", text),
+            ("obis_code", text),
+            ("interval_length", text),
+            ("unit", text),
+            ("started_at", pa.timestamp("s", tz="UTC")),
+            ("value", pa.float64()),
+            ("type", text),
+            ("version", pa.int32()),
+            ("calculated", pa.bool_()),
+        ]
+    )
+
+
+def _from_buffer(pa: Any, arrow_type: Any, column: array) -> Any:
+    """Wrap an array of the columns in an Arrow array sharing its memory."""
+    return pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)])
+
+
+def to_record_batch(data: MeteringData) -> Any:
+    """
+    Convert a time series to an Arrow record batch.
+
+    The start time, value and version columns share the memory of data.columns, which cannot
+    grow while the batch exists.
+
+    Args:
+        data: The time series
+
+    Returns:
+        A pyarrow.RecordBatch with the schema of metering_data_schema
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    pa = _pyarrow()
+    schema = metering_data_schema()
+    columns = data.columns
+    count = len(columns)
+
+    def constant(value: str) -> Any:
+        return pa.repeat(pa.scalar(value, schema.field("unit").type), count)
+
+    types = pa.DictionaryArray.from_arrays(
+        _from_buffer(pa, pa.uint16(), columns.types).cast(pa.int32()),
+        pa.array(type_names(), pa.string()),
+    )
+    return pa.RecordBatch.from_arrays(
+        [
+            constant(data.metering_point_code),
+            constant(data.obis_code.value),
+            constant(data.interval_length),
+            constant(data.unit),
+            _from_buffer(pa, pa.timestamp("s", tz="UTC"), columns.timestamps),
+            _from_buffer(pa, pa.float64(), columns.values),
+            types,
+            _from_buffer(pa, pa.int32(), columns.versions),
+            _from_buffer(pa, pa.int8(), columns.calculated).cast(pa.bool_()),
+        ],
+        schema=schema,
+    )
+
+
+def _metering_data(series: Iterable[Series]) -> Iterator[MeteringData]:
+    """Get the time series of MeteringData and bulk results, skipping failed results."""
+    for item in series:
+        if isinstance(item, MeteringDataResult):
+            if not item.ok or item.data is None:
+                logger.warning("Skipping failed request %s: %s", item.request, item.error)
+                continue
+            item = item.data
+        yield item
+
+
+def iter_record_batches(series: Iterable[Series]) -> Iterator[Any]:
+    """
+    Convert time series to Arrow record batches, one series at a time.
+
+    Args:
+        series: MeteringData or results of fetch_metering_data_bulk. Failed results are skipped.
+
+    Yields:
+        A pyarrow.RecordBatch per non-empty series
+    """
+    for data in _metering_data(series):
+        if len(data.columns):
+            yield to_record_batch(data)
+
+
+def to_record_batch_reader(series: Iterable[Series]) -> Any:
+    """
+    Get a pyarrow.RecordBatchReader over time series, converting them as they are read.
+
+    The reader can be passed to any Arrow consumer, e.g. pyarrow.dataset.write_dataset or
+    DuckDB, without holding all series in memory.
+
+    Args:
+        series: MeteringData or results of fetch_metering_data_bulk. Failed results are skipped.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    pa = _pyarrow()
+    return pa.RecordBatchReader.from_batches(metering_data_schema(), iter_record_batches(series))
+
+
+@dataclass
+class _Partition:
+    """The open file and buffered rows of one partition."""
+
+    key: Tuple[str, str, str]  # (metering point code, OBIS code, month)
+    directory: str
+    batches: List[Any] = field(default_factory=list)
+    rows: int = 0
+    writer: Any = None
+
+
+class ParquetExporter:
+    """
+    Writer of time series to Parquet files partitioned by metering point, OBIS code and month.
+
+    The files are laid out as hive partitions, e.g.
+    root/metering_point_code=LU.../obis_code=1-1%3A1.29.0/month=2023-01/part-....parquet, so that
+    pyarrow.dataset.dataset(root, partitioning="hive") reads them back with the partition
+    columns. Months are UTC months.
+
+    Rows are buffered per partition until row_group_size rows are reached, and at most
+    max_open_files partitions are kept open; the least recently written one is flushed and
+    closed when another one is needed. Memory use is therefore bounded by these two settings,
+    whatever the number of series written. A partition written again after being closed gets
+    a new file.
+
+    Example:
+        with ParquetExporter("archive") as exporter:
+            await exporter.write_all_async(client.fetch_metering_data_bulk(requests))
+    """
+
+    def __init__(
+        self,
+        root: str,
+        row_group_size: int = 65536,
+        max_open_files: int = 64,
+        compression: str = "zstd",
+    ):
+        """
+        Initialize the exporter.
+
+        Args:
+            root: Directory of the dataset, created if needed
+            row_group_size: Number of rows buffered per partition before they are written
+            max_open_files: Maximum number of partitions with an open file
+            compression: Parquet compression codec, e.g. "zstd", "snappy" or "none"
+
+        Raises:
+            ValueError: If row_group_size or max_open_files is less than 1
+            ImportError: If pyarrow is not installed
+        """
+        if row_group_size < 1 or max_open_files < 1:
+            raise ValueError("row_group_size and max_open_files must be at least 1")
+        self._pa = _pyarrow()
+        self._pc = _import_optional("pyarrow.compute", "arrow")
+        self._pq = _import_optional("pyarrow.parquet", "arrow")
+        self.root = root
+        self.row_group_size = row_group_size
+        self.max_open_files = max_open_files
+        self.compression = compression
+        self.files: List[str] = []
+        self.rows_written = 0
+        self._run_id = uuid.uuid4().hex[:12]
+        self._partitions: "OrderedDict[Tuple[str, str, str], _Partition]" = OrderedDict()
+        self._file_counts: Dict[Tuple[str, str, str], int] = {}
+
+        # The text columns are stored as plain strings, since Parquet dictionary-encodes them
+        pa = self._pa
+        self.schema = pa.schema(
+            [
+                (
+                    pa.field(column.name, pa.string())
+                    if pa.types.is_dictionary(column.type)
+                    else column
+                )
+                for column in metering_data_schema()
+                if column.name not in PARTITION_COLUMNS
+            ]
+        )
+
+    def __enter__(self) -> "ParquetExporter":
+        """Return the exporter when entering a with block."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the exporter when leaving a with block."""
+        self.close()
+
+    def _file_batch(self, data: MeteringData) -> Any:
+        """Build the record batch of the columns stored in the files."""
+        batch = to_record_batch(data)
+        return self._pa.RecordBatch.from_arrays(
+            [
+                (
+                    batch.column(name).dictionary_decode()
+                    if self._pa.types.is_dictionary(batch.schema.field(name).type)
+                    else batch.column(name)
+                )
+                for name in self.schema.names
+            ],
+            schema=self.schema,
+        )
+
+    def write(self, series: Series) -> None:
+        """
+        Write a time series.
+
+        Args:
+            series: MeteringData or a result of fetch_metering_data_bulk. A failed result is
+                logged and skipped.
+        """
+        for data in _metering_data([series]):
+            if not len(data.columns):
+                continue
+            pa, pc = self._pa, self._pc
+            batch = self._file_batch(data)
+            timestamps = _from_buffer(pa, pa.timestamp("s"), data.columns.timestamps)
+            months = pc.strftime(timestamps, format="%Y-%m")
+            unique_months = pc.unique(months).to_pylist()
+            for month in unique_months:
+                rows = batch
+                if len(unique_months) > 1:
+                    rows = batch.filter(pc.equal(months, month))
+                self._buffer((data.metering_point_code, data.obis_code.value, month), rows)
+
+    def write_all(self, series: Iterable[Series]) -> None:
+        """Write time series one at a time. See write."""
+        for item in series:
+            self.write(item)
+
+    async def write_all_async(self, series: AsyncIterable[Series]) -> None:
+        """
+        Write time series as they arrive, e.g. from fetch_metering_data_bulk.
+
+        The files are written in a worker thread, so the event loop keeps fetching meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        async for item in series:
+            await loop.run_in_executor(None, self.write, item)
+
+    def _buffer(self, key: Tuple[str, str, str], batch: Any) -> None:
+        """Buffer rows of a partition, writing them once row_group_size rows are buffered."""
+        partition = self._partitions.get(key)
+        if partition is None:
+            directory = os.path.join(
+                self.root,
+                *(f"{name}={quote(value, safe='')}" for name, value in zip(PARTITION_COLUMNS, key)),
+            )
+            partition = self._partitions[key] = _Partition(key, directory)
+            while len(self._partitions) > self.max_open_files:
+                _, evicted = self._partitions.popitem(last=False)
+                self._close_partition(evicted)
+        else:
+            self._partitions.move_to_end(key)
+
+        partition.batches.append(batch)
+        partition.rows += batch.num_rows
+        if partition.rows >= self.row_group_size:
+            self._flush(partition)
+
+    def _flush(self, partition: _Partition) -> None:
+        """Write the buffered rows of a partition to its file."""
+        if not partition.rows:
+            return
+        if partition.writer is None:
+            os.makedirs(partition.directory, exist_ok=True)
+            number = self._file_counts.get(partition.key, 0)
+            self._file_counts[partition.key] = number + 1
+            path = os.path.join(partition.directory, f"part-{self._run_id}-{number}.parquet")
+            partition.writer = self._pq.ParquetWriter(
+                path, self.schema, compression=self.compression
+            )
+            self.files.append(path)
+        table = self._pa.Table.from_batches(partition.batches, schema=self.schema)
+        partition.writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows_written += partition.rows
+        partition.batches = []
+        partition.rows = 0
+
+    def _close_partition(self, partition: _Partition) -> None:
+        """Flush and close the file of a partition."""
+        self._flush(partition)
+        if partition.writer is not None:
+            partition.writer.close()
+            partition.writer = None
+
+    def close(self) -> None:
+        """Write the buffered rows and close all files."""
+        while self._partitions:
+            _, partition = self._partitions.popitem(last=False)
+            self._close_partition(partition)
@@ -0,0 +1,153 @@
+"""
+Bulk fetching support for the Leneda API client.
+
+This module provides the job and result types used by LenedaClient.fetch_metering_data_bulk,
+together with the bounded worker pool that runs the jobs and streams their results.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .models import MeteringData
+from .obis_codes import ObisCode
+
+# Set up logging
+logger = logging.getLogger("leneda.bulk")
+
+JobT = TypeVar("JobT")
+ResultT = TypeVar("ResultT")
+
+
+@dataclass(frozen=True)
+class MeteringDataRequest:
+    """A single time series to fetch: one metering point, one OBIS code and one time range."""
+
+    metering_point_code: str
+    obis_code: ObisCode
+    start_date_time: Union[str, datetime]
+    end_date_time: Union[str, datetime]
+
+
+@dataclass
+class MeteringDataResult:
+    """The outcome of a MeteringDataRequest: either the fetched data or the error raised."""
+
+    request: "MeteringDataJob"  # The job as given when it is not a valid request
+    data: Optional[MeteringData] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request succeeded."""
+        return self.error is None
+
+
+MeteringDataJob = Union[
+    MeteringDataRequest,
+    Tuple[str, ObisCode, Union[str, datetime], Union[str, datetime]],
+]
+
+
+def as_metering_data_request(job: MeteringDataJob) -> MeteringDataRequest:
+    """
+    Convert a (metering point, OBIS code, start, end) tuple into a MeteringDataRequest.
+
+    Raises:
+        ValueError: If the job is neither a MeteringDataRequest nor such a tuple
+    """
+    if isinstance(job, MeteringDataRequest):
+        return job
+    try:
+        return MeteringDataRequest(*job)
+    except TypeError as e:
+        raise ValueError(
+            f"Invalid metering data job {job!r}: expected a MeteringDataRequest or a "
+            "(metering point code, OBIS code, start, end) tuple"
+        ) from e
+
+
+@dataclass
+class JobOutcome(Generic[JobT, ResultT]):
+    """The outcome of a single job run by run_bounded."""
+
+    job: JobT
+    result: Optional[ResultT] = None
+    error: Optional[BaseException] = None
+
+
+async def run_bounded(
+    jobs: Iterable[JobT],
+    worker: Callable[[JobT], Awaitable[ResultT]],
+    max_concurrency: int,
+) -> AsyncGenerator[JobOutcome[JobT, ResultT], None]:
+    """
+    Run a worker coroutine over jobs with bounded concurrency, yielding outcomes as they complete.
+
+    Jobs are pulled lazily from the iterable, so only about 2 * max_concurrency jobs are held in
+    memory at any time. Finished outcomes are buffered in a queue of max_concurrency entries:
+    when the consumer stops reading, the workers stop pulling new jobs (backpressure).
+
+    Exceptions raised by the worker are captured in the outcome instead of aborting the run.
+    Closing the generator early cancels the remaining work.
+
+    Args:
+        jobs: The jobs to run
+        worker: Coroutine function that processes a single job
+        max_concurrency: Maximum number of jobs processed at the same time
+
+    Yields:
+        One outcome per job, in completion order
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    job_iterator: Iterator[JobT] = iter(jobs)
+    queue: "asyncio.Queue[Optional[JobOutcome[JobT, ResultT]]]" = asyncio.Queue(max_concurrency)
+
+    iterator_errors: List[Exception] = []
+
+    async def work() -> None:
+        try:
+            for job in job_iterator:
+                try:
+                    outcome = JobOutcome(job, result=await worker(job))
+                except Exception as e:
+                    logger.debug("Bulk job failed: %s", e)
+                    outcome = JobOutcome(job, error=e)
+                await queue.put(outcome)
+        except Exception as e:
+            # The job iterable itself failed; stop this worker and report it to the consumer
+            iterator_errors.append(e)
+        await queue.put(None)
+
+    workers = [asyncio.ensure_future(work()) for _ in range(max_concurrency)]
+    try:
+        remaining = len(workers)
+        while remaining:
+            outcome = await queue.get()
+            if outcome is None:
+                remaining -= 1
+                continue
+            yield outcome
+
+        if iterator_errors:
+            raise iterator_errors[0]
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,234 @@
+"""
+In-memory response cache for the Leneda API client.
+
+This module provides a memory-bounded LRU cache for the parsed responses of the time series
+endpoints. Entries expire after a TTL that depends on the endpoint and on the age of the
+requested data: recent data may still change, historical data does not.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+from dateutil import parser
+
+from .models import AggregatedMeteringData, MeteringData
+from .timeutils import API_DATE_FORMAT, API_DATETIME_FORMAT, to_utc
+
+# Set up logging
+logger = logging.getLogger("leneda.cache")
+
+# Endpoint kinds used to select the TTL of an entry
+TIME_SERIES = "time-series"
+AGGREGATED_TIME_SERIES = "time-series/aggregated"
+
+
+@dataclass
+class CacheTTL:
+    """Time to live of cached responses, depending on how old the requested data is."""
+
+    recent: Optional[float] = 300.0  # Seconds, for ranges ending within the recent period
+    historical: Optional[float] = 24 * 3600.0  # Seconds, for older ranges (None: no expiry)
+    recent_period: timedelta = timedelta(days=2)  # How long data may still be revised
+
+    def for_range_end(self, range_end: Optional[datetime]) -> Optional[float]:
+        """
+        Get the TTL for a request whose time range ends at range_end.
+
+        Args:
+            range_end: End of the requested range, or None if unknown
+
+        Returns:
+            The TTL in seconds, or None if the entry never expires
+        """
+        if range_end is None or range_end > datetime.now(timezone.utc) - self.recent_period:
+            return self.recent
+        return self.historical
+
+
+@dataclass
+class CacheStats:
+    """Counters to size the response cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Entries removed to stay within the size limits
+    expirations: int = 0  # Entries removed because their TTL passed
+
+
+@dataclass
+class _CacheEntry:
+    """A cached response with its expiry time and size."""
+
+    value: Any
+    expires_at: Optional[float]
+    rows: int
+
+    def expired(self, now: float) -> bool:
+        """Whether the TTL of the entry has passed."""
+        return self.expires_at is not None and self.expires_at <= now
+
+
+def _row_count(value: Any) -> int:
+    """Approximate the size of a cached model by its number of rows."""
+    if isinstance(value, MeteringData):
+        return len(value.columns) + 1
+    if isinstance(value, AggregatedMeteringData):
+        return len(value.aggregated_time_series) + 1
+    return 1
+
+
+def _normalize_param(name: str, value: Any) -> Any:
+    """Normalize date parameters, so that equivalent requests share one cache entry."""
+    try:
+        if name in ("startDateTime", "endDateTime"):
+            return to_utc(value).strftime(API_DATETIME_FORMAT)
+        if name in ("startDate", "endDate"):
+            return parser.isoparse(value).strftime(API_DATE_FORMAT)
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def _endpoint_kind(endpoint: str) -> str:
+    """Get the kind of a time series endpoint from its path."""
+    if endpoint.endswith(AGGREGATED_TIME_SERIES):
+        return AGGREGATED_TIME_SERIES
+    return TIME_SERIES
+
+
+class ResponseCache:
+    """
+    LRU cache of parsed time series responses with per-endpoint, age-dependent TTLs.
+
+    The cache is bounded both by its number of entries and by the total number of rows of
+    the cached time series. The least recently used entries are evicted first.
+
+    Cached objects are shared between all callers and should not be modified.
+    """
+
+    DEFAULT_TTLS: Dict[str, CacheTTL] = {
+        TIME_SERIES: CacheTTL(),
+        AGGREGATED_TIME_SERIES: CacheTTL(),
+    }
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_rows: int = 1_000_000,
+        ttls: Optional[Mapping[str, CacheTTL]] = None,
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            max_rows: Maximum total number of time series rows held by the cache
+            ttls: TTLs per endpoint kind ("time-series" and "time-series/aggregated"),
+                overriding the defaults
+        """
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.stats = CacheStats()
+
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._rows = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    @property
+    def rows(self) -> int:
+        """The total number of rows held by the cache."""
+        return self._rows
+
+    @staticmethod
+    def key(endpoint: str, params: Mapping[str, Any]) -> Tuple[Hashable, ...]:
+        """
+        Build the cache key of a request.
+
+        Args:
+            endpoint: The API endpoint
+            params: The query parameters
+
+        Returns:
+            A key that is equal for requests asking for the same data
+        """
+        normalized = tuple(
+            sorted((name, _normalize_param(name, value)) for name, value in params.items())
+        )
+        return (endpoint, normalized)
+
+    def get(self, endpoint: str, params: Mapping[str, Any]) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            endpoint: The API endpoint
+            params: The query parameters
+
+        Returns:
+            The cached parsed response, or None on a miss
+        """
+        key = self.key(endpoint, params)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expired(time.monotonic()):
+            self._remove(key)
+            self.stats.expirations += 1
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value
+
+    def set(self, endpoint: str, params: Mapping[str, Any], value: Any) -> None:
+        """
+        Cache a parsed response.
+
+        Args:
+            endpoint: The API endpoint
+            params: The query parameters
+            value: The parsed response
+        """
+        kind = _endpoint_kind(endpoint)
+        range_end = params.get("endDate" if kind == AGGREGATED_TIME_SERIES else "endDateTime")
+        try:
+            ttl = self.ttls[kind].for_range_end(to_utc(range_end) if range_end else None)
+        except (TypeError, ValueError):
+            ttl = self.ttls[kind].recent
+        if ttl is not None and ttl <= 0:
+            return
+
+        rows = _row_count(value)
+        if rows > self.max_rows:
+            logger.debug("Not caching response of %s rows for %s: too large", rows, endpoint)
+            return
+
+        key = self.key(endpoint, params)
+        if key in self._entries:
+            self._remove(key)
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = _CacheEntry(value, expires_at, rows)
+        self._rows += rows
+
+        while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._entries.clear()
+        self._rows = 0
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry and release its rows."""
+        entry = self._entries.pop(key)
+        self._rows -= entry.rows
@@ -0,0 +1,79 @@
+"""
+JSON decoder backends for the Leneda API client.
+
+This module selects the function used to decode response bodies. The standard library json
+module is always available; orjson and msgspec are used when installed, since they decode
+large time series several times faster.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None  # type: ignore[assignment]
+
+# Set up logging
+logger = logging.getLogger("leneda.decoders")
+
+JsonLoads = Callable[[Union[str, bytes]], Any]
+
+# Backends in order of preference
+JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _msgspec_loads() -> JsonLoads:
+    """Build a loads function on msgspec that raises the errors of the json module."""
+    decode = msgspec.json.Decoder().decode
+
+    def loads(data: Union[str, bytes]) -> Any:
+        try:
+            return decode(data)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), "", 0) from e
+
+    return loads
+
+
+def _available_backends() -> Dict[str, Callable[[], JsonLoads]]:
+    """Get the factories of the loads functions of the installed backends."""
+    backends: Dict[str, Callable[[], JsonLoads]] = {}
+    if orjson is not None:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        backends["orjson"] = lambda: orjson.loads
+    if msgspec is not None:
+        backends["msgspec"] = _msgspec_loads
+    backends["json"] = lambda: json.loads
+    return backends
+
+
+def get_json_loads(backend: Optional[str] = None) -> JsonLoads:
+    """
+    Get the function decoding JSON response bodies.
+
+    Args:
+        backend: "orjson", "msgspec" or "json", or None for the fastest installed backend
+
+    Returns:
+        A function decoding a str or bytes body, raising json.JSONDecodeError on invalid JSON
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    backends = _available_backends()
+    if backend is None:
+        backend = next(name for name in JSON_BACKENDS if name in backends)
+    elif backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend {backend!r}, expected one of {JSON_BACKENDS}")
+    elif backend not in backends:
+        raise ValueError(f"JSON backend {backend!r} is not installed")
+
+    logger.debug("Using the %s JSON backend", backend)
+    return backends[backend]()
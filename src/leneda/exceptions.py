@@ -2,6 +2,10 @@
 Custom exceptions for the Leneda API client.
 """
 
+from typing import Any, Optional
+
+import aiohttp
+
 
 class LenedaException(Exception):
     """Base exception for all Leneda API client exceptions."""
@@ -19,3 +23,28 @@ class ForbiddenException(LenedaException):
     """Raised when access is forbidden (403 Forbidden), typically due to geoblocking or other access restrictions."""
 
     pass
+
+
+class TooManyRequestsException(LenedaException, aiohttp.ClientResponseError):
+    """
+    Raised when the API rate limits the client (429 Too Many Requests).
+
+    It is also an aiohttp.ClientResponseError with status 429, as raised for this status before,
+    so that handlers catching aiohttp.ClientError still match.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        retry_after: Optional[float] = None,
+        request_info: Optional[aiohttp.RequestInfo] = None,
+        headers: Any = None,
+    ):
+        aiohttp.ClientResponseError.__init__(
+            self, request_info, (), status=429, message=message, headers=headers  # type: ignore
+        )
+        self.args = (message,)
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return self.message
@@ -0,0 +1,316 @@
+"""
+Request instrumentation for the Leneda API client.
+
+This module provides the events the client reports for each API request, with the time spent
+in each phase of the request, and an in-memory aggregator turning them into latency histograms
+per endpoint. Observers are registered on the client with add_observer.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import aiohttp
+
+from .decoders import JsonLoads
+
+# Set up logging
+logger = logging.getLogger("leneda.instrumentation")
+
+# Phases of a request, reported in seconds by RequestEvent
+PHASES = (
+    "total",
+    "queue_wait",
+    "connection_acquire",
+    "ttfb",
+    "download",
+    "decode",
+    "model_build",
+)
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+@dataclass
+class RequestEvent:
+    """
+    Timings and outcome of one API request, including its retries.
+
+    The phase timings are those of the last attempt. connection_acquire is only known for
+    sessions created by the client, which trace their connections; it is None otherwise.
+    """
+
+    method: str
+    endpoint: str  # Endpoint path with the metering point code replaced by a placeholder
+    status: Optional[int] = None
+    retries: int = 0
+    queue_wait: float = 0.0  # Waiting for the rate limiter, summed over all attempts
+    connection_acquire: Optional[float] = None  # Pool wait, DNS and connect, or reuse
+    ttfb: Optional[float] = None  # From connection (or request start) to the response headers
+    download: float = 0.0  # Reading the response body
+    decode: float = 0.0  # Decoding the JSON body
+    model_build: float = 0.0  # Building the model from the decoded JSON
+    bytes_received: int = 0  # Size of the response body
+    total: float = 0.0
+    error: Optional[BaseException] = None
+
+    started: float = field(default_factory=time.perf_counter, repr=False, compare=False)
+    request_started: Optional[float] = field(default=None, repr=False, compare=False)
+    connected: Optional[float] = field(default=None, repr=False, compare=False)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request succeeded."""
+        return self.error is None
+
+    def start_attempt(self) -> None:
+        """Reset the timings of the previous attempt when a new attempt starts."""
+        self.request_started = time.perf_counter()
+        self.connected = None
+        self.connection_acquire = None
+        self.ttfb = None
+        self.download = self.decode = 0.0
+        self.bytes_received = 0
+
+    def response_received(self, status: int) -> None:
+        """Record the arrival of the response headers."""
+        now = time.perf_counter()
+        self.status = status
+        self.ttfb = now - (self.connected or self.request_started or now)
+
+    def timed_loads(self, loads: JsonLoads) -> JsonLoads:
+        """Wrap a JSON decoder so that it records the decode time."""
+
+        def decode(data: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return loads(data)
+            finally:
+                self.decode = time.perf_counter() - started
+
+        return decode
+
+    def finish(self) -> None:
+        """Record the end of the request."""
+        self.total = time.perf_counter() - self.started
+
+
+RequestObserver = Callable[[RequestEvent], None]
+
+# Event of the request being made by the current task, shared by the layers of the client
+current_request_event: ContextVar[Optional[RequestEvent]] = ContextVar(
+    "leneda_request_event", default=None
+)
+
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    Get the label of an endpoint, without the metering point code.
+
+    Args:
+        endpoint: The endpoint path, e.g. "metering-points/LU0000.../time-series"
+
+    Returns:
+        The label, e.g. "metering-points/{meteringPointCode}/time-series"
+    """
+    parts = endpoint.split("/")
+    if len(parts) > 1 and parts[0] == "metering-points":
+        parts[1] = "{meteringPointCode}"
+    return "/".join(parts)
+
+
+def _event_of(trace_config_ctx: SimpleNamespace) -> Optional[RequestEvent]:
+    """Get the RequestEvent a traced request was made for."""
+    event = trace_config_ctx.trace_request_ctx
+    return event if isinstance(event, RequestEvent) else None
+
+
+async def _on_connection_ready(
+    session: Any, trace_config_ctx: SimpleNamespace, params: Any
+) -> None:
+    event = _event_of(trace_config_ctx)
+    if event is not None and event.request_started is not None:
+        event.connected = time.perf_counter()
+        event.connection_acquire = event.connected - event.request_started
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """
+    Create the aiohttp trace config filling in the connection details of events.
+
+    Requests are matched to their event through the trace_request_ctx argument of the request.
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(_on_connection_ready)
+    trace_config.on_connection_reuseconn.append(_on_connection_ready)
+    return trace_config
+
+
+class LatencyHistogram:
+    """Histogram of durations with fixed bucket bounds."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            bounds: Increasing upper bounds of the buckets, in seconds. Longer durations are
+                counted in an overflow bucket.
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a duration."""
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        """The mean duration, or 0 if nothing was recorded."""
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+
+        Args:
+            q: The quantile, between 0 and 1 (e.g. 0.99 for p99)
+
+        Returns:
+            The estimated duration, or 0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / count, self.max)
+            cumulative += count
+        return self.max
+
+
+@dataclass
+class EndpointStats:
+    """Request statistics of one endpoint."""
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    latencies: Dict[str, LatencyHistogram] = field(default_factory=dict)
+
+
+class LatencyAggregator:
+    """
+    Observer aggregating request events into latency histograms per endpoint.
+
+    Example:
+        aggregator = LatencyAggregator()
+        client.add_observer(aggregator)
+        ...
+        print(aggregator.summary())
+    """
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the aggregator.
+
+        Args:
+            bounds: Upper bounds of the histogram buckets, in seconds
+        """
+        self.bounds = tuple(bounds)
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        """Record a request event."""
+        stats = self.endpoints.get(event.endpoint)
+        if stats is None:
+            stats = self.endpoints[event.endpoint] = EndpointStats()
+        stats.requests += 1
+        stats.errors += 0 if event.ok else 1
+        stats.retries += event.retries
+        stats.bytes_received += event.bytes_received
+        if event.status is not None:
+            stats.statuses[event.status] = stats.statuses.get(event.status, 0) + 1
+        for phase in PHASES:
+            seconds = getattr(event, phase)
+            if seconds is not None:
+                histogram = stats.latencies.get(phase)
+                if histogram is None:
+                    histogram = stats.latencies[phase] = LatencyHistogram(self.bounds)
+                histogram.observe(seconds)
+
+    def reset(self) -> None:
+        """Forget all recorded events."""
+        self.endpoints.clear()
+
+    def summary(self, quantiles: Sequence[float] = (0.5, 0.9, 0.99)) -> Dict[str, Any]:
+        """
+        Summarize the recorded events.
+
+        Args:
+            quantiles: The quantiles to estimate for each phase
+
+        Returns:
+            Per endpoint, the counters and, per phase, the count, mean, max and quantiles in
+            seconds (keys such as "p50" and "p99")
+        """
+        summary: Dict[str, Any] = {}
+        for endpoint, stats in self.endpoints.items():
+            phases: Dict[str, Dict[str, float]] = {}
+            for phase, histogram in stats.latencies.items():
+                phases[phase] = {
+                    "count": histogram.count,
+                    "mean": histogram.mean,
+                    "max": histogram.max,
+                    **{f"p{q * 100:g}": histogram.quantile(q) for q in quantiles},
+                }
+            summary[endpoint] = {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "retries": stats.retries,
+                "bytes_received": stats.bytes_received,
+                "statuses": dict(stats.statuses),
+                "latencies": phases,
+            }
+        return summary
+
+
+def notify_observers(observers: List[RequestObserver], event: RequestEvent) -> None:
+    """Pass an event to observers, logging instead of raising their errors."""
+    for observer in observers:
+        try:
+            observer(event)
+        except Exception:
+            logger.exception("Request observer %r failed", observer)
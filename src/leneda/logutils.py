@@ -0,0 +1,78 @@
+"""
+Logging helpers for the Leneda API client.
+
+This module provides payload logging that costs nothing while debug logging is disabled and
+stays cheap while it is enabled: payloads are only logged for a sample of the requests, and
+only their first characters are ever serialized.
+"""
+
+import json
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any
+
+_ENCODER = json.JSONEncoder(default=str)
+
+# Default maximum number of characters logged per payload
+PAYLOAD_LOG_MAX_CHARS = 2048
+
+
+class TruncatedPayload:
+    """
+    A payload that is serialized to JSON only when it is formatted, up to max_chars.
+
+    Passed as a %-style logging argument, the payload is not serialized at all unless the
+    record is emitted. Serialization stops as soon as max_chars characters are produced, so
+    logging a large time series costs no more than logging a small one.
+    """
+
+    __slots__ = ("payload", "max_chars")
+
+    def __init__(self, payload: Any, max_chars: int):
+        """
+        Initialize the payload.
+
+        Args:
+            payload: The JSON-serializable payload
+            max_chars: Maximum number of characters of the formatted payload
+        """
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        """Serialize the payload, truncated to max_chars characters."""
+        chunks = []
+        size = 0
+        # iterencode produces the JSON lazily, so the rest of the payload is never encoded
+        for chunk in _ENCODER.iterencode(self.payload):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_chars:
+                return "".join(chunks)[: self.max_chars] + "... (truncated)"
+        return "".join(chunks)
+
+    __repr__ = __str__
+
+
+@dataclass
+class PayloadLogging:
+    """Sampling and size limit of the request and response payloads logged at debug level."""
+
+    sample_rate: float = 0.1  # Fraction of the requests whose payloads are logged
+    max_chars: int = PAYLOAD_LOG_MAX_CHARS  # Maximum number of characters logged per payload
+
+    def log(self, logger: logging.Logger, label: str, payload: Any) -> None:
+        """
+        Log a payload at debug level, if debug logging is enabled and the request is sampled.
+
+        Args:
+            logger: The logger to log to
+            label: Description of the payload, e.g. "Response data"
+            payload: The JSON-serializable payload
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        logger.debug("%s: %s", label, TruncatedPayload(payload, self.max_chars))
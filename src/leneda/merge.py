@@ -0,0 +1,173 @@
+"""
+Merging of overlapping time series fragments.
+
+This module combines MeteringData fragments of one series, such as the chunks of a split
+request, re-polls of recent days and cached data, into one series with a single value per
+interval. Intervals present in several fragments keep the highest version.
+"""
+
+import heapq
+import logging
+import operator
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import MeteringColumns, MeteringData, type_code
+
+# Set up logging
+logger = logging.getLogger("leneda.merge")
+
+
+@dataclass(frozen=True)
+class MergePolicy:
+    """
+    Choice between the values of an interval present in several fragments.
+
+    The highest version always wins. Between values of the same version, the calculated flag
+    is compared first, then the type, and last the position of the fragment.
+    """
+
+    prefer_measured: bool = True  # Prefer values that are not calculated
+    type_priority: Tuple[str, ...] = ()  # Preferred types first, e.g. ("Actual", "Corrected")
+    prefer_later: bool = True  # Prefer the value of the fragment that comes later in the list
+
+
+def merge_metering_data(
+    fragments: Sequence[MeteringData], policy: Optional[MergePolicy] = None
+) -> MeteringData:
+    """
+    Merge fragments of a time series into one, keeping one value per interval.
+
+    The fragments are merged in a single pass over their columns. Runs of intervals found in
+    only one fragment, such as the chunks of a split request, are copied as whole array slices;
+    only intervals present in several fragments are compared one by one.
+
+    Args:
+        fragments: Fragments of the same series, in the order given to
+            MergePolicy.prefer_later (e.g. oldest fetch first). Fragments that are not sorted by
+            start time are sorted first.
+        policy: How to choose between values of the same interval (defaults to MergePolicy())
+
+    Returns:
+        The merged series, with the metadata of the first fragment holding values
+
+    Raises:
+        ValueError: If there are no fragments, they belong to different series, or one of them
+            holds an interval twice
+    """
+    if not fragments:
+        raise ValueError("No fragments to merge")
+    policy = policy or MergePolicy()
+    first = next((fragment for fragment in fragments if fragment.columns), fragments[0])
+    series = (first.metering_point_code, first.obis_code)
+    for fragment in fragments:
+        if fragment.columns and (fragment.metering_point_code, fragment.obis_code) != series:
+            raise ValueError(
+                f"Cannot merge {fragment.metering_point_code} {fragment.obis_code.value} "
+                f"into {series[0]} {series[1].value}"
+            )
+
+    columns = [_sorted_columns(fragment) for fragment in fragments]
+    merged = MeteringColumns()
+    # Ranks of the types in the priority list; other types rank after all of them
+    type_ranks: Dict[int, int] = {
+        type_code(name): rank for rank, name in enumerate(policy.type_priority)
+    }
+    unranked = len(policy.type_priority)
+
+    def preference(index: int, position: int) -> Tuple[int, int, int, int]:
+        """Sort key of a candidate value; the largest one is kept."""
+        column = columns[index]
+        calculated = column.calculated[position]
+        return (
+            column.versions[position],
+            -calculated if policy.prefer_measured else 0,
+            -type_ranks.get(column.types[position], unranked),
+            index if policy.prefer_later else -index,
+        )
+
+    # Heap of the next interval of each fragment, as (start time, fragment index)
+    positions = [0] * len(columns)
+    heap = [(column.timestamps[0], index) for index, column in enumerate(columns) if column]
+    heapq.heapify(heap)
+    duplicates = 0
+    while heap:
+        timestamp, index = heapq.heappop(heap)
+        column = columns[index]
+        start = positions[index]
+        if not heap or timestamp < heap[0][0]:
+            # Copy the run of values before the next interval of any other fragment
+            end = bisect_left(column.timestamps, heap[0][0], start) if heap else len(column)
+            _extend(merged, column, start, end)
+            _advance(heap, positions, columns, index, end)
+            continue
+
+        # The interval is present in several fragments: keep the preferred value
+        candidates = [index]
+        while heap and heap[0][0] == timestamp:
+            candidates.append(heapq.heappop(heap)[1])
+        duplicates += len(candidates) - 1
+        best = max(candidates, key=lambda candidate: preference(candidate, positions[candidate]))
+        merged.append(*columns[best].row(positions[best]))
+        for candidate in candidates:
+            _advance(heap, positions, columns, candidate, positions[candidate] + 1)
+
+    logger.debug(
+        "Merged %s fragments into %s values (%s duplicates)",
+        len(fragments),
+        len(merged),
+        duplicates,
+    )
+    return MeteringData(
+        metering_point_code=first.metering_point_code,
+        obis_code=first.obis_code,
+        interval_length=first.interval_length,
+        unit=first.unit,
+        columns=merged,
+    )
+
+
+def _sorted_columns(fragment: MeteringData) -> MeteringColumns:
+    """
+    Get the columns of a fragment sorted by start time, as they usually already are.
+
+    Raises:
+        ValueError: If the fragment holds an interval twice
+    """
+    columns = fragment.columns
+    timestamps = columns.timestamps
+    if not any(map(operator.ge, timestamps, islice(timestamps, 1, None))):
+        return columns
+
+    columns = columns.take(sorted(range(len(columns)), key=timestamps.__getitem__))
+    timestamps = columns.timestamps
+    if any(map(operator.eq, timestamps, islice(timestamps, 1, None))):
+        raise ValueError(
+            f"Fragment of {fragment.metering_point_code} {fragment.obis_code.value} holds an "
+            "interval twice"
+        )
+    return columns
+
+
+def _extend(merged: MeteringColumns, fragment: MeteringColumns, start: int, end: int) -> None:
+    """Append the rows start to end of a fragment."""
+    merged.values.extend(fragment.values[start:end])
+    merged.timestamps.extend(fragment.timestamps[start:end])
+    merged.types.extend(fragment.types[start:end])
+    merged.versions.extend(fragment.versions[start:end])
+    merged.calculated.extend(fragment.calculated[start:end])
+
+
+def _advance(
+    heap: List[Tuple[int, int]],
+    positions: List[int],
+    columns: List[MeteringColumns],
+    index: int,
+    position: int,
+) -> None:
+    """Move a fragment to a position, putting its next interval back on the heap."""
+    positions[index] = position
+    if position < len(columns[index]):
+        heapq.heappush(heap, (columns[index].timestamps[position], index))
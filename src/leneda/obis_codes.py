@@ -7,7 +7,7 @@ making it easier to reference the correct codes when retrieving energy data.
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -153,6 +153,21 @@ OBIS_CODES: Dict[str, ObisCodeInfo] = {
     ),
 }
 
+# Sharing-layer codes mapped to the measured code they are derived from. A metering point
+# that has no data for the base code cannot have data for any of its sharing layers.
+SHARING_LAYER_BASE_CODES: Dict[ObisCode, ObisCode] = {
+    ObisCode.ELEC_CONSUMPTION_COVERED_LAYER1: ObisCode.ELEC_CONSUMPTION_ACTIVE,
+    ObisCode.ELEC_CONSUMPTION_COVERED_LAYER2: ObisCode.ELEC_CONSUMPTION_ACTIVE,
+    ObisCode.ELEC_CONSUMPTION_COVERED_LAYER3: ObisCode.ELEC_CONSUMPTION_ACTIVE,
+    ObisCode.ELEC_CONSUMPTION_COVERED_LAYER4: ObisCode.ELEC_CONSUMPTION_ACTIVE,
+    ObisCode.ELEC_CONSUMPTION_REMAINING: ObisCode.ELEC_CONSUMPTION_ACTIVE,
+    ObisCode.ELEC_PRODUCTION_SHARED_LAYER1: ObisCode.ELEC_PRODUCTION_ACTIVE,
+    ObisCode.ELEC_PRODUCTION_SHARED_LAYER2: ObisCode.ELEC_PRODUCTION_ACTIVE,
+    ObisCode.ELEC_PRODUCTION_SHARED_LAYER3: ObisCode.ELEC_PRODUCTION_ACTIVE,
+    ObisCode.ELEC_PRODUCTION_SHARED_LAYER4: ObisCode.ELEC_PRODUCTION_ACTIVE,
+    ObisCode.ELEC_PRODUCTION_REMAINING: ObisCode.ELEC_PRODUCTION_ACTIVE,
+}
+
 
 def get_obis_info(obis_code: str) -> ObisCodeInfo:
     """
@@ -196,6 +211,23 @@ def get_unit(obis_code: str) -> str:
     return OBIS_CODES[obis_code].unit
 
 
+def get_base_obis_code(obis_code: ObisCode) -> Optional[ObisCode]:
+    """
+    Get the measured OBIS code a sharing-layer OBIS code is derived from.
+
+    Args:
+        obis_code: The OBIS code to look up
+
+    Returns:
+        The base OBIS code, or None if the OBIS code is not a sharing-layer code
+
+    Example:
+        >>> get_base_obis_code(ObisCode.ELEC_CONSUMPTION_COVERED_LAYER1)
+        <ObisCode.ELEC_CONSUMPTION_ACTIVE: '1-1:1.29.0'>
+    """
+    return SHARING_LAYER_BASE_CODES.get(obis_code)
+
+
 def list_all_obis_codes() -> List[ObisCodeInfo]:
     """
     Get a list of all OBIS codes and their information.
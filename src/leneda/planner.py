@@ -0,0 +1,303 @@
+"""
+Query planning for aggregated time series.
+
+This module provides a planner in front of the time-series/aggregated endpoint. Buckets whose
+raw values are already held in memory or in the interval store are aggregated locally, and only
+the remaining buckets are requested from the API.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, tzinfo
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from .aggregation import LOCAL_TIMEZONE, Bucket, aggregate_metering_data, aggregation_buckets
+from .models import AggregatedMeteringData, AggregatedMeteringValue, MeteringData
+from .obis_codes import ObisCode
+from .store import SQLiteIntervalStore
+from .timeutils import API_DATE_FORMAT, from_epoch, parse_duration, to_epoch
+
+if TYPE_CHECKING:
+    from .client import LenedaClient
+
+# Set up logging
+logger = logging.getLogger("leneda.planner")
+
+SeriesKey = Tuple[str, ObisCode]
+
+# Paths of a planned request: all buckets computed locally, some of them, or none
+LOCAL = "local"
+PARTIAL = "partial"
+REMOTE = "remote"
+
+
+@dataclass
+class AggregationPlan:
+    """How a request for aggregated data was answered."""
+
+    path: str  # LOCAL, PARTIAL or REMOTE
+    local_buckets: int = 0  # Buckets aggregated from raw values
+    remote_buckets: int = 0  # Buckets requested from the API
+    sources: List[str] = field(default_factory=list)  # Sources of the raw values: memory, store
+    requests: List[Tuple[str, str]] = field(default_factory=list)  # (startDate, endDate) fetched
+
+
+@dataclass
+class PlannedAggregation:
+    """The aggregated data of a request, together with the plan that produced it."""
+
+    data: AggregatedMeteringData
+    plan: AggregationPlan
+
+
+def _to_date(value: Union[str, date]) -> date:
+    """Get the date of a startDate/endDate argument."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+class AggregationPlanner:
+    """
+    Planner answering aggregated requests from raw values held locally where possible.
+
+    The raw values can come from MeteringData added to the planner with add and from the
+    interval store of the client. A bucket is aggregated locally when one of them covers every
+    interval of the bucket; consecutive buckets that are not covered are fetched together from
+    the aggregated endpoint. The result is the same as that of the endpoint, see
+    aggregate_metering_data.
+
+    Example:
+        planner = AggregationPlanner(client)
+        planner.add(await client.get_metering_data(metering_point, obis_code, start, end))
+        result = await planner.get_aggregated_metering_data(
+            metering_point, obis_code, "2025-01-01", "2025-03-31", aggregation_level="Month"
+        )
+        print(result.plan.path)
+    """
+
+    def __init__(
+        self,
+        client: "LenedaClient",
+        store: Optional[SQLiteIntervalStore] = None,
+        timezone: tzinfo = LOCAL_TIMEZONE,
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            client: The client used to fetch the buckets that are not covered locally
+            store: The interval store to read raw values from (defaults to the store of client)
+            timezone: Time zone of the calendar dates and buckets
+        """
+        self.client = client
+        self.store = store if store is not None else client.store
+        self.timezone = timezone
+        self.series: Dict[SeriesKey, List[MeteringData]] = {}
+
+    def add(self, data: MeteringData) -> None:
+        """
+        Make raw values held in memory available to the planner.
+
+        Args:
+            data: Time series sorted by start time without duplicates, as returned by the API
+        """
+        if len(data.columns):
+            key = (data.metering_point_code, data.obis_code)
+            self.series.setdefault(key, []).append(data)
+
+    def remove(self, metering_point_code: str, obis_code: ObisCode) -> None:
+        """Forget the raw values of a series added with add."""
+        self.series.pop((metering_point_code, obis_code), None)
+
+    @staticmethod
+    def _covers(data: MeteringData, bucket: Bucket) -> bool:
+        """Check whether a series holds a value for every interval of a bucket."""
+        step = int(parse_duration(data.interval_length).total_seconds())
+        start, end = bucket
+        if step <= 0 or (end - start) % step:
+            return False
+        timestamps = data.columns.timestamps
+        count = bisect_left(timestamps, end) - bisect_left(timestamps, start)
+        return count == (end - start) // step
+
+    async def _store_data(
+        self,
+        metering_point_code: str,
+        obis_code: ObisCode,
+        buckets: List[Bucket],
+    ) -> Tuple[Optional[MeteringData], List[bool]]:
+        """Load the stored values of the buckets and find the buckets they cover."""
+        store = self.store
+        if store is None or not buckets:
+            return None, [False] * len(buckets)
+        start, end = from_epoch(buckets[0][0]), from_epoch(buckets[-1][1])
+        gaps = [
+            (to_epoch(gap_start), to_epoch(gap_end))
+            for gap_start, gap_end in await store.missing_ranges(
+                metering_point_code, obis_code, start, end
+            )
+        ]
+        covered = [
+            not any(
+                gap_start < bucket_end and gap_end > bucket_start for gap_start, gap_end in gaps
+            )
+            for bucket_start, bucket_end in buckets
+        ]
+        if not any(covered):
+            return None, covered
+        # The end of load is inclusive
+        data = await store.load(metering_point_code, obis_code, start, end - timedelta(seconds=1))
+        if data is None:
+            return None, [False] * len(buckets)
+        return data, covered
+
+    async def get_aggregated_metering_data(
+        self,
+        metering_point_code: str,
+        obis_code: ObisCode,
+        start_date: Union[str, date],
+        end_date: Union[str, date],
+        aggregation_level: str = "Day",
+        transformation_mode: str = "Accumulation",
+    ) -> PlannedAggregation:
+        """
+        Get aggregated time series data, computing locally what the raw values held cover.
+
+        Args:
+            metering_point_code: The metering point code
+            obis_code: The OBIS code
+            start_date: First day (ISO format string, date or datetime)
+            end_date: Last day, inclusive (ISO format string, date or datetime)
+            aggregation_level: Aggregation level (Hour, Day, Week, Month, Infinite)
+            transformation_mode: Transformation mode (Accumulation)
+
+        Returns:
+            The aggregated data and the plan that produced it
+
+        Raises:
+            ValueError: If the aggregation level or transformation mode is not supported
+        """
+        first_day = datetime.combine(_to_date(start_date), datetime.min.time())
+        after_last_day = datetime.combine(_to_date(end_date), datetime.min.time())
+        buckets = aggregation_buckets(
+            aggregation_level,
+            to_epoch(first_day.replace(tzinfo=self.timezone)),
+            to_epoch((after_last_day + timedelta(days=1)).replace(tzinfo=self.timezone)),
+            self.timezone,
+        )
+
+        # Find a local source for each bucket, preferring values in memory
+        sources: List[Optional[MeteringData]] = [None] * len(buckets)
+        for data in self.series.get((metering_point_code, obis_code), ()):
+            for index, bucket in enumerate(buckets):
+                if sources[index] is None and self._covers(data, bucket):
+                    sources[index] = data
+        plan = AggregationPlan(path=REMOTE)
+        if any(source is not None for source in sources):
+            plan.sources.append("memory")
+        uncovered = [bucket for bucket, source in zip(buckets, sources) if source is None]
+        stored, covered = await self._store_data(metering_point_code, obis_code, uncovered)
+        if stored is not None:
+            plan.sources.append("store")
+            stored_buckets = {bucket for bucket, ok in zip(uncovered, covered) if ok}
+            sources = [
+                stored if source is None and bucket in stored_buckets else source
+                for bucket, source in zip(buckets, sources)
+            ]
+
+        # Aggregate consecutive buckets of the same source at once, and fetch the others
+        items: List[AggregatedMeteringValue] = []
+        units: List[Optional[str]] = []
+        fetches = []
+        run_start = 0
+        for index in range(1, len(buckets) + 1):
+            if index < len(buckets) and sources[index] is sources[run_start]:
+                continue
+            source = sources[run_start]
+            run = (buckets[run_start][0], buckets[index - 1][1])
+            if source is not None:
+                aggregated = aggregate_metering_data(
+                    source,
+                    aggregation_level,
+                    transformation_mode,
+                    from_epoch(run[0]),
+                    from_epoch(run[1]),
+                    self.timezone,
+                )
+                items.extend(aggregated.aggregated_time_series)
+                units.append(aggregated.unit)
+                plan.local_buckets += index - run_start
+            else:
+                fetches.append(
+                    self._fetch_run(
+                        metering_point_code,
+                        obis_code,
+                        run,
+                        aggregation_level,
+                        transformation_mode,
+                        plan,
+                    )
+                )
+                plan.remote_buckets += index - run_start
+            run_start = index
+
+        for remote_items, unit in await asyncio.gather(*fetches):
+            items.extend(remote_items)
+            units.append(unit)
+
+        if plan.local_buckets and plan.remote_buckets:
+            plan.path = PARTIAL
+        elif plan.local_buckets or not buckets:
+            plan.path = LOCAL
+        logger.debug(
+            "Aggregated %s %s %s: %s (%s local, %s remote buckets)",
+            metering_point_code,
+            obis_code.value,
+            aggregation_level,
+            plan.path,
+            plan.local_buckets,
+            plan.remote_buckets,
+        )
+
+        # The API gives no unit for series without data
+        unit = next((unit for unit in units if unit is not None), None)
+        items.sort(key=lambda item: item.started_at)
+        return PlannedAggregation(
+            AggregatedMeteringData(unit=unit, aggregated_time_series=items),  # type: ignore[arg-type]
+            plan,
+        )
+
+    async def _fetch_run(
+        self,
+        metering_point_code: str,
+        obis_code: ObisCode,
+        run: Bucket,
+        aggregation_level: str,
+        transformation_mode: str,
+        plan: AggregationPlan,
+    ) -> Tuple[List[AggregatedMeteringValue], Optional[str]]:
+        """Fetch consecutive buckets from the API, keeping only the buckets of the run."""
+        start_date = from_epoch(run[0]).astimezone(self.timezone).strftime(API_DATE_FORMAT)
+        end_date = from_epoch(run[1] - 1).astimezone(self.timezone).strftime(API_DATE_FORMAT)
+        plan.requests.append((start_date, end_date))
+        data = await self.client.get_aggregated_metering_data(
+            metering_point_code,
+            obis_code,
+            start_date,
+            end_date,
+            aggregation_level=aggregation_level,
+            transformation_mode=transformation_mode,
+        )
+        # The API returns whole days; buckets outside the run are aggregated locally
+        run_start, run_end = from_epoch(run[0]), from_epoch(run[1])
+        items = [
+            item
+            for item in data.aggregated_time_series
+            if item.started_at < run_end and item.ended_at > run_start
+        ]
+        return items, data.unit
@@ -0,0 +1,189 @@
+"""
+Multi-tenant client pool for the Leneda API.
+
+This module provides a pool holding a LenedaClient per tenant (energy ID and API key) that
+sends the requests of all tenants over one shared connection pool. Each tenant has its own
+concurrency limit and optional rate limiter, and a FairScheduler shares the request slots
+between the tenants in turn.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+from .client import LenedaClient, _discard_session, create_session
+from .ratelimit import RateLimiter
+from .scheduling import FairScheduler
+
+# Set up logging
+logger = logging.getLogger("leneda.pool")
+
+
+class _PooledClient(LenedaClient):
+    """Client of one tenant of a LenedaClientPool, using the session of the pool."""
+
+    def __init__(self, pool: "LenedaClientPool", *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.pool = pool
+        self._owns_session = False
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session shared by all tenants of the pool."""
+        return await self.pool._get_session()
+
+    async def close(self) -> None:
+        """Do nothing; the shared session is closed with the pool."""
+
+
+class LenedaClientPool:
+    """
+    Pool of clients for many tenants sharing one connection pool.
+
+    Every tenant gets its own LenedaClient with its credentials, concurrency limit and rate
+    limiter. All requests go through one aiohttp session, and at most max_concurrency of them
+    are in flight at once; free slots go to the waiting tenants in turn, so a backfill of a
+    large tenant cannot starve the others.
+
+    Example:
+        async with LenedaClientPool(max_concurrency=32) as pool:
+            pool.add_tenant("home", api_key, energy_id, max_concurrency=4)
+            data = await pool.client("home").get_metering_data(...)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        tenant_max_concurrency: Optional[int] = None,
+        timeout: Optional[ClientTimeout] = None,
+        connector_limit: int = LenedaClient.DEFAULT_CONNECTOR_LIMIT,
+        connector_limit_per_host: int = LenedaClient.DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+        keepalive_timeout: float = LenedaClient.DEFAULT_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: Optional[int] = LenedaClient.DEFAULT_DNS_CACHE_TTL,
+        **client_options: Any,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight over all tenants
+            tenant_max_concurrency: Default maximum number of requests in flight per tenant
+                (defaults to max_concurrency)
+            timeout: Request timeout configuration (defaults to LenedaClient.DEFAULT_TIMEOUT)
+            connector_limit: Maximum number of simultaneous connections of the shared pool
+            connector_limit_per_host: Maximum number of simultaneous connections per host
+                (0 means no per-host limit)
+            keepalive_timeout: Seconds an idle connection is kept open for reuse
+            dns_cache_ttl: Seconds resolved host names are cached (None caches forever)
+            **client_options: Default options of the clients of the tenants, see LenedaClient
+
+        Raises:
+            ValueError: If max_concurrency is smaller than 1
+        """
+        self.scheduler = FairScheduler(max_concurrency)
+        self.tenant_max_concurrency = tenant_max_concurrency
+        self.timeout = timeout or LenedaClient.DEFAULT_TIMEOUT
+        self.connector_limit = connector_limit
+        self.connector_limit_per_host = connector_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.client_options = client_options
+        self.clients: Dict[str, LenedaClient] = {}
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "LenedaClientPool":
+        """Open the shared session when entering an async context."""
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the shared session when leaving an async context."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the session shared by the clients of all tenants."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+
+        await _discard_session(self._session, self._session_loop)
+        self._session = create_session(
+            timeout=self.timeout,
+            connector_limit=self.connector_limit,
+            connector_limit_per_host=self.connector_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            dns_cache_ttl=self.dns_cache_ttl,
+        )
+        self._session_loop = loop
+        logger.debug("Created shared HTTP session")
+        return self._session
+
+    def add_tenant(
+        self,
+        tenant_id: str,
+        api_key: str,
+        energy_id: str,
+        max_concurrency: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        **client_options: Any,
+    ) -> LenedaClient:
+        """
+        Add a tenant to the pool, or replace the credentials of an existing one.
+
+        Args:
+            tenant_id: The identifier of the tenant in the pool
+            api_key: The API key of the tenant
+            energy_id: The energy ID of the tenant
+            max_concurrency: Maximum number of requests of the tenant in flight at once
+                (defaults to tenant_max_concurrency of the pool)
+            rate_limiter: Optional rate limiter of the tenant
+            **client_options: Options of the client of the tenant, overriding those of the pool
+
+        Returns:
+            The client of the tenant
+        """
+        queue = self.scheduler.tenant(tenant_id, max_concurrency or self.tenant_max_concurrency)
+        options = {**self.client_options, **client_options}
+        client = _PooledClient(
+            self,
+            api_key,
+            energy_id,
+            timeout=self.timeout,
+            rate_limiter=rate_limiter,
+            tenant_queue=queue,
+            **options,
+        )
+        self.clients[tenant_id] = client
+        logger.debug("Added tenant %s", tenant_id)
+        return client
+
+    def client(self, tenant_id: str) -> LenedaClient:
+        """
+        Get the client of a tenant.
+
+        Raises:
+            KeyError: If the tenant has not been added to the pool
+        """
+        return self.clients[tenant_id]
+
+    def remove_tenant(self, tenant_id: str) -> None:
+        """
+        Remove a tenant from the pool.
+
+        Requests of the tenant that are in flight or waiting for a slot still complete.
+        """
+        self.clients.pop(tenant_id, None)
+        queue = self.scheduler.tenants.get(tenant_id)
+        if queue is not None and not queue.active and not queue.waiting:
+            del self.scheduler.tenants[tenant_id]
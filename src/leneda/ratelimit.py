@@ -0,0 +1,180 @@
+"""
+Client-side rate limiting for the Leneda API client.
+
+This module provides an adaptive token bucket that paces requests to the Leneda API. It
+slows down when the API signals throttling (429 Too Many Requests or a Retry-After header)
+and gradually speeds up again afterwards.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Set up logging
+logger = logging.getLogger("leneda.ratelimit")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the value of a Retry-After header.
+
+    Args:
+        value: The header value, either a number of seconds or an HTTP date
+
+    Returns:
+        The number of seconds to wait, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """
+    Adaptive async token bucket.
+
+    Tokens are added at the current rate up to the burst size, and each request consumes one
+    token. Waiting requests are served in FIFO order. When the API throttles, the rate is cut by
+    backoff_factor and no request is let through before the Retry-After delay has passed. The
+    rate then recovers linearly to max_rate over recovery_time seconds.
+
+    A single limiter can be passed to several clients to share one budget between them, also
+    when they run in different event loops or threads (e.g. a SyncLenedaClient next to
+    asyncio.run callers). The FIFO order holds between the requests of the same event loop.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: Optional[int] = None,
+        min_rate: float = 0.5,
+        backoff_factor: float = 0.5,
+        recovery_time: float = 30.0,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate: Maximum number of requests per second
+            burst: Maximum number of requests let through at once (defaults to the rate,
+                at least 1)
+            min_rate: Lower bound for the rate after repeated throttling
+            backoff_factor: Factor the rate is multiplied with when the API throttles
+            recovery_time: Seconds to recover from min_rate to the maximum rate
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.max_rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self.min_rate = min(min_rate, rate)
+        self.backoff_factor = backoff_factor
+        self.recovery_time = recovery_time
+
+        self._rate = rate
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        # The bucket is shared by all loops; each loop queues its requests behind its own lock
+        self._state_lock = threading.Lock()
+        self._loop_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def rate(self) -> float:
+        """The current rate in requests per second."""
+        with self._state_lock:
+            self._refill(time.monotonic())
+            return self._rate
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of requests currently waiting for a token."""
+        return self._waiting
+
+    def _refill(self, now: float) -> None:
+        """Recover the rate and add the tokens accumulated since the last update."""
+        elapsed = now - self._updated
+        if elapsed <= 0:
+            return
+        self._updated = now
+        if self._rate < self.max_rate:
+            if self.recovery_time > 0:
+                recovery = (self.max_rate - self.min_rate) / self.recovery_time * elapsed
+            else:
+                recovery = self.max_rate
+            self._rate = min(self.max_rate, self._rate + recovery)
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self._rate)
+
+    def _take(self) -> float:
+        """Take a token if one is available; returns 0, or the seconds until one may be."""
+        with self._state_lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def _loop_lock(self) -> asyncio.Lock:
+        """Return the lock queueing the requests of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._state_lock:
+            lock = self._loop_locks.get(loop)
+            if lock is None:
+                lock = self._loop_locks[loop] = asyncio.Lock()
+            return lock
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        lock = self._loop_lock()
+        self._waiting += 1
+        try:
+            async with lock:
+                while True:
+                    delay = self._take()
+                    if not delay:
+                        return
+                    await asyncio.sleep(delay)
+        finally:
+            self._waiting -= 1
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Slow down after the API signalled throttling.
+
+        Args:
+            retry_after: Seconds to wait before the next request, from the Retry-After header
+        """
+        with self._state_lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._rate = max(self.min_rate, self._rate * self.backoff_factor)
+            self._tokens = 0.0
+            if retry_after:
+                # Nothing accumulates while blocked: the bucket resumes at the end of the delay
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                self._updated = self._blocked_until
+        message = f"Rate limited by the Leneda API, slowing down to {self._rate:.2f} requests/s"
+        if retry_after:
+            message += f" after waiting {retry_after:.1f}s"
+        logger.warning(message)
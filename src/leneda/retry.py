@@ -0,0 +1,79 @@
+"""
+Retry policy for the Leneda API client.
+
+This module decides which failed requests are retried and how long to wait in between,
+using exponential backoff with full jitter.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional
+
+import aiohttp
+
+from .exceptions import TooManyRequestsException
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry policy for requests to the Leneda API.
+
+    Only idempotent methods are retried: the time series endpoints are read with GET, while
+    the POST creating a metering data access request is never retried, since repeating it could
+    create duplicate requests.
+    """
+
+    max_attempts: int = 3  # Total attempts including the first one (1 disables retries)
+    base_delay: float = 0.5  # Upper bound of the first backoff delay in seconds
+    max_delay: float = 10.0  # Upper bound of any backoff delay in seconds
+    total_timeout: Optional[float] = 60.0  # Time budget for all attempts in seconds
+    retryable_statuses: FrozenSet[int] = field(
+        default_factory=lambda: frozenset({429, 500, 502, 503, 504})
+    )
+    retryable_methods: FrozenSet[str] = field(default_factory=lambda: frozenset({"GET"}))
+
+    def is_retryable_error(self, error: BaseException) -> bool:
+        """
+        Whether an error is transient and the request may succeed when repeated.
+
+        Args:
+            error: The error raised by the request
+
+        Returns:
+            True for retryable HTTP status codes, connection errors and timeouts
+        """
+        if isinstance(error, TooManyRequestsException):
+            return 429 in self.retryable_statuses
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in self.retryable_statuses
+        return isinstance(
+            error,
+            (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError),
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before the next attempt, using exponential backoff with full jitter.
+
+        Args:
+            attempt: The number of the attempt that just failed, starting at 1
+            retry_after: Optional delay requested by the API with a Retry-After header
+
+        Returns:
+            The delay in seconds
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+@dataclass
+class RetryStats:
+    """Counters describing how the retry policy performed."""
+
+    retries: int = 0  # Number of repeated attempts
+    successful_retries: int = 0  # Requests that succeeded after at least one retry
+    give_ups: int = 0  # Requests that failed with a transient error, or after retries
@@ -0,0 +1,148 @@
+"""
+Fair scheduling of requests between tenants for the Leneda API client.
+
+This module provides a scheduler sharing a number of concurrent request slots between the
+clients of several tenants. Each tenant has its own concurrency limit, and tenants waiting for
+a slot are served in turn, so that a tenant sending many requests cannot starve the others.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Set up logging
+logger = logging.getLogger("leneda.scheduling")
+
+
+class TenantQueue:
+    """
+    The queue of one tenant of a FairScheduler.
+
+    Pass it to the client of the tenant as tenant_queue; each request then holds a slot from
+    acquire until release.
+    """
+
+    def __init__(self, scheduler: "FairScheduler", tenant_id: str, max_concurrency: int):
+        """
+        Initialize the queue. Use FairScheduler.tenant to create queues.
+
+        Args:
+            scheduler: The scheduler the queue belongs to
+            tenant_id: The identifier of the tenant
+            max_concurrency: Maximum number of requests of the tenant in flight at once
+        """
+        self.scheduler = scheduler
+        self.tenant_id = tenant_id
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    @property
+    def waiting(self) -> int:
+        """The number of requests of the tenant waiting for a slot."""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> None:
+        """Wait for a request slot."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.scheduler._enqueue(self)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted while the request was being cancelled
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Give back a slot taken with acquire."""
+        self.active -= 1
+        self.scheduler._released()
+
+    def _grant(self) -> bool:
+        """Give a slot to the first waiting request, if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.active += 1
+                return True
+        return False
+
+
+class FairScheduler:
+    """
+    Scheduler sharing concurrent request slots between tenants in round-robin order.
+
+    At most max_concurrency requests are in flight over all tenants, and at most the
+    max_concurrency of its queue per tenant. When a slot is free, it goes to the next tenant
+    in turn that has a waiting request and is under its own limit.
+    """
+
+    def __init__(self, max_concurrency: int = 32):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight over all tenants
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.tenants: Dict[str, TenantQueue] = {}
+        self._free = max_concurrency
+        self._ready: Deque[TenantQueue] = deque()  # Tenants with waiting requests, in turn
+
+    def tenant(self, tenant_id: str, max_concurrency: Optional[int] = None) -> TenantQueue:
+        """
+        Get the queue of a tenant, creating it if needed.
+
+        Args:
+            tenant_id: The identifier of the tenant
+            max_concurrency: Maximum number of requests of the tenant in flight at once
+                (defaults to the limit of the scheduler)
+
+        Returns:
+            The queue of the tenant
+        """
+        queue = self.tenants.get(tenant_id)
+        if queue is None:
+            queue = self.tenants[tenant_id] = TenantQueue(
+                self, tenant_id, max_concurrency or self.max_concurrency
+            )
+        elif max_concurrency is not None:
+            queue.max_concurrency = max_concurrency
+        return queue
+
+    @property
+    def active(self) -> int:
+        """The number of requests in flight over all tenants."""
+        return self.max_concurrency - self._free
+
+    def _enqueue(self, queue: TenantQueue) -> None:
+        """Put a tenant with a new waiting request in turn."""
+        if queue not in self._ready:
+            self._ready.append(queue)
+        self._dispatch()
+
+    def _released(self) -> None:
+        """Hand a released slot to the next tenant in turn."""
+        self._free += 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Give the free slots to the waiting tenants in turn."""
+        while self._free > 0 and self._ready:
+            for _ in range(len(self._ready)):
+                queue = self._ready.popleft()
+                granted = queue.active < queue.max_concurrency and queue._grant()
+                if queue._waiters:
+                    # Served or blocked by its own limit, the tenant goes to the back of the line
+                    self._ready.append(queue)
+                if granted:
+                    self._free -= 1
+                    break
+            else:
+                return
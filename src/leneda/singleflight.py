@@ -0,0 +1,58 @@
+"""
+Request coalescing for the Leneda API client.
+
+This module provides a single-flight group: concurrent callers asking for the same key
+share one in-flight call and its result instead of each making their own.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one call."""
+
+    def __init__(self) -> None:
+        """Initialize an empty single-flight group."""
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0  # Number of calls actually made
+        self.coalesced = 0  # Number of callers that joined an in-flight call
+
+    @property
+    def in_flight(self) -> int:
+        """The number of calls currently in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func, unless a call with the same key is already in flight.
+
+        All callers with the same key receive the same result object (or the same exception).
+        Cancelling one caller does not cancel the shared call for the others.
+
+        Args:
+            key: Key identifying identical calls
+            func: Coroutine function making the call
+
+        Returns:
+            The result of the shared call
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            self.calls += 1
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        """Forget a finished call, so that the next caller makes a new one."""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,202 @@
+"""
+Persistent local storage of time series for the Leneda API client.
+
+This module provides an interval store that keeps the fetched metering values on disk
+together with the time ranges that were fetched, so that the client only needs to request
+the ranges it does not have yet.
+"""
+
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Callable, List, Optional, TypeVar
+
+from .models import MeteringColumns, MeteringData, type_code, type_name
+from .obis_codes import ObisCode
+from .timeutils import TimeRange, from_epoch, merge_ranges, subtract_ranges, to_epoch
+
+# Set up logging
+logger = logging.getLogger("leneda.store")
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    metering_point_code TEXT NOT NULL,
+    obis_code TEXT NOT NULL,
+    interval_length TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    PRIMARY KEY (metering_point_code, obis_code)
+);
+CREATE TABLE IF NOT EXISTS metering_values (
+    metering_point_code TEXT NOT NULL,
+    obis_code TEXT NOT NULL,
+    started_at INTEGER NOT NULL,
+    value REAL NOT NULL,
+    type TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    calculated INTEGER NOT NULL,
+    PRIMARY KEY (metering_point_code, obis_code, started_at)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    metering_point_code TEXT NOT NULL,
+    obis_code TEXT NOT NULL,
+    range_start INTEGER NOT NULL,
+    range_end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_series ON coverage (metering_point_code, obis_code);
+"""
+
+
+class SQLiteIntervalStore:
+    """
+    SQLite-backed store of metering values and of the time ranges they were fetched for.
+
+    Values are keyed by metering point, OBIS code and start time, keeping the highest version
+    of each interval. Data of the last immutable_after period may still be revised by Leneda, so
+    ranges reaching into that period are not recorded as covered and are fetched again next time.
+
+    All database access runs in a dedicated worker thread, so the event loop is not blocked.
+    """
+
+    def __init__(self, path: str = ":memory:", immutable_after: timedelta = timedelta(days=2)):
+        """
+        Initialize the store, creating the database schema if needed.
+
+        Args:
+            path: Path of the SQLite database file (":memory:" for a temporary store)
+            immutable_after: Age after which fetched data is considered final
+        """
+        self.path = path
+        self.immutable_after = immutable_after
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leneda-store")
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a database function in the worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    def close(self) -> None:
+        """Close the database connection and stop the worker thread."""
+        self._executor.shutdown(wait=True)
+        self._connection.close()
+
+    async def missing_ranges(
+        self, metering_point_code: str, obis_code: ObisCode, start: datetime, end: datetime
+    ) -> List[TimeRange]:
+        """
+        Get the parts of a time range that have not been fetched yet.
+
+        Args:
+            metering_point_code: The metering point code
+            obis_code: The OBIS code
+            start: Start of the range (timezone-aware)
+            end: End of the range (timezone-aware)
+
+        Returns:
+            The (start, end) ranges that need to be fetched from the API
+        """
+        covered = await self._run(self._load_coverage, metering_point_code, obis_code.value)
+        return subtract_ranges(start, end, covered)
+
+    async def save(self, data: MeteringData, start: datetime, end: datetime) -> None:
+        """
+        Store fetched data and record the range it was fetched for.
+
+        Args:
+            data: The data returned by the API for the range
+            start: Start of the fetched range (timezone-aware)
+            end: End of the fetched range (timezone-aware)
+        """
+        final_until = datetime.now(timezone.utc) - self.immutable_after
+        await self._run(self._save, data, start, min(end, final_until))
+
+    async def load(
+        self, metering_point_code: str, obis_code: ObisCode, start: datetime, end: datetime
+    ) -> Optional[MeteringData]:
+        """
+        Load the stored data of a time range.
+
+        Args:
+            metering_point_code: The metering point code
+            obis_code: The OBIS code
+            start: Start of the range (timezone-aware)
+            end: End of the range (timezone-aware), inclusive like the API
+
+        Returns:
+            The stored data, or None if nothing was ever stored for the series
+        """
+        return await self._run(self._load, metering_point_code, obis_code, start, end)
+
+    def _load_coverage(self, metering_point_code: str, obis_code: str) -> List[TimeRange]:
+        rows = self._connection.execute(
+            "SELECT range_start, range_end FROM coverage "
+            "WHERE metering_point_code = ? AND obis_code = ?",
+            (metering_point_code, obis_code),
+        ).fetchall()
+        return [(from_epoch(range_start), from_epoch(range_end)) for range_start, range_end in rows]
+
+    def _save(self, data: MeteringData, start: datetime, covered_until: datetime) -> None:
+        series = (data.metering_point_code, data.obis_code.value)
+        with self._connection:
+            # Responses without values may lack the unit, so they do not replace known metadata
+            self._connection.execute(
+                f"INSERT OR {'REPLACE' if data.columns else 'IGNORE'} INTO series VALUES (?, ?, ?, ?)",
+                (*series, data.interval_length or "", data.unit or ""),
+            )
+            self._connection.executemany(
+                "INSERT INTO metering_values VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (metering_point_code, obis_code, started_at) DO UPDATE SET "
+                "value = excluded.value, type = excluded.type, version = excluded.version, "
+                "calculated = excluded.calculated "
+                "WHERE excluded.version >= metering_values.version",
+                (
+                    (*series, timestamp, value, type_name(code), version, calculated)
+                    for value, timestamp, code, version, calculated in data.columns.rows()
+                ),
+            )
+
+            if covered_until > start:
+                # Replace the coverage of the series by its merged ranges
+                covered = merge_ranges(self._load_coverage(*series) + [(start, covered_until)])
+                self._connection.execute(
+                    "DELETE FROM coverage WHERE metering_point_code = ? AND obis_code = ?", series
+                )
+                self._connection.executemany(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                    ((*series, to_epoch(s), to_epoch(e)) for s, e in covered),
+                )
+        logger.debug("Stored %s values for %s %s", len(data.columns), series[0], series[1])
+
+    def _load(
+        self, metering_point_code: str, obis_code: ObisCode, start: datetime, end: datetime
+    ) -> Optional[MeteringData]:
+        series = self._connection.execute(
+            "SELECT interval_length, unit FROM series "
+            "WHERE metering_point_code = ? AND obis_code = ?",
+            (metering_point_code, obis_code.value),
+        ).fetchone()
+        if series is None:
+            return None
+
+        rows = self._connection.execute(
+            "SELECT started_at, value, type, version, calculated FROM metering_values "
+            "WHERE metering_point_code = ? AND obis_code = ? AND started_at BETWEEN ? AND ? "
+            "ORDER BY started_at",
+            (metering_point_code, obis_code.value, to_epoch(start), to_epoch(end)),
+        )
+        return MeteringData(
+            metering_point_code=metering_point_code,
+            obis_code=obis_code,
+            interval_length=series[0],
+            unit=series[1],
+            columns=MeteringColumns.from_rows(
+                (value, started_at, type_code(type_value), version, calculated)
+                for started_at, value, type_value, version, calculated in rows
+            ),
+        )
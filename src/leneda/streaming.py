@@ -0,0 +1,198 @@
+"""
+Incremental JSON parsing for the Leneda API client.
+
+This module provides a push parser that extracts the elements of one array field of a JSON
+object (such as the "items" of a time series response) while the response body is still
+being received, so that long time series never have to be held in memory as a whole.
+"""
+
+import codecs
+import json
+from typing import Any, Dict, List
+
+_WHITESPACE = " \t\n\r"
+
+# Parser states
+_START = 0  # Expecting the opening brace of the top-level object
+_FIRST_KEY = 1  # Expecting the first key or the closing brace
+_KEY = 2  # Expecting a key after a comma
+_COLON = 3  # Expecting the colon after a key
+_VALUE = 4  # Expecting the value of a key
+_AFTER_VALUE = 5  # Expecting a comma or the closing brace
+_ARRAY_START = 6  # Expecting the first element of the streamed array or its end
+_ARRAY_ITEM = 7  # Expecting an element of the streamed array
+_ARRAY_AFTER_ITEM = 8  # Expecting a comma or the end of the streamed array
+_DONE = 9  # The top-level object is complete
+
+# Marker returned by _decode_value when the buffer ends inside a value
+_INCOMPLETE = object()
+
+
+class JsonArrayStreamParser:
+    """
+    Push parser yielding the elements of one array field of a top-level JSON object.
+
+    Feed the response body chunk by chunk: each call returns the array elements completed by
+    that chunk. The other fields of the object are collected in header as they are parsed,
+    so header only contains the fields that appeared before the array once streaming starts.
+
+    Example:
+        parser = JsonArrayStreamParser("items")
+        async for chunk in response.content.iter_chunked(65536):
+            for item in parser.feed(chunk):
+                handle(item)
+        parser.close()
+    """
+
+    def __init__(self, field: str):
+        """
+        Initialize the parser.
+
+        Args:
+            field: Name of the top-level array field to stream
+        """
+        self.field = field
+        self.header: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._state = _START
+        self._key = ""
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Parse the next chunk of the response body.
+
+        Args:
+            chunk: The next bytes of the body
+
+        Returns:
+            The array elements completed by this chunk
+
+        Raises:
+            json.JSONDecodeError: If the body is not valid JSON
+        """
+        self._append(self._text_decoder.decode(chunk))
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Finish parsing after the last chunk.
+
+        Returns:
+            The array elements completed by the end of the body
+
+        Raises:
+            json.JSONDecodeError: If the body ended before the top-level object was complete
+        """
+        self._append(self._text_decoder.decode(b"", final=True))
+        items = self._parse(final=True)
+        if self._state != _DONE:
+            raise json.JSONDecodeError("Unexpected end of JSON body", self._buffer, self._position)
+        return items
+
+    def _append(self, text: str) -> None:
+        """Drop the consumed input from the buffer and append new text."""
+        remaining = self._buffer[slice(self._position, None)]
+        self._buffer = remaining + text
+        self._position = 0
+
+    def _skip_whitespace(self) -> bool:
+        """Skip whitespace and return whether more input is available."""
+        buffer, position = self._buffer, self._position
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        self._position = position
+        return position < len(buffer)
+
+    def _expect(self, character: str) -> None:
+        """Consume a structural character or raise a decode error."""
+        if self._buffer[self._position] != character:
+            raise json.JSONDecodeError(f"Expecting {character!r}", self._buffer, self._position)
+        self._position += 1
+
+    def _decode_value(self, final: bool) -> Any:
+        """
+        Decode the JSON value at the current position.
+
+        Returns the _INCOMPLETE marker if the buffer ends before the value does. A value that
+        reaches the end of the buffer is only accepted at the end of the body, since numbers and
+        literals are not self-delimiting ("12" could be the start of "123").
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _INCOMPLETE
+        if end == len(self._buffer) and not final:
+            return _INCOMPLETE
+        self._position = end
+        return value
+
+    def _parse(self, final: bool) -> List[Any]:
+        """Advance the state machine as far as the buffered input allows."""
+        items: List[Any] = []
+        while self._state != _DONE and self._skip_whitespace():
+            state = self._state
+            character = self._buffer[self._position]
+
+            if state == _START:
+                self._expect("{")
+                self._state = _FIRST_KEY
+            elif state in (_FIRST_KEY, _KEY):
+                if state == _FIRST_KEY and character == "}":
+                    self._position += 1
+                    self._state = _DONE
+                    continue
+                if character != '"':
+                    # As in json.loads, keys are strings and there is no comma before the brace
+                    raise json.JSONDecodeError(
+                        "Expecting property name enclosed in double quotes",
+                        self._buffer,
+                        self._position,
+                    )
+                key = self._decode_value(final)
+                if key is _INCOMPLETE:
+                    break
+                self._key = key
+                self._state = _COLON
+            elif state == _COLON:
+                self._expect(":")
+                self._state = _VALUE
+            elif state == _VALUE:
+                if self._key == self.field and character == "[":
+                    self._position += 1
+                    self._state = _ARRAY_START
+                    continue
+                value = self._decode_value(final)
+                if value is _INCOMPLETE:
+                    break
+                self.header[self._key] = value
+                self._state = _AFTER_VALUE
+            elif state == _AFTER_VALUE:
+                if character == ",":
+                    self._position += 1
+                    self._state = _KEY
+                else:
+                    self._expect("}")
+                    self._state = _DONE
+            elif state in (_ARRAY_START, _ARRAY_ITEM):
+                if state == _ARRAY_START and character == "]":
+                    self._position += 1
+                    self._state = _AFTER_VALUE
+                    continue
+                item = self._decode_value(final)
+                if item is _INCOMPLETE:
+                    break
+                items.append(item)
+                self._state = _ARRAY_AFTER_ITEM
+            elif state == _ARRAY_AFTER_ITEM:
+                if character == ",":
+                    self._position += 1
+                    self._state = _ARRAY_ITEM
+                else:
+                    self._expect("]")
+                    self._state = _AFTER_VALUE
+        return items
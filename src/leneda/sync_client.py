@@ -0,0 +1,239 @@
+"""
+Blocking client for the Leneda API.
+
+This module provides a synchronous facade over LenedaClient for code that does not run an
+event loop, such as Celery tasks or Flask views. The requests run on one event loop in a
+background thread, so all calling threads share the pooled HTTP session.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Coroutine, Dict, Iterable, List, Optional, Set, TypeVar, Union
+
+from .bulk import MeteringDataJob, MeteringDataResult
+from .client import LenedaClient
+from .models import AggregatedMeteringData, MeteringData
+from .obis_codes import ObisCode
+
+# Set up logging
+logger = logging.getLogger("leneda.sync_client")
+
+T = TypeVar("T")
+
+
+class SyncLenedaClient:
+    """
+    Thread-safe blocking client for the Leneda API.
+
+    The client starts a background thread running an event loop with one LenedaClient, which
+    keeps its pooled session open between calls. Each method submits the corresponding
+    coroutine to that loop and blocks until it completes, so any number of threads can call
+    the client at once and share its connection pool, rate limiter, cache and other settings.
+
+    Example:
+        with SyncLenedaClient(api_key, energy_id) as client:
+            data = client.get_metering_data(metering_point, obis_code, start, end)
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        energy_id: str,
+        call_timeout: Optional[float] = None,
+        **client_options: Any,
+    ):
+        """
+        Initialize the client and start its event loop thread.
+
+        Args:
+            api_key: Your Leneda API key
+            energy_id: Your Energy ID
+            call_timeout: Maximum time in seconds a call blocks before it is cancelled (None for
+                no limit beyond the timeouts of the underlying client)
+            **client_options: Further options of LenedaClient, e.g. rate_limiter or cache
+        """
+        self.call_timeout = call_timeout
+        self._loop = asyncio.new_event_loop()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._futures: Set[concurrent.futures.Future] = set()  # Calls in flight
+        self._thread = threading.Thread(
+            target=self._run_loop, name="leneda-client-loop", daemon=True
+        )
+        self._thread.start()
+
+        # The async client is created on the loop, where it will be used
+        self.client: LenedaClient = self._run(
+            self._create_client(api_key, energy_id, client_options)
+        )
+
+    @staticmethod
+    async def _create_client(
+        api_key: str, energy_id: str, client_options: Dict[str, Any]
+    ) -> LenedaClient:
+        return LenedaClient(api_key, energy_id, **client_options)
+
+    def _run_loop(self) -> None:
+        """Run the event loop of the client until close is called."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Run a coroutine on the event loop of the client and wait for its result.
+
+        Raises:
+            RuntimeError: If the client is closed or called from its own event loop
+            concurrent.futures.CancelledError: If the client is closed during the call
+        """
+        with self._close_lock:
+            if self._closed:
+                coroutine.close()
+                raise RuntimeError("SyncLenedaClient is closed")
+            if threading.current_thread() is self._thread:
+                coroutine.close()
+                raise RuntimeError("SyncLenedaClient cannot be called from its own event loop")
+            future: concurrent.futures.Future[T] = asyncio.run_coroutine_threadsafe(
+                coroutine, self._loop
+            )
+            self._futures.add(future)
+        try:
+            return future.result(self.call_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+        finally:
+            with self._close_lock:
+                self._futures.discard(future)
+
+    async def _shutdown(self) -> None:
+        """Cancel the tasks left on the loop and wait for them, then close the async client."""
+        # Besides the calls, this catches the tasks they spawned, e.g. shared coalesced fetches
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.client.close()
+
+    def __enter__(self) -> "SyncLenedaClient":
+        """Return the client when entering a with block."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the client when leaving a with block."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the HTTP session and stop the event loop thread.
+
+        Calls still in flight in other threads are cancelled and raise CancelledError.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                for future in self._futures:
+                    future.cancel()
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+
+    def get_metering_data(
+        self,
+        metering_point_code: str,
+        obis_code: ObisCode,
+        start_date_time: Union[str, datetime],
+        end_date_time: Union[str, datetime],
+        chunk_size: Optional[timedelta] = None,
+    ) -> MeteringData:
+        """Get time series data. See LenedaClient.get_metering_data."""
+        return self._run(
+            self.client.get_metering_data(
+                metering_point_code, obis_code, start_date_time, end_date_time, chunk_size
+            )
+        )
+
+    def get_aggregated_metering_data(
+        self,
+        metering_point_code: str,
+        obis_code: ObisCode,
+        start_date: Union[str, datetime],
+        end_date: Union[str, datetime],
+        aggregation_level: str = "Day",
+        transformation_mode: str = "Accumulation",
+    ) -> AggregatedMeteringData:
+        """Get aggregated time series data. See LenedaClient.get_aggregated_metering_data."""
+        return self._run(
+            self.client.get_aggregated_metering_data(
+                metering_point_code,
+                obis_code,
+                start_date,
+                end_date,
+                aggregation_level=aggregation_level,
+                transformation_mode=transformation_mode,
+            )
+        )
+
+    def fetch_metering_data_bulk(
+        self,
+        requests: Iterable[MeteringDataJob],
+        max_concurrency: int = LenedaClient.DEFAULT_BULK_CONCURRENCY,
+    ) -> List[MeteringDataResult]:
+        """
+        Fetch many time series concurrently and return all results.
+
+        See LenedaClient.fetch_metering_data_bulk. The results are collected in completion
+        order before the call returns.
+        """
+
+        async def collect() -> List[MeteringDataResult]:
+            return [
+                result
+                async for result in self.client.fetch_metering_data_bulk(
+                    requests, max_concurrency=max_concurrency
+                )
+            ]
+
+        return self._run(collect())
+
+    def request_metering_data_access(
+        self,
+        from_energy_id: str,
+        from_name: str,
+        metering_point_codes: List[str],
+        obis_codes: List[ObisCode],
+    ) -> Dict[str, Any]:
+        """Request access to metering data. See LenedaClient.request_metering_data_access."""
+        return self._run(
+            self.client.request_metering_data_access(
+                from_energy_id, from_name, metering_point_codes, obis_codes
+            )
+        )
+
+    def probe_metering_point_obis_code(self, metering_point_code: str, obis_code: ObisCode) -> bool:
+        """Probe an OBIS code of a metering point. See LenedaClient.probe_metering_point_obis_code."""
+        return self._run(self.client.probe_metering_point_obis_code(metering_point_code, obis_code))
+
+    def get_supported_obis_codes(
+        self,
+        metering_point_code: str,
+        obis_codes: Optional[Iterable[ObisCode]] = None,
+        max_concurrency: Optional[int] = None,
+        skip_sharing_layers: bool = False,
+    ) -> List[ObisCode]:
+        """Get the OBIS codes of a metering point. See LenedaClient.get_supported_obis_codes."""
+        return self._run(
+            self.client.get_supported_obis_codes(
+                metering_point_code,
+                obis_codes=obis_codes,
+                max_concurrency=max_concurrency,
+                skip_sharing_layers=skip_sharing_layers,
+            )
+        )
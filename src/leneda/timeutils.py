@@ -0,0 +1,353 @@
+"""
+Date and time helpers for the Leneda API client.
+
+This module provides the conversions between the ISO 8601 strings used by the Leneda API
+and timezone-aware datetime objects, as well as helpers to split and combine time ranges.
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+
+from dateutil import parser
+
+# Format of the startDateTime/endDateTime query parameters
+API_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Format of the startDate/endDate query parameters of the aggregated endpoint
+API_DATE_FORMAT = "%Y-%m-%d"
+
+# Chunk boundaries are aligned to full hours, which are interval boundaries of both the
+# 15 minute electricity series and the hourly gas series
+CHUNK_ALIGNMENT = timedelta(hours=1)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+TimeRange = Tuple[datetime, datetime]
+
+_SECONDS_PER_DAY = 86400
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Full form of the timestamps in API responses, accepted by parse_timestamp
+_TIMESTAMP_PATTERN = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.\d+)?(?:(Z)|([+-])(\d{2}):(\d{2}))$"
+)
+
+_DURATION_PATTERN = re.compile(
+    r"^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+def to_utc(value: Union[str, datetime]) -> datetime:
+    """
+    Convert an ISO format string or datetime object to a timezone-aware UTC datetime.
+
+    Naive datetime objects are interpreted as UTC, consistent with the way the client formats
+    them for API requests.
+
+    Args:
+        value: ISO format string or datetime object
+
+    Returns:
+        The timezone-aware datetime in UTC
+    """
+    moment = parser.isoparse(value) if isinstance(value, str) else value
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def to_epoch(value: datetime) -> int:
+    """
+    Convert a timezone-aware datetime to Unix epoch seconds.
+
+    Args:
+        value: The datetime to convert
+
+    Returns:
+        The whole seconds since the Unix epoch, rounded down
+    """
+    return (value - _EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(value: int) -> datetime:
+    """
+    Convert Unix epoch seconds to a timezone-aware UTC datetime.
+
+    Args:
+        value: The seconds since the Unix epoch
+
+    Returns:
+        The datetime in UTC
+    """
+    return _EPOCH + timedelta(seconds=value)
+
+
+@lru_cache(maxsize=4096)
+def _day_start(day: str) -> int:
+    """Get the epoch seconds of the start of a "YYYY-MM-DD" day, validating the date."""
+    if len(day) != 10 or day[4] != "-" or day[7] != "-":
+        raise ValueError(f"Invalid date: {day!r}")
+    ordinal = date(int(day[0:4]), int(day[5:7]), int(day[8:10])).toordinal()
+    return (ordinal - _EPOCH_ORDINAL) * _SECONDS_PER_DAY
+
+
+def parse_timestamp(value: str) -> int:
+    """
+    Parse an ISO 8601 timestamp of an API response to Unix epoch seconds.
+
+    Only the complete form used by the API is accepted: "YYYY-MM-DDTHH:MM:SS", optionally with
+    fractional seconds (which are dropped), followed by "Z" or a "+HH:MM"/"-HH:MM" offset. The
+    common "Z" form is parsed without regular expressions or datetime objects.
+
+    Args:
+        value: The timestamp
+
+    Returns:
+        The seconds since the Unix epoch
+
+    Raises:
+        ValueError: If the timestamp is not in the accepted form or not a valid date and time
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid ISO 8601 timestamp: {value!r}")
+    if len(value) == 20 and value[19] == "Z" and value[10] + value[13] + value[16] == "T::":
+        day, hours, minutes, seconds = value[:10], value[11:13], value[14:16], value[17:19]
+        offset = 0
+    else:
+        match = _TIMESTAMP_PATTERN.match(value)
+        if match is None:
+            raise ValueError(f"Invalid ISO 8601 timestamp: {value!r}")
+        day, hours, minutes, seconds, utc, sign, offset_hours, offset_minutes = match.groups()
+        offset = 0 if utc else int(offset_hours) * 3600 + int(offset_minutes) * 60
+        if sign == "-":
+            offset = -offset
+
+    if not (hours.isdigit() and minutes.isdigit() and seconds.isdigit()):
+        raise ValueError(f"Invalid ISO 8601 timestamp: {value!r}")
+    hour, minute, second = int(hours), int(minutes), int(seconds)
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError(f"Invalid ISO 8601 timestamp: {value!r}")
+    return _day_start(day) + hour * 3600 + minute * 60 + second - offset
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp of an API response to a timezone-aware UTC datetime.
+
+    See parse_timestamp for the accepted forms.
+
+    Args:
+        value: The timestamp
+
+    Returns:
+        The datetime in UTC
+
+    Raises:
+        ValueError: If the timestamp is not in the accepted form
+    """
+    return from_epoch(parse_timestamp(value))
+
+
+class GridTimestampParser:
+    """
+    Parser for the consecutive timestamps of a regular time series.
+
+    Each timestamp is expected to follow the previous one by step. The expected timestamp is
+    derived arithmetically and its text only compared with the input, which is much cheaper than
+    parsing it. Timestamps that break the grid (gaps, daylight saving changes in offsets, other
+    formats) are parsed with parse_timestamp and become the new reference.
+    """
+
+    def __init__(self, step: Optional[timedelta]):
+        """
+        Initialize the parser.
+
+        Args:
+            step: The interval length of the series, or None to parse every timestamp
+        """
+        seconds = int(step.total_seconds()) if step is not None else 0
+        # The grid is only used for steps that divide a day, so that the times of day repeat
+        if seconds <= 0 or _SECONDS_PER_DAY % seconds:
+            seconds = 0
+        self._step = seconds
+        self._times = {
+            offset: f"T{offset // 3600:02d}:{offset // 60 % 60:02d}:{offset % 60:02d}Z"
+            for offset in range(0, _SECONDS_PER_DAY, seconds or _SECONDS_PER_DAY)
+        }
+        self._next: Optional[int] = None
+        self._next_text = ""
+        self._day = -1
+        self._day_text = ""
+
+    @classmethod
+    def for_interval_length(cls, interval_length: Optional[str]) -> "GridTimestampParser":
+        """
+        Create a parser for a series with the given ISO 8601 interval length (e.g. "PT15M").
+
+        Interval lengths that cannot be parsed disable the grid.
+        """
+        try:
+            return cls(parse_duration(interval_length) if interval_length else None)
+        except ValueError:
+            return cls(None)
+
+    def parse(self, value: str) -> int:
+        """
+        Parse the next timestamp of the series to Unix epoch seconds.
+
+        Args:
+            value: The timestamp
+
+        Returns:
+            The seconds since the Unix epoch
+
+        Raises:
+            ValueError: If the timestamp is not in a form accepted by parse_timestamp
+        """
+        next_timestamp = self._next
+        if next_timestamp is not None and value == self._next_text:
+            timestamp = next_timestamp
+        else:
+            timestamp = parse_timestamp(value)
+        if self._step:
+            self._expect(timestamp + self._step)
+        return timestamp
+
+    def _expect(self, timestamp: int) -> None:
+        """Prepare the text of the timestamp expected next."""
+        day, time_of_day = divmod(timestamp, _SECONDS_PER_DAY)
+        if time_of_day not in self._times:
+            # Off the grid of the day, e.g. a series that does not start on a boundary
+            self._next = None
+            self._next_text = ""
+            return
+        if day != self._day:
+            self._day = day
+            self._day_text = date.fromordinal(day + _EPOCH_ORDINAL).isoformat()
+        self._next = timestamp
+        self._next_text = self._day_text + self._times[time_of_day]
+
+
+def parse_duration(value: str) -> timedelta:
+    """
+    Parse an ISO 8601 duration such as the intervalLength of a time series (e.g. "PT15M").
+
+    Only day and time components are supported, since months and years have no fixed length.
+
+    Args:
+        value: The ISO 8601 duration
+
+    Returns:
+        The duration as a timedelta
+
+    Raises:
+        ValueError: If the duration cannot be parsed
+    """
+    match = _DURATION_PATTERN.match(value)
+    if not match or value in ("P", "PT"):
+        raise ValueError(f"Unsupported ISO 8601 duration: {value!r}")
+    parts = {name: int(amount) for name, amount in match.groupdict().items() if amount}
+    return timedelta(**parts)
+
+
+def floor_datetime(value: datetime, step: timedelta) -> datetime:
+    """
+    Round a timezone-aware datetime down to a multiple of step since the Unix epoch.
+
+    Args:
+        value: The datetime to round
+        step: The step to round to
+
+    Returns:
+        The rounded datetime
+    """
+    return value - (value - _EPOCH) % step
+
+
+def split_time_range(
+    start: datetime,
+    end: datetime,
+    chunk_size: timedelta,
+    alignment: timedelta = CHUNK_ALIGNMENT,
+) -> List[TimeRange]:
+    """
+    Split a time range into consecutive chunks of at most chunk_size.
+
+    The boundaries between chunks are aligned to multiples of alignment, so that no interval of
+    the time series is cut in half. Each chunk ends where the next one starts.
+
+    Args:
+        start: Start of the range
+        end: End of the range
+        chunk_size: Maximum length of a chunk
+        alignment: Step the boundaries between chunks are aligned to
+
+    Returns:
+        The list of (start, end) chunks covering the range
+
+    Raises:
+        ValueError: If chunk_size is shorter than alignment
+    """
+    if chunk_size < alignment:
+        raise ValueError(f"chunk_size must be at least {alignment}")
+
+    chunks = []
+    chunk_start = start
+    while True:
+        boundary = floor_datetime(chunk_start + chunk_size, alignment)
+        if boundary >= end:
+            chunks.append((chunk_start, end))
+            return chunks
+        chunks.append((chunk_start, boundary))
+        chunk_start = boundary
+
+
+def merge_ranges(ranges: Iterable[TimeRange]) -> List[TimeRange]:
+    """
+    Merge overlapping or adjacent time ranges.
+
+    Args:
+        ranges: The (start, end) ranges to merge, in any order
+
+    Returns:
+        The merged ranges, sorted by start
+    """
+    merged: List[TimeRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(
+    start: datetime, end: datetime, covered: Iterable[TimeRange]
+) -> List[TimeRange]:
+    """
+    Get the parts of a time range that are not covered by other ranges.
+
+    Args:
+        start: Start of the range
+        end: End of the range
+        covered: The (start, end) ranges already covered
+
+    Returns:
+        The uncovered (start, end) ranges, sorted by start
+    """
+    gaps: List[TimeRange] = []
+    position = start
+    for covered_start, covered_end in merge_ranges(covered):
+        if covered_end <= position:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > position:
+            gaps.append((position, covered_start))
+        position = max(position, covered_end)
+    if position < end:
+        gaps.append((position, end))
+    return gaps
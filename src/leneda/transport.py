@@ -0,0 +1,481 @@
+"""
+HTTP transports of the Leneda API client.
+
+This module provides the interface between LenedaClient and the HTTP library sending its
+requests, with three backends:
+
+- AiohttpTransport, the default, sending HTTP/1.1 requests over the pooled aiohttp session
+- HttpxTransport, sending requests with httpx over HTTP/2, where many requests share one
+  connection instead of each waiting for a connection of its own
+- InProcessTransport, passing requests to a handler function in the same process, for tests
+  and benchmarks
+
+All backends negotiate gzip and deflate compression of the responses, and brotli when the
+brotli package is installed.
+"""
+
+import asyncio
+import gzip
+import json as jsonlib
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import aiohttp
+from aiohttp import ClientTimeout
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .models import _import_optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Set up logging
+logger = logging.getLogger("leneda.transport")
+
+# Encodings the client can decode, sent as Accept-Encoding by the in-process transport.
+# aiohttp and httpx send the same list, depending on the installed decoders.
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+JsonLoads = Callable[[Any], Any]
+
+
+class Transport(ABC):
+    """
+    Interface of the HTTP backends of LenedaClient.
+
+    request returns an async context manager yielding the response. Responses offer the parts
+    of aiohttp.ClientResponse used by the client: status, headers, content.iter_chunked, read,
+    json and raise_for_status. Errors are raised as aiohttp.ClientError and asyncio.TimeoutError
+    by all backends, so that the retry policy of the client applies to each of them.
+    """
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        params: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[ClientTimeout] = None,
+        trace_request_ctx: Any = None,
+    ) -> AsyncContextManager[Any]:
+        """
+        Send a request and yield its response once the headers have been received.
+
+        Args:
+            method: The HTTP method
+            url: The URL, without query string
+            headers: The request headers
+            params: Optional query parameters
+            json: Optional JSON body
+            timeout: Timeout of the request
+            trace_request_ctx: Passed to the aiohttp trace config, see RequestEvent
+
+        Returns:
+            An async context manager yielding the response
+        """
+
+    async def close(self) -> None:
+        """Release the connections of the transport."""
+
+
+def _request_info(method: str, url: str) -> aiohttp.RequestInfo:
+    """Build the description of a request that aiohttp attaches to responses and errors."""
+    request_url = URL(url)
+    return aiohttp.RequestInfo(request_url, method, CIMultiDictProxy(CIMultiDict()), request_url)
+
+
+def _response_error(
+    method: str, url: str, status: int, reason: str, headers: Mapping[str, str]
+) -> aiohttp.ClientResponseError:
+    """Build the error aiohttp raises for a response with an error status."""
+    return aiohttp.ClientResponseError(
+        _request_info(method, url),
+        (),
+        status=status,
+        message=reason,
+        headers=CIMultiDictProxy(CIMultiDict(headers)),
+    )
+
+
+class _Response(ABC):
+    """Response of the httpx and in-process transports, imitating aiohttp.ClientResponse."""
+
+    def __init__(self, method: str, url: str, status: int, reason: str, headers: Mapping[str, str]):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        # aiohttp exposes the body stream as content; iter_chunked is defined here
+        self.content = self
+
+    @property
+    def request_info(self) -> aiohttp.RequestInfo:
+        """Description of the request, as in aiohttp."""
+        return _request_info(self.method, self.url)
+
+    @abstractmethod
+    def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Yield the decoded body in chunks of at most n bytes."""
+
+    async def read(self) -> bytes:
+        """Read the whole decoded body."""
+        return b"".join([chunk async for chunk in self.iter_chunked(65536)])
+
+    async def json(self, *, loads: JsonLoads = jsonlib.loads) -> Any:
+        """Decode the body as JSON; an empty body gives None, as with aiohttp."""
+        body = await self.read()
+        if not body.strip():
+            return None
+        return loads(body)
+
+    def raise_for_status(self) -> None:
+        """Raise aiohttp.ClientResponseError for a status of 400 or above."""
+        if self.status >= 400:
+            raise _response_error(self.method, self.url, self.status, self.reason, self.headers)
+
+
+class AiohttpTransport(Transport):
+    """
+    Transport sending requests over an aiohttp session.
+
+    This is the transport of LenedaClient unless another one is given. aiohttp negotiates the
+    compression of the responses itself.
+    """
+
+    def __init__(self, get_session: Callable[[], Awaitable[aiohttp.ClientSession]]):
+        """
+        Initialize the transport.
+
+        Args:
+            get_session: Coroutine function returning the session to use, called for each
+                request (e.g. LenedaClient._get_session, which creates the session on first use)
+        """
+        self.get_session = get_session
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        params: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[ClientTimeout] = None,
+        trace_request_ctx: Any = None,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request over the session, see Transport.request."""
+        session = await self.get_session()
+        async with session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            params=params,
+            json=json,
+            timeout=timeout,
+            trace_request_ctx=trace_request_ctx,
+        ) as response:
+            yield response
+
+
+class _HttpxResponse(_Response):
+    """Response of the httpx transport."""
+
+    def __init__(self, method: str, url: str, response: Any, errors: Callable[[], Any]):
+        super().__init__(
+            method, url, response.status_code, response.reason_phrase, response.headers
+        )
+        self._response = response
+        self._errors = errors
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Yield the decoded body in chunks of n bytes."""
+        with self._errors():
+            async for chunk in self._response.aiter_bytes(n):
+                yield chunk
+
+    async def read(self) -> bytes:
+        """Read the whole decoded body."""
+        with self._errors():
+            body: bytes = await self._response.aread()
+        return body
+
+
+class HttpxTransport(Transport):
+    """
+    Transport sending requests with httpx, over HTTP/2 where the server supports it.
+
+    Over HTTP/2, concurrent requests are multiplexed as streams over a single connection per
+    host, so that thousands of small requests neither wait for each other nor need as many
+    connections. Requires the http2 extra (pip install leneda-client[http2]).
+
+    httpx has no total timeout; the total of the timeout of the client is applied to each of
+    connecting, writing, reading and waiting for a connection instead.
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: float = 30.0,
+    ):
+        """
+        Initialize the transport. The httpx client is created on first use.
+
+        Args:
+            http2: Whether to offer HTTP/2; servers without it are spoken to over HTTP/1.1
+            max_connections: Maximum number of simultaneous connections
+            max_keepalive_connections: Maximum number of idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open for reuse
+
+        Raises:
+            ImportError: If httpx is not installed
+        """
+        self._httpx = _import_optional("httpx", "http2")
+        self.http2 = http2
+        self.limits = self._httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: Any = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _get_client(self) -> Any:
+        """Return the httpx client, creating it on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed and self._client_loop is loop:
+            return self._client
+
+        # Connections cannot be reused from another event loop
+        stale, stale_loop = self._client, self._client_loop
+        self._client = self._httpx.AsyncClient(http2=self.http2, limits=self.limits)
+        self._client_loop = loop
+        logger.debug("Created httpx client (HTTP/2: %s)", self.http2)
+        if stale is not None and not stale.is_closed:
+            if stale_loop is not None and stale_loop.is_running():
+                # It may be in use there, so it is left open for that loop to close
+                logger.warning("Replacing an httpx client still open in another running event loop")
+            else:
+                try:
+                    await stale.aclose()
+                except Exception as e:  # The connections belong to the old loop
+                    logger.warning(
+                        "Could not close the httpx client of a previous event loop: %s", e
+                    )
+        return self._client
+
+    @contextmanager
+    def _errors(self) -> Iterator[None]:
+        """Raise the errors of httpx as the errors of aiohttp."""
+        httpx = self._httpx
+        try:
+            yield
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError(str(e)) from e
+        except httpx.TransportError as e:
+            raise aiohttp.ClientConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise aiohttp.ClientError(str(e)) from e
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        params: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[ClientTimeout] = None,
+        trace_request_ctx: Any = None,
+    ) -> AsyncIterator[_Response]:
+        """Send a request with httpx, see Transport.request."""
+        client = await self._get_client()
+        request = client.build_request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            json=json,
+            timeout=self._httpx.Timeout(timeout.total if timeout is not None else None),
+        )
+        with self._errors():
+            response = await client.send(request, stream=True)
+        try:
+            yield _HttpxResponse(method, url, response, self._errors)
+        finally:
+            await response.aclose()
+
+    async def close(self) -> None:
+        """Close the connections of the httpx client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+
+@dataclass
+class InProcessRequest:
+    """A request passed to the handler of an InProcessTransport."""
+
+    method: str
+    url: str
+    path: str
+    params: Dict[str, str]
+    headers: Dict[str, str]
+    json: Any = None
+
+
+@dataclass
+class InProcessResponse:
+    """The response of the handler of an InProcessTransport."""
+
+    status: int = 200
+    body: Union[bytes, str] = b""
+    headers: Dict[str, str] = field(default_factory=dict)  # e.g. Content-Encoding, Retry-After
+    reason: str = ""
+
+
+InProcessHandler = Callable[[InProcessRequest], Awaitable[InProcessResponse]]
+
+
+def decode_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """
+    Decode a response body according to its Content-Encoding.
+
+    Raises:
+        aiohttp.ClientPayloadError: If the encoding is not supported or the body is invalid
+    """
+    encoding = (encoding or "identity").strip().lower()
+    try:
+        if encoding == "identity":
+            return body
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            return zlib.decompress(body)
+        if encoding == "br" and brotli is not None:
+            decoded: bytes = brotli.decompress(body)
+            return decoded
+    except Exception as e:  # OSError, EOFError, zlib.error or brotli.error
+        raise aiohttp.ClientPayloadError(f"Invalid {encoding} body: {e}") from e
+    raise aiohttp.ClientPayloadError(f"Unsupported content encoding: {encoding}")
+
+
+def encode_body(body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """
+    Compress a response body with the best encoding accepted by the client.
+
+    Helper for handlers of an InProcessTransport and stand-in servers.
+
+    Args:
+        body: The body to compress
+        accept_encoding: The Accept-Encoding header of the request
+
+    Returns:
+        The body and its Content-Encoding, None if it was not compressed
+    """
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    if "br" in accepted and brotli is not None:
+        # The default quality of 11 is meant for static files and far too slow per response
+        return brotli.compress(body, quality=5), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=6), "gzip"
+    return body, None
+
+
+class _InProcessResponse(_Response):
+    """Response of the in-process transport."""
+
+    def __init__(self, method: str, url: str, response: InProcessResponse):
+        headers = CIMultiDictProxy(CIMultiDict(response.headers))
+        super().__init__(method, url, response.status, response.reason, headers)
+        body = response.body.encode() if isinstance(response.body, str) else response.body
+        self._body = decode_body(body, headers.get("Content-Encoding"))
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Yield the decoded body in chunks of at most n bytes."""
+        for start in range(0, len(self._body), n):
+            end = start + n
+            yield self._body[start:end]
+
+    async def read(self) -> bytes:
+        """Return the whole decoded body."""
+        return self._body
+
+
+class InProcessTransport(Transport):
+    """
+    Transport passing requests to a handler in the same process, without any network I/O.
+
+    The handler receives an InProcessRequest and returns an InProcessResponse. Requests carry
+    an Accept-Encoding header, and bodies with a Content-Encoding are decoded like those of a
+    real server, so that handlers can exercise the compression of the responses.
+
+    Example:
+        async def handler(request):
+            return InProcessResponse(200, json.dumps({"unit": "kWh", "aggregatedTimeSeries": []}))
+
+        client = LenedaClient(api_key, energy_id, transport=InProcessTransport(handler))
+    """
+
+    def __init__(self, handler: InProcessHandler):
+        """
+        Initialize the transport.
+
+        Args:
+            handler: Coroutine function answering the requests
+        """
+        self.handler = handler
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        params: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[ClientTimeout] = None,
+        trace_request_ctx: Any = None,
+    ) -> AsyncIterator[_Response]:
+        """Pass a request to the handler, see Transport.request."""
+        request_url = URL(url).update_query(params or {})
+        request = InProcessRequest(
+            method=method,
+            url=str(request_url),
+            path=request_url.path,
+            params=dict(request_url.query),
+            headers={"Accept-Encoding": ACCEPT_ENCODING, **headers},
+            # Serialized as over the network, so that bodies that cannot be sent fail here too
+            json=jsonlib.loads(jsonlib.dumps(json)) if json is not None else None,
+        )
+        total = timeout.total if timeout is not None else None
+        response = await asyncio.wait_for(self.handler(request), total)
+        yield _InProcessResponse(method, url, response)
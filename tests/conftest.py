@@ -0,0 +1,58 @@
+"""
+Shared helpers of the tests.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.models import MeteringData, MeteringValue
+from src.leneda.obis_codes import ObisCode
+
+START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+QUARTER_HOUR = timedelta(minutes=15)
+
+
+def metering_values(
+    count,
+    start=START,
+    value=1.0,
+    version=1,
+    calculated=False,
+    type="Actual",
+    first=0,
+    interval=QUARTER_HOUR,
+):
+    """
+    Build the values of the intervals first to first + count - 1 from start on.
+
+    value, version and calculated are either constants or functions of the interval number,
+    e.g. value=float numbers the values 0.0, 1.0, ...
+    """
+
+    def at(attribute, n):
+        return attribute(n) if callable(attribute) else attribute
+
+    return [
+        MeteringValue(at(value, n), start + interval * n, type, at(version, n), at(calculated, n))
+        for n in range(first, first + count)
+    ]
+
+
+def metering_data(
+    count,
+    start=START,
+    code="LU-METERING_POINT1",
+    obis=ObisCode.ELEC_CONSUMPTION_ACTIVE,
+    unit="kW",
+    interval=QUARTER_HOUR,
+    **options,
+):
+    """Build MeteringData of count values from start on; options go to metering_values."""
+    minutes = interval // timedelta(minutes=1)
+    interval_length = f"PT{minutes // 60}H" if minutes % 60 == 0 else f"PT{minutes}M"
+    values = metering_values(count, start, interval=interval, **options)
+    return MeteringData(code, obis, interval_length, unit, values)
@@ -0,0 +1,111 @@
+"""
+Tests for the local aggregation of time series.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.aggregation import aggregate_metering_data, aggregation_buckets
+from src.leneda.models import AggregatedMeteringData, MeteringData
+from src.leneda.obis_codes import ObisCode
+from src.leneda.timeutils import to_epoch
+from tests.conftest import metering_data
+
+UTC = timezone.utc
+
+
+class TestAggregationBuckets:
+    """Test cases for the calendar buckets."""
+
+    def test_local_days_across_daylight_saving_time(self):
+        """Test that days follow the calendar of Luxembourg, with 23 and 25 hour days."""
+        start = datetime(2023, 3, 25, tzinfo=UTC)
+        buckets = aggregation_buckets("Day", to_epoch(start), to_epoch(start + timedelta(days=3)))
+
+        assert [(end - start) // 3600 for start, end in buckets] == [23, 23, 24, 2]
+        assert buckets[1][0] == to_epoch(datetime(2023, 3, 25, 23, tzinfo=UTC))
+
+    def test_weeks_and_months(self):
+        """Test that weeks start on Monday and months on the first, local time."""
+        start = to_epoch(datetime(2022, 12, 31, 23, tzinfo=UTC))
+        end = to_epoch(datetime(2023, 3, 31, 22, tzinfo=UTC))
+
+        weeks = aggregation_buckets("Week", start, end)
+        months = aggregation_buckets("Month", start, end)
+
+        assert weeks[1][0] == to_epoch(datetime(2023, 1, 1, 23, tzinfo=UTC))  # Monday 2 January
+        assert [bucket_start for bucket_start, _ in months] == [
+            start,
+            to_epoch(datetime(2023, 1, 31, 23, tzinfo=UTC)),
+            to_epoch(datetime(2023, 2, 28, 23, tzinfo=UTC)),
+        ]
+        assert aggregation_buckets("Infinite", start, end) == [(start, end)]
+
+    def test_invalid_level(self):
+        """Test that unknown aggregation levels are rejected."""
+        with pytest.raises(ValueError):
+            aggregation_buckets("Minute", 0, 3600)
+
+
+class TestAggregateMeteringData:
+    """Test cases for aggregate_metering_data."""
+
+    def test_accumulates_power_to_energy(self):
+        """Test that kW values are accumulated to kWh per local day."""
+        start = datetime(2023, 3, 24, 23, tzinfo=UTC)
+        data = metering_data(71 * 4, start, value=2.0)  # Until 2023-03-27 22:00
+
+        result = aggregate_metering_data(data, "Day")
+
+        assert isinstance(result, AggregatedMeteringData)
+        assert result.unit == "kWh"
+        assert [item.value for item in result.aggregated_time_series] == [48.0, 46.0, 48.0]
+        assert result.aggregated_time_series[0].started_at == start
+        assert result.aggregated_time_series[1].ended_at == datetime(2023, 3, 26, 22, tzinfo=UTC)
+
+    def test_calculated_propagation_and_range(self):
+        """Test that buckets are calculated if any value is, and that the range is applied."""
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        data = metering_data(3 * 4, start)
+        items = list(data.items)
+        items[5].calculated = True
+        data.items = items
+
+        result = aggregate_metering_data(
+            data, "Hour", start=start + timedelta(hours=1), end=start + timedelta(hours=5)
+        )
+
+        assert [item.calculated for item in result.aggregated_time_series] == [True, False]
+        assert [item.value for item in result.aggregated_time_series] == [1.0, 1.0]
+        assert result.aggregated_time_series[0].started_at == start + timedelta(hours=1)
+
+    def test_quantities_are_summed(self):
+        """Test that values that are not power are summed without conversion."""
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        data = metering_data(
+            4,
+            start,
+            obis=ObisCode.GAS_CONSUMPTION_VOLUME,
+            unit="m³",
+            interval=timedelta(hours=1),
+            value=0.5,
+        )
+
+        result = aggregate_metering_data(data, "Infinite")
+
+        assert result.unit == "m³"
+        assert result.aggregated_time_series[0].value == 2.0
+        assert result.aggregated_time_series[0].ended_at == start + timedelta(hours=4)
+
+    def test_empty_series_and_invalid_mode(self):
+        """Test that an empty series gives no buckets and unknown modes are rejected."""
+        data = MeteringData("LU-METERING_POINT1", ObisCode.ELEC_CONSUMPTION_ACTIVE, "PT15M", "kW")
+        assert aggregate_metering_data(data, "Month") == AggregatedMeteringData(unit="kWh")
+        with pytest.raises(ValueError):
+            aggregate_metering_data(data, "Day", transformation_mode="Average")
@@ -0,0 +1,123 @@
+"""
+Tests for the Arrow and Parquet export.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.arrow import ParquetExporter, to_record_batch, to_record_batch_reader
+from src.leneda.bulk import MeteringDataRequest, MeteringDataResult
+from src.leneda.obis_codes import ObisCode
+from tests.conftest import metering_data
+
+UTC = timezone.utc
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+
+class TestRecordBatches:
+    """Test cases for the conversion to record batches."""
+
+    def test_to_record_batch(self):
+        """Test the columns of a record batch and that it shares the value column."""
+        data = metering_data(4, value=float, calculated=lambda n: n % 2 == 1)
+
+        batch = to_record_batch(data)
+
+        assert batch.num_rows == 4
+        assert batch.column("value").to_pylist() == [0.0, 1.0, 2.0, 3.0]
+        assert batch.column("started_at").type == pa.timestamp("s", tz="UTC")
+        assert batch.column("started_at")[1].as_py() == datetime(2023, 1, 1, 0, 15, tzinfo=UTC)
+        assert batch.column("calculated").to_pylist() == [False, True, False, True]
+        assert batch.column("type").to_pylist() == ["Actual"] * 4
+        assert batch.column("obis_code").to_pylist() == [OBIS.value] * 4
+        with pytest.raises(BufferError):
+            data.columns.values.append(4.0)
+
+    def test_reader_skips_failed_results(self):
+        """Test that the reader streams MeteringData and successful bulk results."""
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        request = MeteringDataRequest("LU-METERING_POINT2", OBIS, start, start)
+        series = [
+            metering_data(3, start),
+            MeteringDataResult(request, error=RuntimeError("failed")),
+            MeteringDataResult(request, data=metering_data(2, start, code="LU-METERING_POINT2")),
+        ]
+
+        table = to_record_batch_reader(series).read_all()
+
+        assert table.num_rows == 5
+        assert table.column("metering_point_code").to_pylist() == (
+            ["LU-METERING_POINT1"] * 3 + ["LU-METERING_POINT2"] * 2
+        )
+
+
+class TestParquetExporter:
+    """Test cases for the partitioned Parquet export."""
+
+    def test_partitions_by_meter_obis_and_month(self, tmp_path):
+        """Test that series spanning months are split into hive partitions."""
+        start = datetime(2023, 1, 31, 23, 0, tzinfo=UTC)
+        with ParquetExporter(str(tmp_path)) as exporter:
+            exporter.write_all(
+                [
+                    metering_data(8, start, value=float),
+                    metering_data(2, start, code="LU-METERING_POINT2"),
+                ]
+            )
+
+        assert exporter.rows_written == 10
+        assert len(exporter.files) == 3
+        month = os.path.join(tmp_path, "metering_point_code=LU-METERING_POINT1")
+        assert os.listdir(month) == ["obis_code=1-1%3A1.29.0"]
+
+        table = ds.dataset(str(tmp_path), partitioning="hive").to_table()
+        rows = table.sort_by([("metering_point_code", "ascending"), ("started_at", "ascending")])
+        assert rows.column("obis_code").to_pylist() == [OBIS.value] * 10
+        assert (
+            rows.column("month").to_pylist() == ["2023-01"] * 4 + ["2023-02"] * 4 + ["2023-01"] * 2
+        )
+        assert rows.column("value").to_pylist()[:8] == [float(n) for n in range(8)]
+
+    def test_row_groups_and_open_files_are_bounded(self, tmp_path):
+        """Test that rows are flushed per row group and files closed when too many are open."""
+        exporter = ParquetExporter(str(tmp_path), row_group_size=4, max_open_files=1)
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        exporter.write(metering_data(3, start))
+        assert exporter.rows_written == 0  # The rows are buffered
+        exporter.write(metering_data(3, start + timedelta(days=1)))
+        assert exporter.rows_written == 6
+        exporter.write(metering_data(1, start, code="LU-METERING_POINT2"))
+        exporter.write(metering_data(2, start + timedelta(days=2)))
+        assert exporter.rows_written == 7  # The second partition was closed
+        exporter.close()
+
+        assert exporter.rows_written == 9
+        assert len(exporter.files) == 3  # The first partition was reopened in a new file
+        assert ds.dataset(str(tmp_path), partitioning="hive").count_rows() == 9
+
+    def test_write_all_async(self, tmp_path):
+        """Test writing the results of an asynchronous iterator."""
+
+        async def results():
+            for day in range(3):
+                start = datetime(2023, 1, 1 + day, tzinfo=UTC)
+                yield metering_data(96, start)
+
+        async def export():
+            with ParquetExporter(str(tmp_path)) as exporter:
+                await exporter.write_all_async(results())
+            return exporter
+
+        exporter = asyncio.run(export())
+        assert exporter.rows_written == 288
+        assert len(exporter.files) == 1
@@ -0,0 +1,142 @@
+"""
+Tests for bulk fetching with the Leneda API client.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LenedaClient, MeteringDataRequest
+from src.leneda.bulk import run_bounded
+from src.leneda.models import MeteringData
+from src.leneda.obis_codes import ObisCode
+
+
+@pytest.mark.asyncio
+class TestBulkFetch:
+    """Test cases for LenedaClient.fetch_metering_data_bulk and run_bounded."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures."""
+        self.client = LenedaClient("test_api_key", "test_energy_id")
+        self.requests = [
+            MeteringDataRequest(
+                f"LU-METERING_POINT{i}",
+                ObisCode.ELEC_CONSUMPTION_ACTIVE,
+                "2023-01-01T00:00:00Z",
+                "2023-01-02T00:00:00Z",
+            )
+            for i in range(20)
+        ]
+
+    @patch.object(LenedaClient, "get_metering_data")
+    async def test_bulk_fetch_reports_errors_without_aborting(self, mock_get):
+        """Test that every request gets a result and failures are reported per request."""
+
+        async def side_effect(metering_point_code, obis_code, start_date_time, end_date_time):
+            if metering_point_code == "LU-METERING_POINT3":
+                raise ValueError("boom")
+            return MeteringData(metering_point_code, obis_code, "PT15M", "kW")
+
+        mock_get.side_effect = side_effect
+
+        results = [
+            result
+            async for result in self.client.fetch_metering_data_bulk(
+                self.requests, max_concurrency=4
+            )
+        ]
+
+        assert len(results) == len(self.requests)
+        failed = [result for result in results if not result.ok]
+        assert len(failed) == 1
+        assert failed[0].request.metering_point_code == "LU-METERING_POINT3"
+        assert isinstance(failed[0].error, ValueError)
+        assert all(
+            result.data.metering_point_code == result.request.metering_point_code
+            for result in results
+            if result.ok
+        )
+
+    @patch.object(LenedaClient, "get_metering_data")
+    async def test_bulk_fetch_accepts_tuples(self, mock_get):
+        """Test that plain (metering point, OBIS code, start, end) tuples are accepted."""
+        mock_get.return_value = MeteringData(
+            "LU-METERING_POINT1", ObisCode.GAS_CONSUMPTION_VOLUME, "PT1H", "m³"
+        )
+
+        results = [
+            result
+            async for result in self.client.fetch_metering_data_bulk(
+                [
+                    (
+                        "LU-METERING_POINT1",
+                        ObisCode.GAS_CONSUMPTION_VOLUME,
+                        "2023-01-01",
+                        "2023-01-02",
+                    )
+                ]
+            )
+        ]
+
+        assert results[0].ok
+        assert results[0].request == MeteringDataRequest(
+            "LU-METERING_POINT1", ObisCode.GAS_CONSUMPTION_VOLUME, "2023-01-01", "2023-01-02"
+        )
+
+    async def test_run_bounded_limits_concurrency_and_pulls_lazily(self):
+        """Test that run_bounded never exceeds the limit and applies backpressure."""
+        in_flight = 0
+        max_in_flight = 0
+        pulled = 0
+
+        def jobs():
+            nonlocal pulled
+            for i in range(100):
+                pulled += 1
+                yield i
+
+        async def worker(job):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return job * 2
+
+        outcomes = run_bounded(jobs(), worker, max_concurrency=3)
+        first = await outcomes.__anext__()
+        await asyncio.sleep(0.01)
+
+        # The consumer stopped reading: only the queue and the workers hold jobs
+        assert pulled <= 3 * 2 + 1
+        await outcomes.aclose()
+        assert first.result == first.job * 2
+        assert max_in_flight <= 3
+
+    @patch.object(LenedaClient, "get_metering_data")
+    async def test_bulk_fetch_reports_malformed_jobs(self, mock_get):
+        """Test that a malformed job fails on its own instead of aborting the batch."""
+        mock_get.return_value = MeteringData(
+            "LU-METERING_POINT1", ObisCode.ELEC_CONSUMPTION_ACTIVE, "PT15M", "kW"
+        )
+        malformed = ("LU-METERING_POINT1", ObisCode.ELEC_CONSUMPTION_ACTIVE)
+
+        results = [
+            result
+            async for result in self.client.fetch_metering_data_bulk(
+                [self.requests[0], malformed, None, self.requests[1]], max_concurrency=1
+            )
+        ]
+
+        assert [result.ok for result in results] == [True, False, False, True]
+        assert results[1].request == malformed and results[2].request is None
+        assert isinstance(results[1].error, ValueError)
+        assert mock_get.call_count == 2
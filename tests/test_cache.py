@@ -0,0 +1,107 @@
+"""
+Tests for the in-memory response cache.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import CacheTTL, LenedaClient, ResponseCache
+from src.leneda.obis_codes import ObisCode
+from tests.conftest import metering_data
+
+ENDPOINT = "metering-points/LU-METERING_POINT1/time-series"
+
+
+def params(start="2023-01-01T00:00:00Z", end="2023-01-02T00:00:00Z"):
+    """Build time series query parameters."""
+    return {
+        "obisCode": ObisCode.ELEC_CONSUMPTION_ACTIVE.value,
+        "startDateTime": start,
+        "endDateTime": end,
+    }
+
+
+class TestResponseCache:
+    """Test cases for the ResponseCache class."""
+
+    def test_hit_miss_and_key_normalization(self):
+        """Test that equivalent date parameters share one entry."""
+        cache = ResponseCache()
+        data = metering_data(4)
+
+        assert cache.get(ENDPOINT, params()) is None
+        cache.set(ENDPOINT, params(), data)
+
+        assert cache.get(ENDPOINT, params("2023-01-01T01:00:00+01:00")) is data
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_lru_eviction_by_rows(self):
+        """Test that the least recently used entries are evicted to stay within max_rows."""
+        cache = ResponseCache(max_rows=25)
+        cache.set(ENDPOINT, params(end="2023-01-02T00:00:00Z"), metering_data(9))
+        cache.set(ENDPOINT, params(end="2023-01-03T00:00:00Z"), metering_data(9))
+        cache.get(ENDPOINT, params(end="2023-01-02T00:00:00Z"))
+        cache.set(ENDPOINT, params(end="2023-01-04T00:00:00Z"), metering_data(9))
+
+        assert len(cache) == 2
+        assert cache.rows == 20
+        assert cache.stats.evictions == 1
+        assert cache.get(ENDPOINT, params(end="2023-01-03T00:00:00Z")) is None
+        assert cache.get(ENDPOINT, params(end="2023-01-02T00:00:00Z")) is not None
+
+    def test_ttl_depends_on_data_age(self):
+        """Test that recent data expires and historical data is kept."""
+        cache = ResponseCache(ttls={"time-series": CacheTTL(recent=60, historical=None)})
+        now = datetime.now(timezone.utc)
+        recent = params(end=now.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        cache.set(ENDPOINT, recent, metering_data(1))
+        cache.set(ENDPOINT, params(), metering_data(1))
+
+        with patch("src.leneda.cache.time.monotonic", return_value=10**9):
+            assert cache.get(ENDPOINT, recent) is None
+            assert cache.get(ENDPOINT, params()) is not None
+
+        assert cache.stats.expirations == 1
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that a TTL of zero prevents caching."""
+        cache = ResponseCache(ttls={"time-series": CacheTTL(recent=0, historical=0)})
+        cache.set(ENDPOINT, params(), metering_data(1))
+        assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+class TestClientCache:
+    """Test cases for the cache integration in LenedaClient."""
+
+    async def test_cached_response_skips_request(self):
+        """Test that a cached response is returned without calling the API."""
+        client = LenedaClient("test_api_key", "test_energy_id", cache=ResponseCache())
+        response = metering_data(2).to_dict()
+        response["obisCode"] = ObisCode.ELEC_CONSUMPTION_ACTIVE.value
+
+        with patch.object(client, "_make_request", return_value=response) as mock_request:
+            first = await client.get_metering_data(
+                "LU-METERING_POINT1",
+                ObisCode.ELEC_CONSUMPTION_ACTIVE,
+                "2023-01-01T00:00:00Z",
+                "2023-01-02T00:00:00Z",
+            )
+            second = await client.get_metering_data(
+                "LU-METERING_POINT1",
+                ObisCode.ELEC_CONSUMPTION_ACTIVE,
+                "2023-01-01T00:00:00Z",
+                "2023-01-02T00:00:00Z",
+            )
+
+        assert mock_request.call_count == 1
+        assert second is first
+        assert client.cache.stats.hits == 1
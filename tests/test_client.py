@@ -2,10 +2,12 @@
 Tests for the Leneda API client.
 """
 
+import asyncio
 import json
 import os
 import sys
 import unittest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, patch
 
 import aiohttp
@@ -26,6 +28,7 @@ from src.leneda.models import (
     MeteringValue,
 )
 from src.leneda.obis_codes import ObisCode
+from src.leneda.retry import RetryPolicy
 
 
 @pytest.mark.asyncio
@@ -87,7 +90,7 @@ class TestLenedaClient:
         # Set up the mock response
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=self.sample_metering_data)
+        mock_response.read = AsyncMock(return_value=json.dumps(self.sample_metering_data).encode())
         mock_response.content = json.dumps(self.sample_metering_data).encode()
         mock_response.raise_for_status = lambda: None
         mock_request.return_value.__aenter__.return_value = mock_response
@@ -136,7 +139,9 @@ class TestLenedaClient:
         # Set up the mock response
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=self.sample_aggregated_data)
+        mock_response.read = AsyncMock(
+            return_value=json.dumps(self.sample_aggregated_data).encode()
+        )
         mock_response.content = json.dumps(self.sample_aggregated_data).encode()
         mock_response.raise_for_status = lambda: None
         mock_request.return_value.__aenter__.return_value = mock_response
@@ -188,8 +193,8 @@ class TestLenedaClient:
         # Set up the mock response
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(
-            return_value={"requestId": "test-request-id", "status": "PENDING"}
+        mock_response.read = AsyncMock(
+            return_value=json.dumps({"requestId": "test-request-id", "status": "PENDING"}).encode()
         )
         mock_response.raise_for_status = lambda: None
         mock_request.return_value.__aenter__.return_value = mock_response
@@ -288,7 +293,9 @@ class TestLenedaClient:
         # Set up the mock response with valid data
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value={"unit": "kWh", "aggregatedTimeSeries": []})
+        mock_response.read = AsyncMock(
+            return_value=json.dumps({"unit": "kWh", "aggregatedTimeSeries": []}).encode()
+        )
         mock_response.raise_for_status = lambda: None
         mock_request.return_value.__aenter__.return_value = mock_response
 
@@ -309,7 +316,9 @@ class TestLenedaClient:
         # Set up the mock response with null unit
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value={"unit": None, "aggregatedTimeSeries": []})
+        mock_response.read = AsyncMock(
+            return_value=json.dumps({"unit": None, "aggregatedTimeSeries": []}).encode()
+        )
         mock_response.raise_for_status = lambda: None
         mock_request.return_value.__aenter__.return_value = mock_response
 
@@ -359,6 +368,191 @@ class TestLenedaClient:
         # Check that the probe was called for each OBIS code
         assert mock_probe.call_count == len(ObisCode)
 
+    @patch.object(LenedaClient, "probe_metering_point_obis_code")
+    async def test_get_supported_obis_codes_subset_concurrently(self, mock_probe):
+        """Test probing a subset of OBIS codes concurrently with a concurrency limit."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def side_effect(metering_point_code, obis_code):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return obis_code != ObisCode.GAS_CONSUMPTION_VOLUME
+
+        mock_probe.side_effect = side_effect
+        subset = [
+            ObisCode.GAS_CONSUMPTION_VOLUME,
+            ObisCode.GAS_CONSUMPTION_ENERGY,
+            ObisCode.ELEC_CONSUMPTION_ACTIVE,
+        ]
+
+        result = await self.client.get_supported_obis_codes(
+            "LU-METERING_POINT1", obis_codes=subset, max_concurrency=2
+        )
+
+        assert result == [ObisCode.GAS_CONSUMPTION_ENERGY, ObisCode.ELEC_CONSUMPTION_ACTIVE]
+        assert mock_probe.call_count == 3
+        assert max_in_flight == 2
+
+        for max_concurrency in (0, -1):
+            with pytest.raises(ValueError):
+                await self.client.get_supported_obis_codes(
+                    "LU-METERING_POINT1", obis_codes=subset, max_concurrency=max_concurrency
+                )
+        assert mock_probe.call_count == 3
+
+    @patch.object(LenedaClient, "probe_metering_point_obis_code")
+    async def test_get_supported_obis_codes_skip_sharing_layers(self, mock_probe):
+        """Test that sharing-layer codes are not probed when their base code has no data."""
+        mock_probe.side_effect = lambda metering_point_code, obis_code: obis_code in [
+            ObisCode.ELEC_PRODUCTION_ACTIVE,
+            ObisCode.ELEC_PRODUCTION_SHARED_LAYER1,
+        ]
+
+        result = await self.client.get_supported_obis_codes(
+            "LU-METERING_POINT1", skip_sharing_layers=True
+        )
+
+        assert result == [ObisCode.ELEC_PRODUCTION_ACTIVE, ObisCode.ELEC_PRODUCTION_SHARED_LAYER1]
+        probed = {call.args[1] for call in mock_probe.call_args_list}
+        assert ObisCode.ELEC_CONSUMPTION_COVERED_LAYER1 not in probed
+        assert ObisCode.ELEC_CONSUMPTION_REMAINING not in probed
+        assert ObisCode.ELEC_PRODUCTION_SHARED_LAYER4 in probed
+        assert mock_probe.call_count == len(ObisCode) - 5
+
+    async def test_get_time_series_chunked(self):
+        """Test that long ranges are fetched in chunks, retried and stitched without duplicates."""
+        calls = []
+        failed_once = set()
+
+        async def fake_send(method, url, params, json_data, event):
+            start = datetime.strptime(params["startDateTime"], "%Y-%m-%dT%H:%M:%SZ")
+            end = datetime.strptime(params["endDateTime"], "%Y-%m-%dT%H:%M:%SZ")
+            calls.append((start, end))
+            if start.day == 2 and start not in failed_once:
+                failed_once.add(start)
+                raise aiohttp.ClientConnectionError("Connection reset")
+
+            # Boundaries are inclusive, so the value at the chunk boundary is returned twice
+            items = []
+            current = start
+            while current <= end:
+                items.append(
+                    {
+                        "value": current.hour,
+                        "startedAt": current.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        "type": "Actual",
+                        "version": 2,
+                        "calculated": False,
+                    }
+                )
+                current += timedelta(minutes=15)
+            return {**self.sample_metering_data, "items": items}
+
+        client = LenedaClient(
+            self.api_key,
+            self.energy_id,
+            chunk_size=timedelta(days=1),
+            retry_policy=RetryPolicy(base_delay=0.001),
+        )
+        with patch.object(client, "_send_request", side_effect=fake_send):
+            result = await client.get_metering_data(
+                "LU-METERING_POINT1",
+                ObisCode.ELEC_CONSUMPTION_ACTIVE,
+                datetime(2023, 1, 1),
+                datetime(2023, 1, 4),
+            )
+
+        # Three chunks, the failed one retried once by the retry policy, the others fetched once
+        assert len(calls) == 4 and client.retry_stats.retries == 1
+        assert calls.count((datetime(2023, 1, 2), datetime(2023, 1, 3))) == 2
+        assert len(result.items) == 3 * 96 + 1
+        started = [item.started_at for item in result.items]
+        assert started == sorted(set(started))
+
+    async def test_time_series_range_in_other_timezone(self):
+        """Test that aware datetimes are sent in UTC, whether the range is chunked or not."""
+        calls = []
+
+        async def fake_request(method, endpoint, params=None, json_data=None):
+            calls.append((params["startDateTime"], params["endDateTime"]))
+            return {**self.sample_metering_data, "items": []}
+
+        cest = timezone(timedelta(hours=2))
+        start = datetime(2023, 6, 1, 2, tzinfo=cest)
+        for chunk_size in (None, timedelta(days=1)):
+            client = LenedaClient(self.api_key, self.energy_id, chunk_size=chunk_size)
+            with patch.object(client, "_make_request", side_effect=fake_request):
+                await client.get_metering_data(
+                    "LU-METERING_POINT1",
+                    ObisCode.ELEC_CONSUMPTION_ACTIVE,
+                    start,
+                    start + timedelta(hours=12),
+                )
+
+        assert calls == [("2023-06-01T00:00:00Z", "2023-06-01T12:00:00Z")] * 2
+
+    async def test_identical_requests_are_coalesced(self):
+        """Test that concurrent identical requests share one API call and its result."""
+
+        async def fake_request(method, endpoint, params=None, json_data=None):
+            await asyncio.sleep(0.01)
+            return self.sample_metering_data
+
+        with patch.object(self.client, "_make_request", side_effect=fake_request) as mock_request:
+            args = (
+                "LU-METERING_POINT1",
+                ObisCode.ELEC_CONSUMPTION_ACTIVE,
+                "2023-01-01T00:00:00Z",
+            )
+            results = await asyncio.gather(
+                self.client.get_metering_data(*args, "2023-01-02T00:00:00Z"),
+                self.client.get_metering_data(*args, "2023-01-02T00:00:00Z"),
+                self.client.get_metering_data(*args, "2023-01-03T00:00:00Z"),
+            )
+
+            assert mock_request.call_count == 2
+            assert results[0] is results[1]
+            assert results[0] is not results[2]
+            assert self.client.single_flight.coalesced == 1
+            assert self.client.single_flight.in_flight == 0
+
+            # Once the call finished, the next request goes to the API again
+            await self.client.get_metering_data(*args, "2023-01-02T00:00:00Z")
+            assert mock_request.call_count == 3
+
+    async def test_context_manager_reuses_and_closes_session(self):
+        """Test that the client keeps one pooled session and closes it on exit."""
+        async with LenedaClient(self.api_key, self.energy_id, connector_limit=10) as client:
+            session = await client._get_session()
+            assert await client._get_session() is session
+            assert session.connector.limit == 10
+            assert not session.closed
+
+        assert session.closed
+
+    async def test_session_of_previous_loop_is_closed(self):
+        """Test that the session of a finished event loop is closed when it is replaced."""
+        client = LenedaClient(self.api_key, self.energy_id)
+        loop = asyncio.get_running_loop()
+        old = await loop.run_in_executor(None, asyncio.run, client._get_session())
+
+        session = await client._get_session()
+
+        assert session is not old and old.closed and not session.closed
+        await client.close()
+
+    async def test_shared_session_is_not_closed(self):
+        """Test that a caller-supplied session is used and left open."""
+        async with aiohttp.ClientSession() as session:
+            async with LenedaClient(self.api_key, self.energy_id, session=session) as client:
+                assert await client._get_session() is session
+
+            assert not session.closed
+
 
 if __name__ == "__main__":
     unittest.main()
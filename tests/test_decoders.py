@@ -0,0 +1,121 @@
+"""
+Tests for the JSON decoder backends and the decoding of the models.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LenedaClient
+from src.leneda.decoders import JSON_BACKENDS, get_json_loads
+from src.leneda.models import AggregatedMeteringData, MeteringData
+from src.leneda.obis_codes import ObisCode
+
+BODY = '{"unit": "kW", "items": [{"value": 1.5}]}'
+
+
+class TestJsonBackends:
+    """Test cases for the selection of the JSON backend."""
+
+    @pytest.mark.parametrize("backend", [None, *JSON_BACKENDS])
+    def test_backends_decode_alike(self, backend):
+        """Test that every installed backend decodes str and bytes like the json module."""
+        try:
+            loads = get_json_loads(backend)
+        except ValueError:
+            pytest.skip(f"{backend} is not installed")
+        assert loads(BODY) == json.loads(BODY)
+        assert loads(BODY.encode()) == json.loads(BODY)
+        with pytest.raises(json.JSONDecodeError):
+            loads('{"unit": ')
+
+    def test_unknown_backend(self):
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            get_json_loads("simplejson")
+        with pytest.raises(ValueError):
+            LenedaClient("test_api_key", "test_energy_id", json_backend="simplejson")
+
+
+class TestModelDecoding:
+    """Test cases for the one-pass decoding of responses into models."""
+
+    def test_invalid_rows_are_summarized(self, caplog):
+        """Test that invalid rows are skipped, counted and logged once."""
+        valid = {
+            "value": 1.0,
+            "startedAt": "2023-01-01T00:00:00Z",
+            "type": "Actual",
+            "version": 1,
+            "calculated": False,
+        }
+        items = [
+            valid,
+            {**valid, "startedAt": "2023-01-01T00:15:00Z", "version": "x"},
+            {**valid, "startedAt": "not a date"},
+            {**valid, "startedAt": "2023-01-01T00:30:00Z", "value": 3.0},
+            "junk",
+        ]
+        data = MeteringData.from_dict(
+            {
+                "meteringPointCode": "LU-METERING_POINT1",
+                "obisCode": ObisCode.ELEC_CONSUMPTION_ACTIVE.value,
+                "intervalLength": "PT15M",
+                "unit": "kW",
+                "items": items,
+            }
+        )
+
+        assert [item.value for item in data.items] == [1.0, 3.0]
+        assert len(data.columns.versions) == len(data.columns.values) == 2
+        assert data.invalid_rows.count == 3
+        assert [index for index, _ in data.invalid_rows.samples] == [1, 2, 4]
+        assert len([r for r in caplog.records if r.levelname == "WARNING"]) == 1
+
+    @pytest.mark.parametrize("interval_length", ["PT15M", None, "PT7.5Q"])
+    def test_empty_timestamps_are_invalid_rows(self, interval_length):
+        """Test that empty timestamps after off-grid rows or without a grid are skipped."""
+        items = [
+            {"value": n, "startedAt": started_at, "type": "Actual", "version": 1, "calculated": 0}
+            for n, started_at in enumerate(
+                ["2023-01-01T00:00:00Z", "2023-01-01T00:07:00Z", "", "2023-01-01T00:15:00Z", ""]
+            )
+        ]
+        body = {
+            "meteringPointCode": "LU-METERING_POINT1",
+            "obisCode": ObisCode.ELEC_CONSUMPTION_ACTIVE.value,
+            "unit": "kW",
+            "items": items,
+        }
+        if interval_length is not None:
+            body["intervalLength"] = interval_length
+        data = MeteringData.from_dict(body)
+
+        assert [item.value for item in data.items] == [0.0, 1.0, 3.0]
+        assert len(data.columns.timestamps) == len(data.columns.versions) == 3
+        assert [index for index, _ in data.invalid_rows.samples] == [2, 4]
+
+    def test_aggregated_invalid_rows(self):
+        """Test that invalid aggregated rows are skipped and counted."""
+        data = AggregatedMeteringData.from_dict(
+            {
+                "unit": "kWh",
+                "aggregatedTimeSeries": [
+                    {
+                        "value": 10.0,
+                        "startedAt": "2023-01-01T00:00:00Z",
+                        "endedAt": "2023-01-02T00:00:00Z",
+                        "calculated": False,
+                    },
+                    {"value": 12.0},
+                ],
+            }
+        )
+        assert len(data.aggregated_time_series) == 1
+        assert data.invalid_rows.count == 1
+        assert data == AggregatedMeteringData("kWh", data.aggregated_time_series)
@@ -0,0 +1,145 @@
+"""
+Tests for the request instrumentation.
+"""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LatencyAggregator, LenedaClient, RetryPolicy
+from src.leneda.instrumentation import LatencyHistogram, endpoint_label
+from src.leneda.obis_codes import ObisCode
+
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+METERING_DATA = {
+    "meteringPointCode": "LU-METERING_POINT1",
+    "obisCode": OBIS.value,
+    "intervalLength": "PT15M",
+    "unit": "kW",
+    "items": [
+        {
+            "value": 1.0,
+            "startedAt": "2023-01-01T00:00:00Z",
+            "type": "Actual",
+            "version": 1,
+            "calculated": False,
+        }
+    ],
+}
+
+
+class TestLatencyHistogram:
+    """Test cases for the LatencyHistogram and LatencyAggregator classes."""
+
+    def test_quantiles(self):
+        """Test quantile estimates from the buckets."""
+        histogram = LatencyHistogram(bounds=(0.1, 0.2, 0.5))
+        for seconds in [0.05] * 50 + [0.15] * 49 + [2.0]:
+            histogram.observe(seconds)
+
+        assert histogram.count == 100
+        assert histogram.counts == [50, 49, 0, 1]
+        assert histogram.quantile(0.5) == pytest.approx(0.1)
+        assert 0.1 < histogram.quantile(0.9) <= 0.2
+        assert histogram.quantile(1.0) == 2.0
+        assert histogram.mean == pytest.approx((2.5 + 49 * 0.15 + 2.0) / 100)
+
+    def test_endpoint_label(self):
+        """Test that metering point codes are removed from endpoint labels."""
+        label = endpoint_label("metering-points/LU0001/time-series/aggregated")
+        assert label == "metering-points/{meteringPointCode}/time-series/aggregated"
+        assert endpoint_label("metering-data-access-request") == "metering-data-access-request"
+
+
+@pytest.mark.asyncio
+class TestRequestEvents:
+    """Test cases for the request events reported by the client."""
+
+    async def test_events_from_a_real_server(self):
+        """Test the timings, status and size reported for requests to a local server."""
+        # A non-ASCII unit, so that the size in bytes differs from the length of the text
+        body = json.dumps({**METERING_DATA, "unit": "m³"}, ensure_ascii=False)
+
+        async def time_series(request):
+            return web.Response(text=body, content_type="application/json")
+
+        app = web.Application()
+        app.router.add_get("/api/metering-points/{code}/time-series", time_series)
+        async with TestServer(app) as server:
+            aggregator = LatencyAggregator()
+            events = []
+            async with LenedaClient(
+                "test_api_key", "test_energy_id", observers=[aggregator, events.append]
+            ) as client:
+                client.BASE_URL = str(server.make_url("/api"))
+                for day in (1, 2):
+                    await client.get_metering_data(
+                        "LU-METERING_POINT1",
+                        OBIS,
+                        f"2023-01-0{day}T00:00:00Z",
+                        f"2023-01-0{day + 1}T00:00:00Z",
+                    )
+
+        assert len(events) == 2
+        event = events[0]
+        assert event.ok and event.status == 200 and event.retries == 0
+        assert event.endpoint == "metering-points/{meteringPointCode}/time-series"
+        # The size of the raw body in bytes, not the number of decoded characters
+        assert event.bytes_received == len(body.encode()) > len(body)
+        assert event.connection_acquire is not None
+        assert event.ttfb is not None and event.ttfb > 0
+        assert event.model_build > 0 and event.decode > 0
+        assert event.total >= event.ttfb + event.download + event.decode + event.model_build
+
+        summary = aggregator.summary()["metering-points/{meteringPointCode}/time-series"]
+        assert summary["requests"] == 2
+        assert summary["statuses"] == {200: 2}
+        assert summary["latencies"]["total"]["count"] == 2
+        assert summary["latencies"]["total"]["p99"] > 0
+
+    async def test_retries_and_errors_are_reported(self):
+        """Test that retries are counted and failures reported with their error."""
+        events = []
+        client = LenedaClient(
+            "test_api_key",
+            "test_energy_id",
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0),
+            observers=[events.append],
+        )
+        error = aiohttp.ClientResponseError(request_info=MagicMock(), history=(), status=502)
+        args = ("LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z")
+
+        with patch.object(client, "_send_request", side_effect=[error, METERING_DATA]):
+            await client.get_metering_data(*args)
+        with patch.object(client, "_send_request", side_effect=[error, error]):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client.get_metering_data(*args)
+
+        assert [(event.ok, event.retries) for event in events] == [(True, 1), (False, 1)]
+        assert events[1].error is error
+
+    async def test_observer_errors_do_not_fail_requests(self):
+        """Test that a failing observer is logged and ignored."""
+
+        def failing_observer(event):
+            raise RuntimeError("observer bug")
+
+        client = LenedaClient("test_api_key", "test_energy_id")
+        client.add_observer(failing_observer)
+        with patch.object(client, "_send_request", return_value=METERING_DATA):
+            data = await client.get_metering_data(
+                "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+            )
+        assert data.unit == "kW"
+        client.remove_observer(failing_observer)
+        assert client.observers == []
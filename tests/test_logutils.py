@@ -0,0 +1,71 @@
+"""
+Tests for the logging helpers.
+"""
+
+import json
+import logging
+import os
+import sys
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.logutils import PayloadLogging, TruncatedPayload
+from src.leneda.models import MeteringData
+from src.leneda.obis_codes import ObisCode
+
+logger = logging.getLogger("leneda.tests")
+
+
+class Unformattable:
+    """An object that fails the test if it is ever formatted."""
+
+    def __str__(self):
+        raise AssertionError("payload was formatted")
+
+    __repr__ = __str__
+
+
+class TestLogUtils:
+    """Test cases for the logutils module."""
+
+    def test_truncated_payload(self):
+        """Test that payloads are serialized up to max_chars only."""
+        payload = {"items": [{"value": n} for n in range(100000)]}
+        formatted = str(TruncatedPayload(payload, 50))
+        assert formatted.startswith('{"items": [{"value": 0}')
+        assert formatted.endswith("... (truncated)")
+        assert len(formatted) == 50 + len("... (truncated)")
+        assert str(TruncatedPayload({"a": 1}, 50)) == json.dumps({"a": 1})
+
+    def test_payload_logging_disabled_level(self, caplog):
+        """Test that nothing is formatted while debug logging is disabled."""
+        caplog.set_level(logging.INFO, logger="leneda.tests")
+        PayloadLogging(sample_rate=1.0).log(logger, "Response data", Unformattable())
+        assert not caplog.records
+
+    def test_payload_logging_sampling(self, caplog):
+        """Test that only sampled payloads are logged."""
+        caplog.set_level(logging.DEBUG, logger="leneda.tests")
+        PayloadLogging(sample_rate=0.0).log(logger, "Response data", Unformattable())
+        PayloadLogging(sample_rate=1.0, max_chars=10).log(logger, "Response data", [1] * 100)
+        assert [record.getMessage() for record in caplog.records] == [
+            "Response data: [1, 1, 1, ... (truncated)"
+        ]
+
+    def test_models_do_not_format_responses(self, caplog):
+        """Test that decoding a response does not format it, even in debug mode."""
+        caplog.set_level(logging.DEBUG, logger="leneda")
+
+        class Response(dict):
+            __str__ = __repr__ = Unformattable.__str__
+
+        data = MeteringData.from_dict(
+            Response(
+                meteringPointCode="LU-METERING_POINT1",
+                obisCode=ObisCode.ELEC_CONSUMPTION_ACTIVE.value,
+                unit="kW",
+                items=[],
+            )
+        )
+        assert data.unit == "kW"
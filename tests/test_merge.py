@@ -0,0 +1,87 @@
+"""
+Tests for the merging of time series fragments.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.merge import MergePolicy, merge_metering_data
+from src.leneda.models import MeteringData
+from src.leneda.obis_codes import ObisCode
+from tests.conftest import metering_data
+
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+
+class TestMergeMeteringData:
+    """Test cases for merge_metering_data."""
+
+    def test_consecutive_chunks(self):
+        """Test that chunks sharing their boundary values are joined without duplicates."""
+        chunks = [
+            metering_data(5, value=float),
+            metering_data(5, first=4, value=float),
+            metering_data(3, first=8, value=float),
+        ]
+
+        merged = merge_metering_data(chunks)
+
+        assert [item.value for item in merged.items] == [float(n) for n in range(11)]
+        assert merged.unit == "kW" and merged.interval_length == "PT15M"
+
+    def test_highest_version_wins(self):
+        """Test that revised values replace older versions, whatever the fragment order."""
+        base = metering_data(10, version=1, value=1.0)
+        repoll = metering_data(2, first=6, version=2, value=2.0)
+        stale = metering_data(3, first=7, version=1, value=3.0)
+
+        merged = merge_metering_data([base, repoll, stale])
+
+        assert [item.value for item in merged.items] == [1.0] * 6 + [2.0, 2.0, 3.0, 3.0]
+        assert [item.version for item in merged.items][6:8] == [2, 2]
+
+    def test_tie_breaks(self):
+        """Test the tie-breaks between values of the same version."""
+        measured = metering_data(2, type="Actual", value=1.0)
+        calculated = metering_data(2, type="Corrected", calculated=True, value=2.0)
+        corrected = metering_data(2, type="Corrected", value=3.0)
+
+        assert merge_metering_data([measured, calculated]).items[0].value == 1.0
+        policy = MergePolicy(prefer_measured=False)
+        assert merge_metering_data([measured, calculated], policy).items[0].value == 2.0
+
+        assert merge_metering_data([measured, corrected]).items[0].value == 3.0
+        policy = MergePolicy(prefer_later=False)
+        assert merge_metering_data([measured, corrected], policy).items[0].value == 1.0
+        policy = MergePolicy(type_priority=("Actual",))
+        assert merge_metering_data([measured, corrected], policy).items[0].value == 1.0
+
+    def test_empty_and_mismatched_fragments(self):
+        """Test that empty fragments are skipped and other series rejected."""
+        empty = MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW")
+        assert len(merge_metering_data([empty]).columns) == 0
+        assert len(merge_metering_data([empty, metering_data(3), empty]).columns) == 3
+
+        other = metering_data(1, code="LU-METERING_POINT2")
+        with pytest.raises(ValueError):
+            merge_metering_data([metering_data(3), other])
+        with pytest.raises(ValueError):
+            merge_metering_data([])
+
+    def test_unsorted_fragments(self):
+        """Test that unsorted fragments are sorted and intervals held twice rejected."""
+        shuffled = metering_data(6, value=float)
+        shuffled.items = [shuffled.items[n] for n in (3, 0, 5, 1, 4, 2)]
+
+        merged = merge_metering_data([shuffled, metering_data(3, first=4, value=float)])
+
+        assert [item.value for item in merged.items] == [float(n) for n in range(7)]
+        twice = metering_data(2)
+        twice.items = [*twice.items, twice.items[0]]
+        with pytest.raises(ValueError):
+            merge_metering_data([twice])
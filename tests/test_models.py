@@ -0,0 +1,174 @@
+"""
+Tests for the data models.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import models
+from src.leneda.models import (
+    AggregatedMeteringData,
+    AggregatedMeteringValue,
+    MeteringColumns,
+    MeteringData,
+    type_code,
+    type_name,
+    type_names,
+)
+from src.leneda.obis_codes import ObisCode
+from tests.conftest import metering_values
+
+UTC = timezone.utc
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+# Values, versions and calculated flags varying from one interval to the next
+VARYING = {
+    "value": lambda n: n * 0.25,
+    "version": lambda n: 1 + n % 2,
+    "calculated": lambda n: n % 3 == 0,
+}
+
+
+class TestMeteringColumns:
+    """Test cases for the columnar storage of MeteringData."""
+
+    def test_items_round_trip(self):
+        """Test that values passed as items come back unchanged through the row view."""
+        values = metering_values(10, **VARYING)
+        data = MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW", values)
+
+        assert len(data.items) == 10
+        assert data.items == values
+        assert list(data.items) == values
+        assert data.items[-1] == values[-1]
+        assert data.items[2:5] == values[2:5]
+        assert data.items[0].started_at.tzinfo is not None
+        with pytest.raises(IndexError):
+            data.items[10]
+
+    def test_items_setter(self):
+        """Test that assigning items replaces the columns."""
+        data = MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW")
+        assert len(data.items) == 0
+        data.items = metering_values(3, **VARYING)
+        assert len(data.columns) == 3
+
+    def test_columns(self):
+        """Test the column representation and its memory use."""
+        values = metering_values(35040, **VARYING)
+        columns = MeteringColumns.from_values(values)
+
+        assert columns.values[1] == 0.25
+        assert columns.timestamps[0] == int(datetime(2023, 1, 1, tzinfo=UTC).timestamp())
+        assert columns.versions[:2].tolist() == [1, 2]
+        assert columns.calculated[:3].tolist() == [1, 0, 0]
+        assert columns.nbytes < 35040 * 24
+        assert columns.take([1, 0]).values.tolist() == [0.25, 0.0]
+
+    def test_equality_and_construction(self):
+        """Test that data built from columns or from items compare equal."""
+        values = metering_values(4, **VARYING)
+        from_items = MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW", values)
+        from_columns = MeteringData(
+            "LU-METERING_POINT1", OBIS, "PT15M", "kW", columns=MeteringColumns.from_values(values)
+        )
+        assert from_items == from_columns
+        with pytest.raises(ValueError):
+            MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW", values, from_items.columns)
+
+    def test_type_registry(self, monkeypatch):
+        """Test that concurrent registrations get distinct codes and the table is capped."""
+        names = [f"Type-{n}" for n in range(200)]
+        with ThreadPoolExecutor(8) as executor:
+            codes = list(executor.map(type_code, names * 4))
+
+        assert codes[:200] == codes[200:400] == codes[600:]
+        assert len(set(codes[:200])) == 200
+        assert [type_name(code) for code in codes[:200]] == names
+
+        monkeypatch.setattr(models, "MAX_VALUE_TYPES", len(type_names()))
+        assert type_code("Type-0") == codes[0]
+        with pytest.raises(ValueError):
+            type_code("Type-200")
+        with pytest.raises(ValueError):
+            type_code(None)
+
+
+class TestArrayExports:
+    """Test cases for the numpy and pandas exports."""
+
+    def test_to_numpy_shares_memory(self):
+        """Test that the numpy arrays are read-only views of the columns."""
+        np = pytest.importorskip("numpy")
+        data = MeteringData(
+            "LU-METERING_POINT1", OBIS, "PT15M", "kW", metering_values(96, **VARYING)
+        )
+
+        started_at, values = data.to_numpy()
+
+        assert values.dtype == np.float64 and values[1] == 0.25
+        assert started_at.dtype == np.dtype("datetime64[s]")
+        assert started_at[1] == np.datetime64("2023-01-01T00:15:00")
+        assert np.shares_memory(values, np.frombuffer(data.columns.values, dtype=np.float64))
+        assert not values.flags.writeable
+        with pytest.raises(BufferError):
+            data.columns.values.append(1.0)
+
+    def test_to_pandas(self):
+        """Test the DataFrame of a time series."""
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("pandas")
+        values = metering_values(96, **VARYING)
+        data = MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW", values)
+
+        df = data.to_pandas(tz="Europe/Luxembourg")
+
+        assert str(df.index.tz) == "Europe/Luxembourg"
+        assert df.index.name == "started_at"
+        assert df.index[0] == values[0].started_at
+        assert df["value"].dtype == np.float64
+        assert np.shares_memory(df["value"].to_numpy(), data.to_numpy()[1])
+        assert list(df["type"].cat.categories) == ["Actual"]
+        assert df["version"].tolist() == [value.version for value in values]
+        assert df["calculated"].tolist() == [value.calculated for value in values]
+
+    def test_empty_to_pandas(self):
+        """Test that an empty time series gives an empty DataFrame."""
+        pytest.importorskip("pandas")
+        df = MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW").to_pandas()
+        assert len(df) == 0
+        assert str(df.index.tz) == "UTC"
+
+    def test_aggregated_to_pandas(self):
+        """Test the exports of aggregated data."""
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("pandas")
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        data = AggregatedMeteringData(
+            "kWh",
+            [
+                AggregatedMeteringValue(
+                    float(n), start + timedelta(days=n), start + timedelta(days=n + 1), n == 1
+                )
+                for n in range(3)
+            ],
+        )
+
+        started_at, values = data.to_numpy()
+        df = data.to_pandas()
+
+        assert values.tolist() == [0.0, 1.0, 2.0]
+        assert started_at[2] == np.datetime64("2023-01-03T00:00:00")
+        assert np.shares_memory(values, np.frombuffer(data.columns.values, dtype=np.float64))
+        assert not values.flags.writeable
+        assert data.aggregated_time_series[1].calculated and len(data.aggregated_time_series) == 3
+        assert df.index[1] == start + timedelta(days=1)
+        assert df["ended_at"].iloc[0] == start + timedelta(days=1)
+        assert df["calculated"].tolist() == [False, True, False]
@@ -0,0 +1,119 @@
+"""
+Tests for the aggregation query planner.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.client import LenedaClient
+from src.leneda.models import AggregatedMeteringData, AggregatedMeteringValue
+from src.leneda.obis_codes import ObisCode
+from src.leneda.planner import LOCAL, PARTIAL, REMOTE, AggregationPlanner
+from src.leneda.store import SQLiteIntervalStore
+from tests.conftest import metering_data
+
+UTC = timezone.utc
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+METERING_POINT = "LU-METERING_POINT1"
+
+# Start of 1 January 2023 in Luxembourg
+DAY_START = datetime(2022, 12, 31, 23, tzinfo=UTC)
+
+
+def api_day(day, value):
+    """Build the aggregated response of the API for a local day of January 2023."""
+    started_at = DAY_START + timedelta(days=day - 1)
+    return AggregatedMeteringData(
+        unit="kWh",
+        aggregated_time_series=[
+            AggregatedMeteringValue(value, started_at, started_at + timedelta(days=1), False)
+        ],
+    )
+
+
+@pytest.mark.asyncio
+class TestAggregationPlanner:
+    """Test cases for the AggregationPlanner class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = LenedaClient("test_api_key", "test_energy_id")
+
+    async def test_local_from_memory(self):
+        """Test that buckets covered by values in memory need no request."""
+        planner = AggregationPlanner(self.client)
+        planner.add(metering_data(2 * 96, DAY_START, code=METERING_POINT))
+
+        with patch.object(self.client, "get_aggregated_metering_data", AsyncMock()) as fetch:
+            result = await planner.get_aggregated_metering_data(
+                METERING_POINT, OBIS, "2023-01-01", "2023-01-02"
+            )
+
+        fetch.assert_not_called()
+        assert result.plan.path == LOCAL
+        assert result.plan.sources == ["memory"]
+        assert result.data.unit == "kWh"
+        assert [item.value for item in result.data.aggregated_time_series] == [24.0, 24.0]
+
+    async def test_partial_fetches_only_uncovered_buckets(self):
+        """Test that only the days not held locally are requested from the API."""
+        planner = AggregationPlanner(self.client)
+        planner.add(metering_data(96, DAY_START + timedelta(days=1), code=METERING_POINT))
+        # Half a day more
+        planner.add(metering_data(96, DAY_START + timedelta(days=1, hours=12), code=METERING_POINT))
+
+        fetch = AsyncMock(side_effect=[api_day(1, 10.0), api_day(3, 30.0)])
+        with patch.object(self.client, "get_aggregated_metering_data", fetch):
+            result = await planner.get_aggregated_metering_data(
+                METERING_POINT, OBIS, "2023-01-01", "2023-01-03", aggregation_level="Day"
+            )
+
+        assert result.plan.path == PARTIAL
+        assert (result.plan.local_buckets, result.plan.remote_buckets) == (1, 2)
+        assert result.plan.requests == [("2023-01-01", "2023-01-01"), ("2023-01-03", "2023-01-03")]
+        assert [item.value for item in result.data.aggregated_time_series] == [10.0, 24.0, 30.0]
+        assert fetch.call_args_list[0].kwargs["aggregation_level"] == "Day"
+
+    async def test_local_from_store(self):
+        """Test that buckets covered by the interval store are aggregated from it."""
+        store = SQLiteIntervalStore()
+        try:
+            data = metering_data(31 * 96, DAY_START, code=METERING_POINT, value=2.0)
+            await store.save(data, DAY_START, DAY_START + timedelta(days=31))
+            planner = AggregationPlanner(self.client, store=store)
+
+            with patch.object(self.client, "get_aggregated_metering_data", AsyncMock()) as fetch:
+                result = await planner.get_aggregated_metering_data(
+                    METERING_POINT, OBIS, "2023-01-01", "2023-01-31", aggregation_level="Month"
+                )
+        finally:
+            store.close()
+
+        fetch.assert_not_called()
+        assert result.plan.path == LOCAL
+        assert result.plan.sources == ["store"]
+        assert result.data.aggregated_time_series[0].value == 31 * 48.0
+        assert result.data.aggregated_time_series[0].started_at == DAY_START
+
+    async def test_remote_without_local_values(self):
+        """Test that requests are passed to the API when nothing is held locally."""
+        planner = AggregationPlanner(self.client)
+        planner.add(metering_data(96, DAY_START, code=METERING_POINT))  # Not a whole week
+
+        fetch = AsyncMock(return_value=api_day(2, 5.0))
+        with patch.object(self.client, "get_aggregated_metering_data", fetch):
+            result = await planner.get_aggregated_metering_data(
+                METERING_POINT, OBIS, "2023-01-02", "2023-01-08", aggregation_level="Week"
+            )
+
+        assert result.plan.path == REMOTE
+        assert result.plan.requests == [("2023-01-02", "2023-01-08")]
+        assert result.data.unit == "kWh"
+        assert len(result.data.aggregated_time_series) == 1
@@ -0,0 +1,119 @@
+"""
+Tests for the client-side rate limiter.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LenedaClient, RateLimiter, RetryPolicy
+from src.leneda.exceptions import TooManyRequestsException
+from src.leneda.obis_codes import ObisCode
+from src.leneda.ratelimit import parse_retry_after
+
+
+@pytest.mark.asyncio
+class TestRateLimiter:
+    """Test cases for the RateLimiter class."""
+
+    async def test_burst_then_paced(self):
+        """Test that the burst passes immediately and further requests are paced."""
+        limiter = RateLimiter(rate=50, burst=5)
+        started = time.monotonic()
+        for _ in range(10):
+            await limiter.acquire()
+        elapsed = time.monotonic() - started
+
+        # 5 requests from the burst, then 5 at 50 requests/s
+        assert 0.08 <= elapsed < 0.5
+
+    async def test_queue_depth(self):
+        """Test that waiting requests are reported in the queue depth."""
+        limiter = RateLimiter(rate=20, burst=1)
+        tasks = [asyncio.ensure_future(limiter.acquire()) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 3
+        await asyncio.gather(*tasks)
+        assert limiter.queue_depth == 0
+
+    async def test_throttled_slows_down_and_waits(self):
+        """Test that throttling halves the rate and blocks for the Retry-After delay."""
+        limiter = RateLimiter(rate=100, burst=10, recovery_time=60)
+        limiter.throttled(retry_after=0.1)
+        assert limiter.rate == pytest.approx(50, rel=0.01)
+
+        started = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - started >= 0.09
+
+    async def test_rate_recovers(self):
+        """Test that the rate recovers to the maximum rate."""
+        limiter = RateLimiter(rate=100, recovery_time=0.05)
+        limiter.throttled()
+        await asyncio.sleep(0.1)
+        assert limiter.rate == 100
+
+    async def test_shared_between_event_loops(self):
+        """Test that a limiter can be used from several event loops and threads at once."""
+        limiter = RateLimiter(rate=100, burst=1)
+
+        async def requests():
+            await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+
+        # asyncio.run in a thread, as a blocking caller next to this loop would
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        await asyncio.gather(
+            requests(), loop.run_in_executor(None, lambda: asyncio.run(requests()))
+        )
+
+        # One request from the burst, the five others paced at 100 requests/s for both loops
+        assert time.monotonic() - started >= 0.045
+
+    async def test_parse_retry_after(self):
+        """Test parsing of both Retry-After formats."""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    @patch("aiohttp.ClientSession.request")
+    async def test_client_throttles_on_429(self, mock_request):
+        """Test that a 429 response throttles the limiter and raises TooManyRequestsException."""
+        mock_response = AsyncMock()
+        mock_response.status = 429
+        mock_response.headers = MagicMock()
+        mock_response.headers.get.return_value = "2"
+        mock_request.return_value.__aenter__.return_value = mock_response
+
+        limiter = RateLimiter(rate=10)
+        client = LenedaClient(
+            "test_api_key",
+            "test_energy_id",
+            rate_limiter=limiter,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+        with patch.object(limiter, "throttled") as mock_throttled:
+            with pytest.raises(TooManyRequestsException) as exc_info:
+                await client.get_metering_data(
+                    "LU-METERING_POINT1",
+                    ObisCode.ELEC_CONSUMPTION_ACTIVE,
+                    "2023-01-01T00:00:00Z",
+                    "2023-01-02T00:00:00Z",
+                )
+
+        assert exc_info.value.retry_after == 2.0
+        # Handlers of the aiohttp error raised for a 429 before still match
+        assert isinstance(exc_info.value, aiohttp.ClientResponseError)
+        assert exc_info.value.status == 429
+        mock_throttled.assert_called_once_with(2.0)
+        await client.close()
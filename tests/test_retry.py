@@ -0,0 +1,117 @@
+"""
+Tests for the retry policy of the Leneda API client.
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import aiohttp
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LenedaClient, RetryPolicy
+from src.leneda.exceptions import TooManyRequestsException, UnauthorizedException
+from src.leneda.obis_codes import ObisCode
+
+
+def server_error(status):
+    """Build the error raised by raise_for_status for the given status."""
+    return aiohttp.ClientResponseError(request_info=MagicMock(), history=(), status=status)
+
+
+@pytest.mark.asyncio
+class TestRetry:
+    """Test cases for retries in LenedaClient._make_request."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures."""
+        self.client = LenedaClient(
+            "test_api_key", "test_energy_id", retry_policy=RetryPolicy(base_delay=0)
+        )
+        self.metering_data = {
+            "meteringPointCode": "LU-METERING_POINT1",
+            "obisCode": ObisCode.ELEC_CONSUMPTION_ACTIVE.value,
+            "intervalLength": "PT15M",
+            "unit": "kW",
+            "items": [],
+        }
+
+    async def get_metering_data(self):
+        """Fetch metering data with the test client."""
+        return await self.client.get_metering_data(
+            "LU-METERING_POINT1",
+            ObisCode.ELEC_CONSUMPTION_ACTIVE,
+            "2023-01-01T00:00:00Z",
+            "2023-01-02T00:00:00Z",
+        )
+
+    async def test_get_is_retried_on_transient_errors(self):
+        """Test that GET requests are retried on 502 and connection resets."""
+        side_effect = [
+            server_error(502),
+            aiohttp.ServerDisconnectedError(),
+            self.metering_data,
+        ]
+        with patch.object(self.client, "_send_request", side_effect=side_effect) as mock_send:
+            result = await self.get_metering_data()
+
+        assert result.metering_point_code == "LU-METERING_POINT1"
+        assert mock_send.call_count == 3
+        assert self.client.retry_stats.retries == 2
+        assert self.client.retry_stats.successful_retries == 1
+        assert self.client.retry_stats.give_ups == 0
+
+    async def test_gives_up_after_max_attempts(self):
+        """Test that the last error is raised once all attempts failed."""
+        with patch.object(self.client, "_send_request", side_effect=server_error(503)) as mock_send:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await self.get_metering_data()
+
+        assert mock_send.call_count == 3
+        assert self.client.retry_stats.give_ups == 1
+
+    async def test_non_retryable_errors_are_raised_immediately(self):
+        """Test that authentication errors and 404s are not retried."""
+        for error in (UnauthorizedException("nope"), server_error(404)):
+            with patch.object(self.client, "_send_request", side_effect=error) as mock_send:
+                with pytest.raises(type(error)):
+                    await self.get_metering_data()
+            assert mock_send.call_count == 1
+
+        assert self.client.retry_stats.retries == 0
+
+    async def test_post_is_never_retried(self):
+        """Test that the metering data access request is not retried."""
+        with patch.object(self.client, "_send_request", side_effect=server_error(502)) as mock_send:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await self.client.request_metering_data_access(
+                    "test_energy_id",
+                    "Test",
+                    ["LU-METERING_POINT1"],
+                    [ObisCode.ELEC_CONSUMPTION_ACTIVE],
+                )
+
+        assert mock_send.call_count == 1
+        assert self.client.retry_stats.retries == 0
+
+    async def test_total_timeout_budget(self):
+        """Test that no retry is attempted when the backoff would exceed the time budget."""
+        self.client.retry_policy = RetryPolicy(max_attempts=5, total_timeout=1.0)
+        error = TooManyRequestsException("slow down", retry_after=5.0)
+        with patch.object(self.client, "_send_request", side_effect=error) as mock_send:
+            with pytest.raises(TooManyRequestsException):
+                await self.get_metering_data()
+
+        assert mock_send.call_count == 1
+        assert self.client.retry_stats.give_ups == 1
+
+    async def test_backoff_uses_full_jitter(self):
+        """Test that backoff delays are bounded and honour Retry-After."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        for attempt in range(1, 6):
+            assert 0 <= policy.backoff(attempt) <= min(4.0, 2 ** (attempt - 1))
+        assert policy.backoff(1, retry_after=7.0) == 7.0
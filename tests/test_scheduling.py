@@ -0,0 +1,157 @@
+"""
+Tests for the fair scheduler and the multi-tenant client pool.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.obis_codes import ObisCode
+from src.leneda.pool import LenedaClientPool
+from src.leneda.scheduling import FairScheduler
+
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+
+async def run_requests(queue, count, order, hold=0.01):
+    """Send count requests of a tenant, recording the order in which they get a slot."""
+
+    async def request():
+        await queue.acquire()
+        order.append(queue.tenant_id)
+        try:
+            await asyncio.sleep(hold)
+        finally:
+            queue.release()
+
+    await asyncio.gather(*(request() for _ in range(count)))
+
+
+@pytest.mark.asyncio
+class TestFairScheduler:
+    """Test cases for the FairScheduler class."""
+
+    async def test_large_tenant_cannot_starve_others(self):
+        """Test that a tenant arriving behind a backfill is served in turn."""
+        scheduler = FairScheduler(max_concurrency=2)
+        order = []
+        backfill = asyncio.create_task(run_requests(scheduler.tenant("large"), 50, order))
+        await asyncio.sleep(0)
+        await run_requests(scheduler.tenant("small"), 3, order)
+
+        # The small tenant gets every other slot instead of waiting for the 50 requests
+        assert order.count("small") == 3
+        assert order.index("small") <= 3
+        assert max(i for i, tenant in enumerate(order) if tenant == "small") < 10
+        await backfill
+        assert scheduler.active == 0
+
+    async def test_per_tenant_limit(self):
+        """Test that a tenant never has more requests in flight than its own limit."""
+        scheduler = FairScheduler(max_concurrency=10)
+        queue = scheduler.tenant("tenant", max_concurrency=2)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            await queue.acquire()
+            peak = max(peak, queue.active)
+            await asyncio.sleep(0.001)
+            queue.release()
+
+        await asyncio.gather(*(request() for _ in range(10)))
+
+        assert peak == 2
+        assert scheduler.active == 0
+
+    async def test_cancelled_waiter_frees_its_turn(self):
+        """Test that cancelling a waiting request neither leaks nor blocks slots."""
+        scheduler = FairScheduler(max_concurrency=1)
+        queue = scheduler.tenant("tenant")
+        await queue.acquire()
+        waiter = asyncio.create_task(queue.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        queue.release()
+
+        await asyncio.wait_for(queue.acquire(), 1)
+        assert scheduler.active == 1 and queue.waiting == 0
+
+    async def test_invalid_limit(self):
+        """Test that a scheduler without slots is rejected."""
+        with pytest.raises(ValueError):
+            FairScheduler(max_concurrency=0)
+
+
+@pytest.mark.asyncio
+class TestLenedaClientPool:
+    """Test cases for the LenedaClientPool class."""
+
+    async def test_tenants_share_one_session(self):
+        """Test that tenants send their own credentials over the shared session."""
+        seen = []
+
+        async def time_series(request):
+            seen.append(request.headers["X-ENERGY-ID"])
+            await asyncio.sleep(0.01)
+            body = {
+                "meteringPointCode": request.match_info["code"],
+                "obisCode": OBIS.value,
+                "intervalLength": "PT15M",
+                "unit": "kW",
+                "items": [],
+            }
+            return web.Response(text=json.dumps(body), content_type="application/json")
+
+        app = web.Application()
+        app.router.add_get("/api/metering-points/{code}/time-series", time_series)
+        async with TestServer(app) as server:
+            async with LenedaClientPool(max_concurrency=2, tenant_max_concurrency=1) as pool:
+                for tenant in ("a", "b"):
+                    client = pool.add_tenant(tenant, f"key-{tenant}", f"energy-{tenant}")
+                    client.BASE_URL = str(server.make_url("/api"))
+
+                await asyncio.gather(
+                    *(
+                        pool.client(tenant).get_metering_data(
+                            f"LU-{tenant}-{day}",
+                            OBIS,
+                            f"2023-01-0{day}T00:00:00Z",
+                            f"2023-01-0{day + 1}T00:00:00Z",
+                        )
+                        for tenant in ("a", "b")
+                        for day in (1, 2, 3)
+                    )
+                )
+                session = await pool.client("a")._get_session()
+                assert session is await pool.client("b")._get_session()
+                assert pool.scheduler.active == 0
+
+        assert sorted(seen) == ["energy-a"] * 3 + ["energy-b"] * 3
+        assert session.closed
+
+        pool.remove_tenant("a")
+        assert "a" not in pool.clients and "a" not in pool.scheduler.tenants
+        with pytest.raises(KeyError):
+            pool.client("a")
+
+    async def test_session_of_previous_loop_is_closed(self):
+        """Test that the shared session of a finished event loop is closed when it is replaced."""
+        pool = LenedaClientPool()
+        loop = asyncio.get_running_loop()
+        old = await loop.run_in_executor(None, asyncio.run, pool._get_session())
+
+        session = await pool._get_session()
+
+        assert session is not old and old.closed and not session.closed
+        await pool.close()
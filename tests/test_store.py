@@ -0,0 +1,101 @@
+"""
+Tests for the persistent interval store.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LenedaClient, SQLiteIntervalStore
+from src.leneda.obis_codes import ObisCode
+from tests.conftest import QUARTER_HOUR, metering_data
+
+UTC = timezone.utc
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+
+@pytest.mark.asyncio
+class TestSQLiteIntervalStore:
+    """Test cases for the SQLiteIntervalStore class."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up a store in a temporary file."""
+        self.store = SQLiteIntervalStore(str(tmp_path / "leneda.db"))
+        yield
+        self.store.close()
+
+    async def test_save_load_and_missing_ranges(self):
+        """Test that saved ranges are no longer missing and values round-trip."""
+        day1 = datetime(2023, 1, 1, tzinfo=UTC)
+        day2, day3, day4 = (day1 + timedelta(days=n) for n in (1, 2, 3))
+
+        await self.store.save(metering_data(96, day1), day1, day2)
+        await self.store.save(metering_data(96, day3), day3, day4)
+
+        assert await self.store.missing_ranges("LU-METERING_POINT1", OBIS, day1, day4) == [
+            (day2, day3)
+        ]
+        loaded = await self.store.load("LU-METERING_POINT1", OBIS, day1, day4)
+        assert len(loaded.items) == 2 * 96
+        assert loaded.unit == "kW"
+        assert loaded.items[0] == metering_data(1, day1).items[0]
+
+    async def test_keeps_highest_version(self):
+        """Test that an older version does not overwrite a newer one."""
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        end = start + timedelta(hours=1)
+        await self.store.save(metering_data(4, start, version=2), start, end)
+        await self.store.save(metering_data(4, start, version=1), start, end)
+
+        loaded = await self.store.load("LU-METERING_POINT1", OBIS, start, end)
+        assert {item.version for item in loaded.items} == {2}
+
+    async def test_recent_data_is_not_covered(self):
+        """Test that ranges within the revision period are fetched again."""
+        end = datetime.now(UTC).replace(microsecond=0)
+        start = end - timedelta(days=5)
+        await self.store.save(metering_data(5 * 96, start), start, end)
+
+        missing = await self.store.missing_ranges("LU-METERING_POINT1", OBIS, start, end)
+        assert len(missing) == 1
+        assert missing[0][1] == end
+        assert missing[0][0] > end - timedelta(days=3)
+
+
+@pytest.mark.asyncio
+class TestClientStore:
+    """Test cases for the interval store integration in LenedaClient."""
+
+    async def test_only_missing_ranges_are_fetched(self, tmp_path):
+        """Test that the client fetches only the ranges missing from the store."""
+        store = SQLiteIntervalStore(str(tmp_path / "leneda.db"))
+        client = LenedaClient("test_api_key", "test_energy_id", store=store)
+        requested = []
+
+        async def fake_fetch(metering_point_code, obis_code, start, end, use_cache=True):
+            requested.append((start, end))
+            return metering_data((end - start) // QUARTER_HOUR, start)
+
+        day1 = datetime(2023, 1, 1, tzinfo=UTC)
+        with patch.object(client, "_fetch_metering_data", side_effect=fake_fetch):
+            first = await client.get_metering_data(
+                "LU-METERING_POINT1", OBIS, day1, day1 + timedelta(days=7)
+            )
+            second = await client.get_metering_data(
+                "LU-METERING_POINT1", OBIS, day1, day1 + timedelta(days=8)
+            )
+
+        assert requested == [
+            (day1, day1 + timedelta(days=7)),
+            (day1 + timedelta(days=7), day1 + timedelta(days=8)),
+        ]
+        assert len(first.items) == 7 * 96
+        assert len(second.items) == 8 * 96
+        store.close()
@@ -0,0 +1,219 @@
+"""
+Tests for the incremental parsing of time series responses.
+"""
+
+import json
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LenedaClient
+from src.leneda.models import MeteringData, MeteringValue
+from src.leneda.obis_codes import ObisCode
+from src.leneda.streaming import JsonArrayStreamParser
+
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+
+def time_series_body(count):
+    """Build the JSON body of a time series response with count 15 minute values."""
+    return json.dumps(
+        {
+            "meteringPointCode": "LU-METERING_POINT1",
+            "obisCode": OBIS.value,
+            "intervalLength": "PT15M",
+            "unit": "kW",
+            "items": [
+                {
+                    "value": n * 0.5,
+                    "startedAt": f"2023-01-01T{n // 4:02d}:{n % 4 * 15:02d}:00Z",
+                    "type": "Actual",
+                    "version": 1,
+                    "calculated": False,
+                }
+                for n in range(count)
+            ],
+        }
+    ).encode()
+
+
+def chunked(body, chunk_size):
+    """Split a body into chunks of chunk_size bytes."""
+    return [body[n:][:chunk_size] for n in range(0, len(body), chunk_size)]
+
+
+def parse_in_chunks(body, chunk_size, field="items"):
+    """Feed a body to a parser in chunks of chunk_size bytes and collect all elements."""
+    parser = JsonArrayStreamParser(field)
+    items = []
+    for chunk in chunked(body, chunk_size):
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    return parser, items
+
+
+def streaming_response(body, chunk_size=7):
+    """Build a mock response whose body is read in chunks of chunk_size bytes."""
+
+    async def iter_chunked(_):
+        for chunk in chunked(body, chunk_size):
+            yield chunk
+
+    response = AsyncMock()
+    response.status = 200
+    response.content = MagicMock()
+    response.content.iter_chunked = iter_chunked
+    response.raise_for_status = lambda: None
+    return response
+
+
+class TestJsonArrayStreamParser:
+    """Test cases for the JsonArrayStreamParser class."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 64, 100000])
+    def test_matches_json_loads(self, chunk_size):
+        """Test that any chunking yields the same elements and header as json.loads."""
+        body = time_series_body(20)
+        parser, items = parse_in_chunks(body, chunk_size)
+        expected = json.loads(body)
+        assert items == expected["items"]
+        assert parser.header == {k: v for k, v in expected.items() if k != "items"}
+
+    def test_fields_after_array_and_multibyte_text(self):
+        """Test header fields after the array, nested values and split UTF-8 sequences."""
+        body = json.dumps(
+            {"items": [[1, 2], {"a": "é"}, 12345, None], "unit": "m³"}, ensure_ascii=False
+        ).encode()
+        parser, items = parse_in_chunks(body, 1)
+        assert items == [[1, 2], {"a": "é"}, 12345, None]
+        assert parser.header == {"unit": "m³"}
+
+    def test_empty_array(self):
+        """Test a response without elements."""
+        parser, items = parse_in_chunks(b'{"unit": "kW", "items": []}', 3)
+        assert items == []
+        assert parser.header == {"unit": "kW"}
+
+    def test_truncated_body(self):
+        """Test that a body ending before the object is complete raises a decode error."""
+        parser = JsonArrayStreamParser("items")
+        assert parser.feed(b'{"items": [1, 2, 3') == [1, 2]
+        with pytest.raises(json.JSONDecodeError):
+            parser.close()
+
+    def test_invalid_body(self):
+        """Test that malformed JSON raises a decode error."""
+        parser = JsonArrayStreamParser("items")
+        with pytest.raises(json.JSONDecodeError):
+            parser.feed(b'["items"]')
+
+    @pytest.mark.parametrize(
+        "body", [b'{"unit": "kW", "items": [1],}', b'{"items": [1], 1: 2}', b'{,"items": [1]}']
+    )
+    def test_rejects_what_json_loads_rejects(self, body):
+        """Test that trailing commas and keys that are not strings are rejected."""
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(body)
+        parser = JsonArrayStreamParser("items")
+        with pytest.raises(json.JSONDecodeError):
+            parser.feed(body)
+            parser.close()
+
+
+@pytest.mark.asyncio
+class TestClientStreaming:
+    """Test cases for the streaming methods of the client."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures."""
+        self.client = LenedaClient("test_api_key", "test_energy_id")
+
+    @patch("aiohttp.ClientSession.request")
+    async def test_stream_metering_values(self, mock_request):
+        """Test streaming the values of a time series."""
+        mock_request.return_value.__aenter__.return_value = streaming_response(time_series_body(10))
+
+        values = [
+            value
+            async for value in self.client.stream_metering_values(
+                "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+            )
+        ]
+
+        assert len(values) == 10
+        assert all(isinstance(value, MeteringValue) for value in values)
+        assert values[3].value == 1.5
+        assert values[3].started_at.isoformat() == "2023-01-01T00:45:00+00:00"
+        assert mock_request.call_args[1]["params"] == {
+            "obisCode": OBIS.value,
+            "startDateTime": "2023-01-01T00:00:00Z",
+            "endDateTime": "2023-01-02T00:00:00Z",
+        }
+
+    @patch("aiohttp.ClientSession.request")
+    async def test_stream_metering_data_batches(self, mock_request):
+        """Test streaming a time series in batches."""
+        mock_request.return_value.__aenter__.return_value = streaming_response(time_series_body(10))
+
+        batches = [
+            batch
+            async for batch in self.client.stream_metering_data(
+                "LU-METERING_POINT1",
+                OBIS,
+                "2023-01-01T00:00:00Z",
+                "2023-01-02T00:00:00Z",
+                batch_size=4,
+            )
+        ]
+
+        assert [len(batch.items) for batch in batches] == [4, 4, 2]
+        assert all(isinstance(batch, MeteringData) for batch in batches)
+        assert batches[0].unit == "kW"
+        assert batches[0].interval_length == "PT15M"
+        assert batches[2].items[-1].value == 4.5
+
+        with pytest.raises(ValueError):
+            async for batch in self.client.stream_metering_data(
+                "LU-METERING_POINT1",
+                OBIS,
+                "2023-01-01T00:00:00Z",
+                "2023-01-02T00:00:00Z",
+                batch_size=0,
+            ):
+                pass
+
+    @patch("aiohttp.ClientSession.request")
+    async def test_invalid_items_are_summarized(self, mock_request, caplog):
+        """Test that invalid items are skipped and reported in one summary, as by from_dict."""
+        body = json.loads(time_series_body(10))
+        body["items"][2]["value"] = "n/a"
+        del body["items"][7]["startedAt"]
+        mock_request.return_value.__aenter__.return_value = streaming_response(
+            json.dumps(body).encode(), chunk_size=100000
+        )
+
+        with caplog.at_level("WARNING", logger="leneda"):
+            batches = [
+                batch
+                async for batch in self.client.stream_metering_data(
+                    "LU-METERING_POINT1",
+                    OBIS,
+                    "2023-01-01T00:00:00Z",
+                    "2023-01-02T00:00:00Z",
+                    batch_size=3,
+                )
+            ]
+
+        assert [len(batch.columns) for batch in batches] == [3, 3, 2]
+        assert [item.value for batch in batches for item in batch.items] == [
+            n * 0.5 for n in range(10) if n not in (2, 7)
+        ]
+        warnings = [record.getMessage() for record in caplog.records]
+        assert len(warnings) == 1
+        assert "2 invalid rows" in warnings[0] and "row 7: KeyError" in warnings[0]
@@ -0,0 +1,121 @@
+"""
+Tests for the incremental sync engine.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import LenedaClient, ResponseCache, SyncEngine
+from src.leneda.models import MeteringData, MeteringValue
+from src.leneda.obis_codes import ObisCode
+from src.leneda.timeutils import to_utc
+
+UTC = timezone.utc
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+
+@pytest.mark.asyncio
+class TestSyncEngine:
+    """Test cases for the SyncEngine class."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up a fake API holding a 15 minute series with per-interval versions."""
+        self.client = LenedaClient("test_api_key", "test_energy_id")
+        self.engine = SyncEngine(self.client, revision_lookback=timedelta(hours=2))
+        self.versions = {}
+        self.requests = []
+
+        async def fake_get(metering_point_code, obis_code, start, end, use_cache=True):
+            self.requests.append((start, end))
+            return self.published(metering_point_code, obis_code, start, end)
+
+        self.patcher = patch.object(self.client, "get_metering_data", side_effect=fake_get)
+        self.patcher.start()
+        yield
+        self.patcher.stop()
+
+    def published(self, metering_point_code, obis_code, start, end):
+        """Get the published intervals of [start, end)."""
+        items = [
+            MeteringValue(1.0, started_at, "Actual", version, False)
+            for started_at, version in sorted(self.versions.items())
+            if start <= started_at < end
+        ]
+        return MeteringData(metering_point_code, obis_code, "PT15M", "kW", items)
+
+    def publish(self, start, count, version=1):
+        """Publish count intervals starting at start."""
+        for i in range(count):
+            self.versions[start + timedelta(minutes=15 * i)] = version
+
+    async def test_new_and_revised_intervals(self):
+        """Test that new intervals and revisions are detected and the watermark advances."""
+        now = datetime(2023, 1, 2, 12, tzinfo=UTC)
+        self.publish(now - timedelta(hours=6), 24)
+
+        first = await self.engine.sync("LU-METERING_POINT1", OBIS, now=now)
+        assert len(first.new) == 24
+        assert first.revised == []
+        assert first.watermark == now - timedelta(minutes=15)
+
+        # One new interval arrives and the last hour is revised
+        later = now + timedelta(minutes=15)
+        self.publish(now - timedelta(hours=1), 4, version=2)
+        self.publish(now, 1)
+
+        second = await self.engine.sync("LU-METERING_POINT1", OBIS, now=later)
+        assert [item.started_at for item in second.new] == [now]
+        assert len(second.revised) == 4
+        assert second.watermark == now
+
+        # Only the lookback window before the previous watermark (aligned to the hour) was requested
+        assert self.requests[-1] == (now - timedelta(hours=3), later)
+
+    async def test_revisions_are_not_hidden_by_the_cache(self):
+        """Test that syncs bypass the response cache, which would return stale versions."""
+        client = LenedaClient("test_api_key", "test_energy_id", cache=ResponseCache())
+        engine = SyncEngine(client, revision_lookback=timedelta(hours=2))
+        now = datetime(2023, 1, 2, 12, tzinfo=UTC)
+        self.publish(now - timedelta(hours=1), 4)
+
+        async def fake_request(method, endpoint, params=None, json_data=None):
+            start, end = to_utc(params["startDateTime"]), to_utc(params["endDateTime"])
+            return self.published("LU-METERING_POINT1", OBIS, start, end).to_dict()
+
+        with patch.object(client, "_make_request", side_effect=fake_request):
+            await engine.sync("LU-METERING_POINT1", OBIS, now=now)
+            await engine.sync("LU-METERING_POINT1", OBIS, now=now)
+            self.publish(now - timedelta(hours=1), 4, version=2)
+            # Same window as the previous sync, whose response was cached
+            result = await engine.sync("LU-METERING_POINT1", OBIS, now=now)
+
+        assert len(result.revised) == 4
+
+    async def test_sync_many_reports_errors(self):
+        """Test that sync_many yields a result per series and reports failures."""
+        now = datetime(2023, 1, 2, 12, tzinfo=UTC)
+        self.publish(now - timedelta(hours=1), 4)
+        self.client.get_metering_data.side_effect = [
+            MeteringData("LU-METERING_POINT1", OBIS, "PT15M", "kW"),
+            ValueError("boom"),
+        ]
+
+        results = [
+            result
+            async for result in self.engine.sync_many(
+                [("LU-METERING_POINT1", OBIS), ("LU-METERING_POINT2", OBIS)],
+                max_concurrency=1,
+                now=now,
+            )
+        ]
+
+        assert [result.ok for result in results] == [True, False]
+        assert results[1].metering_point_code == "LU-METERING_POINT2"
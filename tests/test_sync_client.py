@@ -0,0 +1,151 @@
+"""
+Tests for the blocking client.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda import SyncLenedaClient
+from src.leneda.models import MeteringData
+from src.leneda.obis_codes import ObisCode
+
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+
+class LenedaHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the time series endpoints of the Leneda API."""
+
+    protocol_version = "HTTP/1.1"  # Keep connections alive, like the real API
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        if "aggregated" in self.path:
+            body = {"unit": "kWh", "aggregatedTimeSeries": []}
+        else:
+            body = {
+                "meteringPointCode": "LU-METERING_POINT1",
+                "obisCode": OBIS.value,
+                "intervalLength": "PT15M",
+                "unit": "kW",
+                "items": [],
+            }
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSyncLenedaClient:
+    """Test cases for the SyncLenedaClient class."""
+
+    @pytest.fixture(autouse=True)
+    def server(self):
+        """Run a local API server in a thread."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), LenedaHandler)
+        self.server.connections = set()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        yield
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_client(self, **options):
+        """Create a blocking client talking to the local server."""
+        client = SyncLenedaClient(
+            "test_api_key", "test_energy_id", connector_limit=4, call_timeout=10, **options
+        )
+        host, port = self.server.server_address
+        client.client.BASE_URL = f"http://{host}:{port}/api"
+        return client
+
+    def test_calls_from_many_threads_share_the_pool(self):
+        """Test concurrent blocking calls from many threads over one connection pool."""
+        with self.make_client(coalesce_requests=False) as client:
+
+            def fetch(day):
+                return client.get_metering_data(
+                    "LU-METERING_POINT1",
+                    OBIS,
+                    f"2023-01-{day:02d}T00:00:00Z",
+                    f"2023-01-{day + 1:02d}T00:00:00Z",
+                )
+
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(fetch, range(1, 29)))
+
+            assert all(isinstance(result, MeteringData) for result in results)
+            aggregated = client.get_aggregated_metering_data(
+                "LU-METERING_POINT1", OBIS, "2023-01-01", "2023-02-01"
+            )
+            assert aggregated.unit == "kWh"
+            assert client.probe_metering_point_obis_code("LU-METERING_POINT1", OBIS)
+
+        # 29 requests went over at most connector_limit connections
+        assert 1 <= len(self.server.connections) <= 4
+
+    def test_fetch_metering_data_bulk(self):
+        """Test that bulk fetches collect one result per request with the default concurrency."""
+        requests = [
+            ("LU-METERING_POINT1", OBIS, f"2023-01-{day:02d}T00:00:00Z", "2023-02-01T00:00:00Z")
+            for day in range(1, 11)
+        ]
+        with self.make_client() as client:
+            results = client.fetch_metering_data_bulk(requests + [("LU-METERING_POINT1",)])
+
+        assert len(results) == 11
+        assert sum(result.ok for result in results) == 10
+        assert {result.request.start_date_time for result in results if result.ok} == {
+            request[2] for request in requests
+        }
+
+    def test_closed_client(self):
+        """Test that a closed client stops its thread and rejects calls."""
+        client = self.make_client()
+        client.close()
+        client.close()
+        assert not client._thread.is_alive()
+        with pytest.raises(RuntimeError):
+            client.get_metering_data(
+                "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+            )
+
+    def test_close_releases_calls_in_flight(self):
+        """Test that closing the client cancels calls blocked in other threads."""
+        client = self.make_client()
+        started = threading.Event()
+
+        async def hang(*args, **kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        client.client.get_metering_data = hang
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            call = executor.submit(
+                client.get_metering_data,
+                "LU-METERING_POINT1",
+                OBIS,
+                "2023-01-01T00:00:00Z",
+                "2023-01-02T00:00:00Z",
+            )
+            assert started.wait(5)
+            client.close()
+            with pytest.raises(CancelledError):
+                call.result(5)
+
+        assert not client._thread.is_alive()
+        assert not client._futures
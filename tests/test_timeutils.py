@@ -0,0 +1,106 @@
+"""
+Tests for the date and time helpers.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.timeutils import (
+    GridTimestampParser,
+    parse_duration,
+    parse_timestamp,
+    split_time_range,
+    to_utc,
+)
+
+UTC = timezone.utc
+
+
+class TestTimeUtils:
+    """Test cases for the timeutils module."""
+
+    def test_to_utc(self):
+        """Test conversion of strings and naive/aware datetimes to UTC."""
+        expected = datetime(2023, 1, 1, 12, tzinfo=UTC)
+        assert to_utc("2023-01-01T12:00:00Z") == expected
+        assert to_utc("2023-01-01T13:00:00+01:00") == expected
+        assert to_utc(datetime(2023, 1, 1, 12)) == expected
+        assert to_utc(expected).tzinfo is UTC
+
+    def test_parse_duration(self):
+        """Test parsing of ISO 8601 interval lengths."""
+        assert parse_duration("PT15M") == timedelta(minutes=15)
+        assert parse_duration("PT1H") == timedelta(hours=1)
+        assert parse_duration("P1DT12H") == timedelta(days=1, hours=12)
+        with pytest.raises(ValueError):
+            parse_duration("P1M")
+        with pytest.raises(ValueError):
+            parse_duration("PT")
+
+    def test_split_time_range(self):
+        """Test that chunks are consecutive, bounded and aligned to full hours."""
+        start = datetime(2023, 1, 1, 0, 15, tzinfo=UTC)
+        end = datetime(2023, 1, 3, 6, 0, tzinfo=UTC)
+
+        chunks = split_time_range(start, end, timedelta(days=1))
+
+        assert chunks == [
+            (start, datetime(2023, 1, 2, 0, 0, tzinfo=UTC)),
+            (datetime(2023, 1, 2, 0, 0, tzinfo=UTC), datetime(2023, 1, 3, 0, 0, tzinfo=UTC)),
+            (datetime(2023, 1, 3, 0, 0, tzinfo=UTC), end),
+        ]
+
+    def test_split_time_range_short(self):
+        """Test that a range shorter than the chunk size is returned as is."""
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        end = start + timedelta(hours=5)
+        assert split_time_range(start, end, timedelta(days=1)) == [(start, end)]
+
+    def test_split_time_range_rejects_small_chunks(self):
+        """Test that chunks shorter than the alignment are rejected."""
+        start = datetime(2023, 1, 1, tzinfo=UTC)
+        with pytest.raises(ValueError):
+            split_time_range(start, start + timedelta(days=1), timedelta(minutes=15))
+
+    def test_parse_timestamp(self):
+        """Test strict parsing of API timestamps to epoch seconds."""
+        expected = int(datetime(2023, 3, 26, 1, 30, tzinfo=UTC).timestamp())
+        assert parse_timestamp("2023-03-26T01:30:00Z") == expected
+        assert parse_timestamp("2023-03-26T03:30:00+02:00") == expected
+        assert parse_timestamp("2023-03-25T23:30:00-02:00") == expected
+        assert parse_timestamp("2023-03-26T01:30:00.250Z") == expected
+        for invalid in ("2023-02-30T00:00:00Z", "2023-01-01T24:00:00Z", "2023-01-01", "junk"):
+            with pytest.raises(ValueError):
+                parse_timestamp(invalid)
+
+    def test_grid_timestamp_parser(self):
+        """Test that the grid parser agrees with parse_timestamp on and off the grid."""
+        start = datetime(2023, 12, 31, 23, tzinfo=UTC)
+        times = [start + timedelta(minutes=15 * n) for n in range(12)]
+        del times[5]  # A gap in the series
+        values = [time.strftime("%Y-%m-%dT%H:%M:%SZ") for time in times]
+        values[8] = "2024-01-01T02:00:00+01:00"  # Another format
+        parser = GridTimestampParser.for_interval_length("PT15M")
+
+        assert [parser.parse(value) for value in values] == [
+            parse_timestamp(value) for value in values
+        ]
+        with pytest.raises(ValueError):
+            parser.parse("2024-01-01T03:60:00Z")
+
+    @pytest.mark.parametrize("interval_length", ["PT15M", "", None, "P1M", "15 minutes"])
+    def test_grid_timestamp_parser_invalid_after_off_grid(self, interval_length):
+        """Test that empty and invalid timestamps raise ValueError after off-grid rows."""
+        parser = GridTimestampParser.for_interval_length(interval_length)
+        assert parser.parse("2024-01-01T00:00:00Z") == parse_timestamp("2024-01-01T00:00:00Z")
+        assert parser.parse("2024-01-01T00:07:00Z") == parse_timestamp("2024-01-01T00:07:00Z")
+        for invalid in ["", None, "2024-01-01T00:22:00", "2024-01-01T00:15:00Z "]:
+            with pytest.raises(ValueError):
+                parser.parse(invalid)
+        assert parser.parse("2024-01-01T00:15:00Z") == parse_timestamp("2024-01-01T00:15:00Z")
@@ -0,0 +1,257 @@
+"""
+Tests for the HTTP transports of the client.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.leneda.client import LenedaClient
+from src.leneda.exceptions import UnauthorizedException
+from src.leneda.obis_codes import ObisCode
+from src.leneda.retry import RetryPolicy
+from src.leneda.transport import (
+    HttpxTransport,
+    InProcessResponse,
+    InProcessTransport,
+    decode_body,
+    encode_body,
+)
+
+OBIS = ObisCode.ELEC_CONSUMPTION_ACTIVE
+
+METERING_DATA = {
+    "meteringPointCode": "LU-METERING_POINT1",
+    "obisCode": OBIS.value,
+    "intervalLength": "PT15M",
+    "unit": "kW",
+    "items": [
+        {
+            "value": 0.5 * n,
+            "startedAt": f"2023-01-01T{n // 4:02d}:{n % 4 * 15:02d}:00Z",
+            "type": "Actual",
+            "version": 1,
+            "calculated": False,
+        }
+        for n in range(96)
+    ],
+}
+
+
+def compressed_response(request, data, status=200):
+    """Answer a request with JSON compressed as the client accepts it."""
+    body, encoding = encode_body(json.dumps(data).encode(), request.headers["Accept-Encoding"])
+    headers = {"Content-Encoding": encoding} if encoding else {}
+    return InProcessResponse(status, body, headers)
+
+
+def time_series_app(seen):
+    """Build a server application compressing time series responses."""
+
+    async def time_series(request):
+        seen.append(request.headers.get("Accept-Encoding", ""))
+        response = web.json_response(METERING_DATA)
+        response.enable_compression()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/api/metering-points/{code}/time-series", time_series)
+    return app
+
+
+@pytest.mark.asyncio
+class TestInProcessTransport:
+    """Test cases for the InProcessTransport class."""
+
+    async def test_compressed_time_series(self):
+        """Test that requests reach the handler and compressed responses are decoded."""
+        requests = []
+
+        async def handler(request):
+            requests.append(request)
+            return compressed_response(request, METERING_DATA)
+
+        client = LenedaClient(
+            "test_api_key", "test_energy_id", transport=InProcessTransport(handler)
+        )
+        data = await client.get_metering_data(
+            "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+        )
+
+        assert len(data.columns) == 96
+        request = requests[0]
+        assert request.path == "/api/metering-points/LU-METERING_POINT1/time-series"
+        assert request.params["obisCode"] == OBIS.value
+        assert request.headers["X-API-KEY"] == "test_api_key"
+        assert "gzip" in request.headers["Accept-Encoding"]
+
+    async def test_streaming_and_post(self):
+        """Test that responses can be streamed and JSON bodies are passed to the handler."""
+
+        async def handler(request):
+            if request.method == "POST":
+                return compressed_response(request, {"id": "1", "received": request.json})
+            return compressed_response(request, METERING_DATA)
+
+        client = LenedaClient(
+            "test_api_key", "test_energy_id", transport=InProcessTransport(handler)
+        )
+        client.STREAM_CHUNK_SIZE = 64
+        values = [
+            value.value
+            async for value in client.stream_metering_values(
+                "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+            )
+        ]
+        response = await client.request_metering_data_access("LUXE-1", "Name", ["LU-1"], [OBIS])
+
+        assert values == [0.5 * n for n in range(96)]
+        assert response["received"]["obisCodes"] == [OBIS.value]
+
+    async def test_error_statuses(self):
+        """Test that error statuses are retried and raised as with aiohttp."""
+        statuses = [500, 200]
+
+        async def handler(request):
+            if request.headers["X-API-KEY"] == "wrong":
+                return InProcessResponse(401)
+            return compressed_response(request, METERING_DATA, statuses.pop(0))
+
+        policy = RetryPolicy(base_delay=0.001)
+        transport = InProcessTransport(handler)
+        client = LenedaClient("key", "energy", transport=transport, retry_policy=policy)
+        data = await client.get_metering_data(
+            "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+        )
+        assert len(data.columns) == 96 and client.retry_stats.retries == 1
+
+        client = LenedaClient("wrong", "energy", transport=transport)
+        with pytest.raises(UnauthorizedException):
+            await client.get_metering_data(
+                "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+            )
+
+    async def test_invalid_encoding(self):
+        """Test that undecodable bodies are reported as payload errors."""
+        assert decode_body(b"{}", None) == b"{}"
+        with pytest.raises(aiohttp.ClientPayloadError):
+            decode_body(b"{}", "gzip")
+        with pytest.raises(aiohttp.ClientPayloadError):
+            decode_body(b"{}", "compress")
+
+
+@pytest.mark.asyncio
+class TestNetworkTransports:
+    """Test cases for the aiohttp and httpx transports against a local server."""
+
+    async def test_aiohttp_negotiates_compression(self):
+        """Test that the default transport accepts and decodes compressed responses."""
+        seen = []
+        async with TestServer(time_series_app(seen)) as server:
+            async with LenedaClient("test_api_key", "test_energy_id") as client:
+                client.BASE_URL = str(server.make_url("/api"))
+                data = await client.get_metering_data(
+                    "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+                )
+
+        assert len(data.columns) == 96
+        assert "gzip" in seen[0]
+
+    async def test_httpx_transport(self):
+        """Test requests, compression and connection errors of the httpx transport."""
+        pytest.importorskip("httpx")
+        pytest.importorskip("h2")
+        seen = []
+        transport = HttpxTransport()
+        try:
+            async with TestServer(time_series_app(seen)) as server:
+                client = LenedaClient("test_api_key", "test_energy_id", transport=transport)
+                client.BASE_URL = str(server.make_url("/api"))
+                data = await client.get_metering_data(
+                    "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+                )
+                values = [
+                    value.value
+                    async for value in client.stream_metering_values(
+                        "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+                    )
+                ]
+
+            assert len(data.columns) == 96 and len(values) == 96
+            assert "gzip" in seen[0]
+
+            # The server is gone; connection errors are raised as those of aiohttp
+            client.retry_policy = RetryPolicy(max_attempts=1)
+            with pytest.raises(aiohttp.ClientConnectionError):
+                await client.get_metering_data(
+                    "LU-METERING_POINT1", OBIS, "2023-01-01T00:00:00Z", "2023-01-02T00:00:00Z"
+                )
+        finally:
+            await transport.close()
+
+    async def test_httpx_transport_shares_connection_pool(self, monkeypatch):
+        """Test that concurrent requests share one httpx client and its connections."""
+        httpx = pytest.importorskip("httpx")
+        pytest.importorskip("h2")
+        clients = []
+
+        class CountingClient(httpx.AsyncClient):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                clients.append(self)
+
+        monkeypatch.setattr(httpx, "AsyncClient", CountingClient)
+        peers = set()
+
+        async def time_series(request):
+            peers.add(request.transport.get_extra_info("peername"))
+            await asyncio.sleep(0.01)
+            return web.json_response(METERING_DATA)
+
+        app = web.Application()
+        app.router.add_get("/api/metering-points/{code}/time-series", time_series)
+        transport = HttpxTransport(max_connections=4)
+        try:
+            async with TestServer(app) as server:
+                client = LenedaClient("test_api_key", "test_energy_id", transport=transport)
+                client.BASE_URL = str(server.make_url("/api"))
+                results = await asyncio.gather(
+                    *(
+                        client.get_metering_data(
+                            f"LU-METERING_POINT{n}",
+                            OBIS,
+                            "2023-01-01T00:00:00Z",
+                            "2023-01-02T00:00:00Z",
+                        )
+                        for n in range(20)
+                    )
+                )
+        finally:
+            await transport.close()
+
+        assert all(len(data.columns) == 96 for data in results)
+        assert len(clients) == 1 and clients[0].is_closed
+        # The local server only speaks HTTP/1.1, so the requests queue for the pooled connections
+        assert 1 <= len(peers) <= 4
+
+    async def test_httpx_client_of_previous_loop_is_closed(self):
+        """Test that the httpx client of a finished event loop is closed when it is replaced."""
+        pytest.importorskip("httpx")
+        pytest.importorskip("h2")
+        transport = HttpxTransport()
+        loop = asyncio.get_running_loop()
+        old = await loop.run_in_executor(None, asyncio.run, transport._get_client())
+
+        client = await transport._get_client()
+
+        assert client is not old and old.is_closed and not client.is_closed
+        await transport.close()